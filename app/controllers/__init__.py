@@ -1,5 +1,8 @@
 """Controllers - Request handlers"""
 from .api_controller import router as api_router
+from .job_controller import router as job_router
 from .view_controller import router as view_router
+from .admin_controller import router as admin_router
+from .analytics_controller import router as analytics_router
 
-__all__ = ["api_router", "view_router"]
+__all__ = ["api_router", "job_router", "view_router", "admin_router", "analytics_router"]
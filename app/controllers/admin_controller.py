@@ -0,0 +1,82 @@
+"""
+Admin Controllers - Runtime diagnostics
+Token-protected endpoints for inspecting a running worker
+"""
+import secrets
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.diagnostics import memory_diagnostics
+from app.services.shadow_service import shadow_service
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Allow the request only with the configured admin token
+
+    The endpoints do not exist (404) while ADMIN_TOKEN is unset.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
+
+
+# Create admin router
+router = APIRouter(
+    prefix=f"{settings.API_PREFIX}/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False
+)
+
+
+@router.get(
+    "/memory",
+    summary="Memory diagnostics",
+    description="Process memory, per-component sizes and optional tracemalloc top allocators"
+)
+async def get_memory_diagnostics(
+    top: int = Query(0, ge=0, le=200, description="Number of top allocation sites (0 disables tracemalloc)"),
+    diff: bool = Query(False, description="Diff allocations against the previous snapshot"),
+    group_by: Literal["lineno", "filename", "traceback"] = Query("lineno")
+):
+    """
+    Memory report for this worker
+
+    The first call with top > 0 starts tracemalloc; later calls return the
+    top allocators, or with diff=true the growth since the previous call.
+    """
+    report = await run_in_threadpool(memory_diagnostics.report)
+    if top:
+        report["allocations"] = await run_in_threadpool(
+            memory_diagnostics.allocations, top, diff, group_by
+        )
+    return report
+
+
+@router.delete(
+    "/memory/trace",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Stop allocation tracing"
+)
+async def stop_memory_tracing():
+    """
+    Stop tracemalloc and release its bookkeeping memory
+    """
+    memory_diagnostics.stop_tracing()
+
+
+@router.delete(
+    "/shadow",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Reset shadow comparison"
+)
+async def reset_shadow_report():
+    """
+    Clear the shadow agreement matrix and counters
+    """
+    shadow_service.reset()
@@ -0,0 +1,119 @@
+"""
+Analytics Controllers - Segment slicing endpoints
+Counts and averages by Gender, Age band, income band and cluster
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+
+from app.schemas.analytics import SegmentDimensions, SegmentQueryResponse
+from app.services.analytics_service import segment_analytics_service, DIMENSIONS
+from app.core.config import settings
+
+
+# Create analytics router
+router = APIRouter(prefix=f"{settings.API_PREFIX}/segments", tags=["Segment Analytics"])
+
+
+def _filters(gender, age_band, income_band, cluster) -> dict:
+    return {"gender": gender, "age_band": age_band, "income_band": income_band, "cluster": cluster}
+
+
+@router.get(
+    "/dimensions",
+    response_model=SegmentDimensions,
+    summary="List segment dimensions",
+    description="Get the values accepted by each filter of the segment query"
+)
+async def get_segment_dimensions():
+    """
+    Dimension values of the current segment index
+    """
+    try:
+        index = await run_in_threadpool(segment_analytics_service.get_index)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Model not available: {str(e)}"
+        )
+    return SegmentDimensions(dimensions=index.levels)
+
+
+@router.get(
+    "/query",
+    response_model=SegmentQueryResponse,
+    summary="Query customer segments",
+    description="Count and average customers in a slice, optionally grouped by dimensions"
+)
+async def query_segments(
+    gender: Optional[List[str]] = Query(None, description="e.g. Female"),
+    age_band: Optional[List[str]] = Query(None, description="e.g. 25-34"),
+    income_band: Optional[List[str]] = Query(None, description="e.g. 60k-89k"),
+    cluster: Optional[List[str]] = Query(None, description="Cluster id, e.g. 1"),
+    group_by: Optional[List[str]] = Query(None, description=f"Any of: {', '.join(DIMENSIONS)}")
+):
+    """
+    Segment slice from the precomputed aggregate cube
+    
+    Repeat a filter to accept several values (OR); different filters combine with AND.
+    """
+    try:
+        return await run_in_threadpool(
+            segment_analytics_service.query,
+            _filters(gender, age_band, income_band, cluster),
+            group_by or []
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Model not available: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error querying segments: {str(e)}"
+        )
+
+
+@router.get(
+    "/customers",
+    summary="List customers in a segment",
+    description="Stream the customers matching the filters as CSV"
+)
+async def list_segment_customers(
+    gender: Optional[List[str]] = Query(None),
+    age_band: Optional[List[str]] = Query(None),
+    income_band: Optional[List[str]] = Query(None),
+    cluster: Optional[List[str]] = Query(None)
+):
+    """
+    Matching customers, selected with the bitmap indexes
+    """
+    filters = _filters(gender, age_band, income_band, cluster)
+    try:
+        # Resolve filters up front so bad values fail before streaming starts
+        index = await run_in_threadpool(segment_analytics_service.get_index)
+        index.resolve_filters(filters)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Model not available: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(
+        segment_analytics_service.iter_customers_csv(filters),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="segment_customers.csv"'}
+    )
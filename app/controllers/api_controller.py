@@ -2,17 +2,28 @@
 API Controllers - Handle HTTP requests and responses
 RESTful API endpoints for the application
 """
-from fastapi import APIRouter, HTTPException, status
-from typing import List
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
 
 from app.schemas.customer import (
     CustomerInput, 
     PredictionResponse, 
     ClusterStats,
-    ModelInfo
+    ModelInfo,
+    ShadowReport,
+    SegmentMapResponse
 )
+from app.schemas.columnar import BulkPredictionRequest, BulkPredictionResponse
 from app.services.prediction_service import prediction_service
+from app.services.segment_map_service import segment_map_service
+from app.services.stream_service import count_lines, stream_prediction_service
+from app.services.shadow_service import shadow_service
 from app.models.ml_model import ml_model
+from app.core.compression import etag_matches
+from app.core.config import settings
 
 
 # Create API router
@@ -22,21 +33,26 @@ router = APIRouter(prefix="/api/v1", tags=["Customer Segmentation API"])
 @router.post(
     "/predict",
     response_model=PredictionResponse,
+    response_model_exclude_none=True,
     status_code=status.HTTP_200_OK,
     summary="Predict customer segment",
     description="Predict which customer segment a person belongs to based on their income and spending score"
 )
-async def predict_customer_segment(customer: CustomerInput):
+async def predict_customer_segment(
+    customer: CustomerInput,
+    soft: bool = Query(False, description="Include distances to all centroids, margin and membership")
+):
     """
     Predict customer segment endpoint
     
     - **annual_income**: Annual income in thousands of dollars (e.g., 70 means $70k)
     - **spending_score**: Spending score from 1 to 100
+    - **soft**: Also return how firmly the customer belongs to the segment
     
     Returns the predicted cluster with marketing recommendations
     """
     try:
-        prediction = await prediction_service.predict_segment(customer)
+        prediction = await prediction_service.predict_segment(customer, soft=soft)
         return prediction
     except RuntimeError as e:
         raise HTTPException(
@@ -50,6 +66,177 @@ async def predict_customer_segment(customer: CustomerInput):
         )
 
 
+async def _read_body_limited(request: Request, limit: int) -> bytes:
+    """
+    Read a request body, rejecting it with 413 as soon as it exceeds limit
+    
+    A declared Content-Length over the limit is rejected without reading;
+    otherwise the body is read chunk by chunk, so an oversized upload is never
+    buffered whole.
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Request body larger than {limit} bytes; use /api/v1/jobs for larger inputs"
+    )
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise too_large
+    
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@router.post(
+    "/predict/bulk",
+    response_model=BulkPredictionResponse,
+    summary="Predict segments in bulk",
+    description="Predict segments for parallel annual_income / spending_score arrays",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": BulkPredictionRequest.model_json_schema()}}
+        }
+    }
+)
+async def predict_bulk(
+    request: Request,
+    soft: bool = Query(False, description="Include per-row distances, margin and membership")
+):
+    """
+    Columnar bulk prediction endpoint
+    
+    The body is decoded with `json.loads`, each column is converted to a
+    float64 array in one NumPy call (element by element only when it mixes in
+    non-numbers) and validated in one pass; invalid rows get cluster -1 and
+    are listed in `errors` by row index.
+    With `soft=true` the response adds `distances`, `margin` and `membership`
+    arrays computed from the same distance matrix as the assignment.
+    """
+    body = await _read_body_limited(request, settings.BULK_MAX_BODY_BYTES)
+    try:
+        payload = json.loads(body)
+        annual_income = payload["annual_income"]
+        spending_score = payload["spending_score"]
+        if not isinstance(annual_income, list) or not isinstance(spending_score, list):
+            raise TypeError
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Body must be a JSON object with 'annual_income' and 'spending_score' arrays"
+        )
+    
+    # Both columns are checked before any array is built
+    if max(len(annual_income), len(spending_score)) > settings.BULK_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_ROWS} rows per request; use /api/v1/jobs for larger inputs"
+        )
+    if len(annual_income) != len(spending_score):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="'annual_income' and 'spending_score' must have the same length"
+        )
+    
+    try:
+        result = await run_in_threadpool(
+            prediction_service.predict_columns, annual_income, spending_score, soft
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Model not available: {str(e)}"
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Prediction error: {str(e)}"
+        )
+    
+    return Response(content=json.dumps(result, separators=(",", ":")), media_type="application/json")
+
+
+@router.websocket("/predict/ws")
+async def predict_stream(websocket: WebSocket):
+    """
+    Streaming prediction channel
+    
+    Each text message holds one or more "income,score" lines. Replies arrive in
+    message order, one per message, with the cluster id of each line on its own
+    line (-1 for invalid lines). Clients may pipeline messages without waiting;
+    once STREAM_MAX_PENDING messages are queued the server stops reading until
+    it catches up. Queued messages are scored together, up to
+    STREAM_BATCH_MESSAGES messages or STREAM_BATCH_LINES lines, in a worker
+    thread so other requests keep being served.
+    """
+    await websocket.accept()
+    if not ml_model.is_loaded:
+        await websocket.close(code=1013, reason="Model not available")
+        return
+    if not stream_prediction_service.try_connect():
+        await websocket.close(code=1013, reason="Too many streams")
+        return
+    
+    pending: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=settings.STREAM_MAX_PENDING)
+    
+    async def read_messages():
+        try:
+            while True:
+                message = await websocket.receive_text()
+                if len(message) > settings.STREAM_MAX_MESSAGE_SIZE:
+                    await websocket.close(code=1009, reason="Message too large")
+                    break
+                # Blocks while the queue is full, which pushes back on the client
+                await pending.put(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await pending.put(None)
+    
+    reader = asyncio.create_task(read_messages())
+    # A message that did not fit in the previous batch starts the next one
+    carry: Optional[str] = None
+    try:
+        closed = False
+        while not closed:
+            message = carry if carry is not None else await pending.get()
+            carry = None
+            batch = []
+            lines = 0
+            while message is not None:
+                batch.append(message)
+                lines += count_lines(message)
+                if len(batch) >= settings.STREAM_BATCH_MESSAGES or pending.empty():
+                    break
+                message = pending.get_nowait()
+                if message is not None and lines + count_lines(message) > settings.STREAM_BATCH_LINES:
+                    carry = message
+                    break
+            closed = message is None
+            
+            if batch:
+                # Parsing and scoring run off the event loop
+                replies = await run_in_threadpool(stream_prediction_service.score_messages, batch)
+                for reply in replies:
+                    await websocket.send_text(reply)
+    except (WebSocketDisconnect, RuntimeError):
+        # Client went away while we were replying
+        pass
+    finally:
+        reader.cancel()
+        stream_prediction_service.disconnect()
+
+
 @router.get(
     "/clusters",
     response_model=List[ClusterStats],
@@ -89,6 +276,39 @@ async def get_cluster_info():
         )
 
 
+@router.get(
+    "/clusters/map",
+    response_model=SegmentMapResponse,
+    summary="Get segment map",
+    description="Get the run-length encoded cluster map over the income x spending-score plane"
+)
+async def get_segment_map(
+    request: Request,
+    income_step: float = Query(0.5, ge=0.25, le=10.0, description="Income resolution in $k per pixel")
+):
+    """
+    Decision regions of the loaded model, computed once per model version
+    """
+    try:
+        model_version, body = segment_map_service.get_map_json(income_step)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Model not available: {str(e)}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error building segment map: {str(e)}"
+        )
+    
+    etag = f'"{model_version}-{income_step}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get(
     "/model/info",
     response_model=ModelInfo,
@@ -109,6 +329,19 @@ async def get_model_info():
         )
 
 
+@router.get(
+    "/model/shadow",
+    response_model=ShadowReport,
+    summary="Get shadow model comparison",
+    description="Agreement between the active model and the shadow candidate on sampled /predict traffic"
+)
+async def get_shadow_report():
+    """
+    Active x candidate cluster agreement collected so far
+    """
+    return shadow_service.get_report()
+
+
 @router.get(
     "/health",
     summary="Health check",
@@ -0,0 +1,215 @@
+"""
+Job Controllers - Asynchronous scoring job endpoints
+Submit large scoring work, poll its progress and download the results
+"""
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from starlette.datastructures import UploadFile
+from starlette.types import Message
+
+from app.schemas.job import JobDatasetRequest, JobResponse
+from app.services.job_service import job_service, Job, JobQueueFull, DATASETS
+from app.core.config import settings
+
+
+# Create jobs router
+router = APIRouter(prefix=f"{settings.API_PREFIX}/jobs", tags=["Scoring Jobs"])
+
+
+def _job_response(job: Job) -> JobResponse:
+    status_url = f"{settings.API_PREFIX}/jobs/{job.job_id}"
+    return JobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        source=job.source,
+        progress=round(job.progress, 4),
+        rows_total=job.rows_total,
+        rows_done=job.rows_done,
+        rows_invalid=job.rows_invalid,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        error=job.error,
+        status_url=status_url,
+        result_url=f"{status_url}/result" if job.status == "succeeded" else None
+    )
+
+
+def _accepted(job: Job, response: Response) -> JobResponse:
+    body = _job_response(job)
+    response.headers["Location"] = body.status_url
+    return body
+
+
+def _queue_full(e: JobQueueFull) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Job queue is full: {str(e)}",
+        headers={"Retry-After": "30"}
+    )
+
+
+def _limit_upload(request: Request, limit: int) -> Request:
+    """
+    Wrap a request so that receiving more than limit body bytes raises 413
+    
+    Multipart uploads are spooled to disk while they are parsed, so the limit
+    has to be enforced while the body arrives rather than after the form is
+    built. A declared Content-Length over the limit is rejected without reading.
+    """
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Upload larger than {limit} bytes"
+    )
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise too_large
+    
+    size = 0
+    
+    async def receive() -> Message:
+        nonlocal size
+        message = await request.receive()
+        size += len(message.get("body", b""))
+        if size > limit:
+            raise too_large
+        return message
+    
+    return Request(request.scope, receive)
+
+
+@router.post(
+    "",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a CSV scoring job",
+    description="Upload a CSV with income and spending score columns; returns a job id to poll",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"]
+                    }
+                }
+            }
+        }
+    }
+)
+async def submit_file_job(request: Request, response: Response):
+    """
+    Queue scoring of an uploaded CSV
+    
+    The CSV needs an `Annual_Income` and a `Spending_Score` column (the raw
+    dataset's column names are accepted too). All other columns are kept.
+    Uploads larger than JOB_MAX_UPLOAD_BYTES are rejected with 413.
+    """
+    form = await _limit_upload(request, settings.JOB_MAX_UPLOAD_BYTES).form()
+    file = form.get("file")
+    if not isinstance(file, UploadFile):
+        await form.close()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Multipart field 'file' with a CSV upload is required"
+        )
+    
+    try:
+        job = await run_in_threadpool(job_service.submit_file, file.file, file.filename or "upload.csv")
+    except JobQueueFull as e:
+        raise _queue_full(e)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        # The job (if created) is already marked failed
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Upload failed: {str(e)}"
+        )
+    finally:
+        await form.close()
+    return _accepted(job, response)
+
+
+@router.post(
+    "/dataset",
+    response_model=JobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a dataset scoring job",
+    description="Score a server-side dataset by reference; returns a job id to poll"
+)
+async def submit_dataset_job(request: JobDatasetRequest, response: Response):
+    """
+    Queue scoring of a named dataset
+    """
+    try:
+        job = await run_in_threadpool(job_service.submit_dataset, request.dataset)
+    except KeyError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unknown dataset '{request.dataset}'. Available: {', '.join(DATASETS)}"
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dataset not available: {str(e)}"
+        )
+    except JobQueueFull as e:
+        raise _queue_full(e)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    return _accepted(job, response)
+
+
+@router.get(
+    "/{job_id}",
+    response_model=JobResponse,
+    summary="Get job status",
+    description="Get the status and progress of a scoring job"
+)
+async def get_job(job_id: str):
+    """
+    Poll a scoring job
+    """
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or expired"
+        )
+    return _job_response(job)
+
+
+@router.get(
+    "/{job_id}/result",
+    response_class=FileResponse,
+    summary="Download job result",
+    description="Download the scored CSV of a finished job"
+)
+async def get_job_result(job_id: str):
+    """
+    Download the result of a succeeded job
+    """
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found or expired"
+        )
+    
+    path = job_service.result_path(job_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status}, no result available"
+        )
+    return FileResponse(path, media_type="text/csv", filename=f"scores-{job_id}.csv")
@@ -2,11 +2,16 @@
 View Controllers - Handle HTML template rendering
 Serves the web interface
 """
-from fastapi import APIRouter, Request
+import threading
+from typing import Callable, Dict, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 
+from app.core.compression import PrecompressedBody, etag_matches, precompress
 from app.core.config import settings
+from app.core.static_assets import static_assets, IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
 from app.models.ml_model import ml_model
 
 
@@ -15,6 +20,57 @@ router = APIRouter(tags=["Web Interface"])
 
 # Setup templates
 templates = Jinja2Templates(directory=str(settings.BASE_DIR / "app" / "templates"))
+templates.env.globals["static_url"] = static_assets.url
+
+# Rendered pages: template name -> (cache key, encoded page)
+_page_cache: Dict[str, Tuple[tuple, PrecompressedBody]] = {}
+_page_lock = threading.Lock()
+
+
+def _page_key() -> tuple:
+    """Everything the rendered pages depend on"""
+    return (ml_model.model_version, ml_model.is_loaded, ml_model.dtype, static_assets.version)
+
+
+def _render_cached(name: str, context: Callable[[], dict]) -> PrecompressedBody:
+    """
+    Render a template once per model version and keep it precompressed
+
+    Args:
+        name: Template file name
+        context: Builds the template context on a cache miss
+
+    Returns:
+        PrecompressedBody of the rendered page
+    """
+    key = _page_key()
+    with _page_lock:
+        cached = _page_cache.get(name)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    page = precompress(templates.get_template(name).render(**context()).encode("utf-8"))
+    with _page_lock:
+        _page_cache[name] = (key, page)
+    return page
+
+
+def _cached_response(request: Request, content: PrecompressedBody, media_type: str, cache_control: str) -> Response:
+    """
+    Serve a precompressed body, answering 304 when the client's copy is current
+
+    Each encoding has its own ETag, so a cache never revalidates one
+    encoding's bytes against another's validator.
+    """
+    encoding, body = content.select(request.headers.get("accept-encoding", ""))
+    etag = content.etag_for(encoding)
+    headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
 
 
 @router.get("/", response_class=HTMLResponse, summary="Home page")
@@ -22,15 +78,12 @@ async def home(request: Request):
     """
     Render the main application page
     """
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "app_name": settings.APP_NAME,
-            "app_version": settings.APP_VERSION,
-            "model_loaded": ml_model.is_loaded
-        }
-    )
+    page = _render_cached("index.html", lambda: {
+        "app_name": settings.APP_NAME,
+        "app_version": settings.APP_VERSION,
+        "model_loaded": ml_model.is_loaded
+    })
+    return _cached_response(request, page, "text/html; charset=utf-8", REVALIDATE_CACHE_CONTROL)
 
 
 @router.get("/about", response_class=HTMLResponse, summary="About page")
@@ -38,15 +91,25 @@ async def about(request: Request):
     """
     Render the about page with model information
     """
-    model_info = ml_model.get_model_info()
-    cluster_names = settings.CLUSTER_NAMES
-    
-    return templates.TemplateResponse(
-        "about.html",
-        {
-            "request": request,
-            "app_name": settings.APP_NAME,
-            "model_info": model_info,
-            "cluster_names": cluster_names
-        }
-    )
+    page = _render_cached("about.html", lambda: {
+        "app_name": settings.APP_NAME,
+        "model_info": ml_model.get_model_info(),
+        "cluster_names": settings.CLUSTER_NAMES
+    })
+    return _cached_response(request, page, "text/html; charset=utf-8", REVALIDATE_CACHE_CONTROL)
+
+
+@router.api_route("/static/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def static_file(request: Request, path: str):
+    """
+    Serve a static asset from memory
+
+    Fingerprinted URLs (from static_url in templates) are cached for a year;
+    plain URLs are revalidated with their ETag.
+    """
+    asset, fingerprinted = static_assets.lookup(path)
+    if asset is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    cache_control = IMMUTABLE_CACHE_CONTROL if fingerprinted else REVALIDATE_CACHE_CONTROL
+    return _cached_response(request, asset.content, asset.content_type, cache_control)
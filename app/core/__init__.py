@@ -1,4 +1,5 @@
 """Core application components"""
 from .config import settings
+from .compression import CompressionMiddleware
 
-__all__ = ["settings"]
+__all__ = ["settings", "CompressionMiddleware"]
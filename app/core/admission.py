@@ -0,0 +1,242 @@
+"""
+Admission control and load shedding
+Bounds in-flight requests per route class and rejects early when the queue is too long
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+
+@dataclass
+class RouteClass:
+    """Limits and live state of one class of routes"""
+    name: str
+    max_in_flight: int
+    max_queue: int
+    wait_budget: float  # seconds a request may wait for a slot
+    priority: int  # lower value is served first
+    in_flight: int = 0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+    service_time: float = 0.01  # EWMA of seconds per request
+    admitted: int = 0
+    rejected: int = 0
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed; carries the Retry-After hint in seconds"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Overloaded, retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Priority-aware admission control
+
+    Each route class has its own in-flight limit and queue, and all classes
+    share a global in-flight limit. Freed slots go to the highest-priority
+    waiter, and lower-priority requests are shed rather than queued while a
+    higher-priority class is waiting.
+    """
+
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, route_classes: Dict[str, Dict], max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.classes: Dict[str, RouteClass] = {
+            name: RouteClass(name=name, **config) for name, config in route_classes.items()
+        }
+        self._by_priority = sorted(self.classes.values(), key=lambda c: c.priority)
+
+    def _has_capacity(self, route_class: RouteClass) -> bool:
+        return route_class.in_flight < route_class.max_in_flight and self.in_flight < self.max_in_flight
+
+    def estimate_wait(self, route_class: RouteClass) -> float:
+        """
+        Estimate how long a new request of this class would queue
+
+        Args:
+            route_class: Target route class
+
+        Returns:
+            Expected wait in seconds
+        """
+        if self._has_capacity(route_class) and not route_class.waiters:
+            return 0.0
+        ahead = len(route_class.waiters) + 1
+        return math.ceil(ahead / max(route_class.max_in_flight, 1)) * route_class.service_time
+
+    def _higher_priority_waiting(self, route_class: RouteClass) -> bool:
+        return any(
+            other.waiters for other in self._by_priority
+            if other.priority < route_class.priority
+        )
+
+    async def acquire(self, name: str) -> None:
+        """
+        Take a slot for a request, waiting within the class budget
+
+        Args:
+            name: Route class name
+
+        Raises:
+            Overloaded: If the request is shed
+        """
+        route_class = self.classes[name]
+
+        if self._has_capacity(route_class) and not route_class.waiters \
+                and not self._higher_priority_waiting(route_class):
+            self._grant(route_class)
+            return
+
+        wait = self.estimate_wait(route_class)
+        if len(route_class.waiters) >= route_class.max_queue \
+                or wait > route_class.wait_budget \
+                or self._higher_priority_waiting(route_class):
+            route_class.rejected += 1
+            raise Overloaded(max(wait, route_class.service_time))
+
+        waiter = asyncio.get_running_loop().create_future()
+        route_class.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=route_class.wait_budget)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                # Granted at the deadline; keep the slot
+                return
+            waiter.cancel()
+            route_class.rejected += 1
+            raise Overloaded(self.estimate_wait(route_class))
+        finally:
+            if waiter in route_class.waiters:
+                route_class.waiters.remove(waiter)
+
+    def _grant(self, route_class: RouteClass) -> None:
+        route_class.in_flight += 1
+        route_class.admitted += 1
+        self.in_flight += 1
+
+    def release(self, name: str, elapsed: float) -> None:
+        """
+        Return a slot and hand it to the highest-priority waiter
+
+        Args:
+            name: Route class name
+            elapsed: Time the request held its slot, in seconds
+        """
+        route_class = self.classes[name]
+        route_class.in_flight -= 1
+        self.in_flight -= 1
+        route_class.service_time += self.EWMA_ALPHA * (elapsed - route_class.service_time)
+
+        for candidate in self._by_priority:
+            while candidate.waiters and self._has_capacity(candidate):
+                waiter = candidate.waiters.popleft()
+                if not waiter.done():
+                    self._grant(candidate)
+                    waiter.set_result(None)
+            if candidate.waiters:
+                # Do not let lower priorities jump the queue
+                break
+
+    def snapshot(self) -> Dict:
+        """
+        Get the current admission state
+
+        Returns:
+            Dictionary with global and per-class counters
+        """
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "classes": {
+                c.name: {
+                    "in_flight": c.in_flight,
+                    "queued": len(c.waiters),
+                    "service_time_ms": round(c.service_time * 1000, 3),
+                    "admitted": c.admitted,
+                    "rejected": c.rejected
+                }
+                for c in self._by_priority
+            }
+        }
+
+
+def classify_route(path: str, routes: Dict[str, str]) -> Optional[str]:
+    """
+    Map a request path to its route class by longest matching prefix
+
+    Args:
+        path: Request path
+        routes: Path prefix -> route class name
+
+    Returns:
+        Route class name, or None if the path is not admission-controlled
+    """
+    best, best_len = None, -1
+    for prefix, name in routes.items():
+        if (path == prefix or path.startswith(prefix.rstrip("/") + "/")) and len(prefix) > best_len:
+            best, best_len = name, len(prefix)
+    return best
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware applying the admission controller to HTTP requests
+
+    Shed requests get 503 with a Retry-After header before any work is done.
+    """
+
+    def __init__(self, app: ASGIApp, controller: "AdmissionController", routes: Dict[str, str]) -> None:
+        self.app = app
+        self.controller = controller
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = classify_route(scope["path"], self.routes) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(name)
+        except Overloaded as e:
+            await self._reject(send, e.retry_after)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name, time.perf_counter() - start)
+
+    @staticmethod
+    async def _reject(send: Send, retry_after: float) -> None:
+        body = b'{"detail":"Server is overloaded, please retry later"}'
+        start: Message = {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        }
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global admission controller instance
+admission_controller = AdmissionController(
+    settings.ADMISSION_ROUTE_CLASSES,
+    settings.ADMISSION_MAX_IN_FLIGHT
+)
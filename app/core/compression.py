@@ -0,0 +1,302 @@
+"""
+Response compression middleware
+Content-negotiated gzip/deflate (and brotli when installed) with streaming support
+"""
+import gzip
+import hashlib
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+
+# Content types that are already compressed or must not be delayed
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/png",
+    "image/jpeg",
+    "image/gif",
+    "image/webp",
+    "application/zip",
+    "application/gzip",
+    "application/octet-stream",
+)
+
+
+class _Compressor:
+    """Incremental encoder for one response body"""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=min(level, 11))
+        else:
+            # wbits 31 = gzip container, 15 = zlib container (HTTP "deflate")
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31 if encoding == "gzip" else 15)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """
+        Compress a chunk, flushing so the peer can decode it immediately
+
+        Args:
+            data: Raw chunk
+            final: True for the last chunk of the body
+
+        Returns:
+            Compressed bytes for this chunk
+        """
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def supported_encodings() -> List[str]:
+    """Encodings this server can produce, in order of preference"""
+    return (["br"] if brotli is not None else []) + ["gzip", "deflate"]
+
+
+def negotiate_encoding(accept_encoding: str, available: Sequence[str]) -> Optional[str]:
+    """
+    Pick the response encoding from an Accept-Encoding header
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header value
+        available: Encodings the server supports, most preferred first
+
+    Returns:
+        Chosen encoding, or None to send the body uncompressed
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+# One entity-tag in an If-None-Match list (commas may appear inside the quotes)
+_ENTITY_TAG = re.compile(r'(?:W/)?"[^"]*"')
+
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """
+    ETag of one content-coding of a representation
+
+    Strong validators must differ between encodings, so the encoding is
+    appended inside the quotes ('"abc"' -> '"abc-gzip"').
+
+    Args:
+        etag: ETag of the identity (uncompressed) body
+        encoding: Content-coding, or None for identity
+
+    Returns:
+        ETag for that encoding
+    """
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against the selected representation
+
+    Uses the weak comparison If-None-Match calls for: "W/" prefixes are
+    ignored and "*" matches any current representation.
+
+    Args:
+        if_none_match: Raw If-None-Match header value (may be None)
+        etag: ETag of the representation that would be sent
+
+    Returns:
+        True when the client's copy is current (answer 304)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(
+        (tag[2:] if tag.startswith("W/") else tag) == opaque
+        for tag in _ENTITY_TAG.findall(if_none_match)
+    )
+
+
+@dataclass
+class PrecompressedBody:
+    """A response body encoded once up front, with a strong ETag per encoding"""
+    body: bytes
+    etag: str  # identity body; see etag_for for the encoded variants
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """ETag of the variant sent for an encoding (None for identity)"""
+        return encoded_etag(self.etag, encoding)
+
+    def select(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        """
+        Pick the best stored variant for an Accept-Encoding header
+
+        Args:
+            accept_encoding: Raw Accept-Encoding header value
+
+        Returns:
+            Tuple of (encoding or None for identity, body bytes)
+        """
+        encoding = negotiate_encoding(accept_encoding, list(self.variants))
+        if encoding is None:
+            return None, self.body
+        return encoding, self.variants[encoding]
+
+
+def precompress(body: bytes, minimum_size: int = 256) -> PrecompressedBody:
+    """
+    Encode a body with every supported encoding at maximum compression
+
+    Variants that are not smaller than the original are dropped.
+
+    Args:
+        body: Raw bytes
+        minimum_size: Bodies smaller than this are not compressed
+
+    Returns:
+        PrecompressedBody with an ETag derived from the raw bytes
+    """
+    etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+    variants: Dict[str, bytes] = {}
+    if len(body) >= minimum_size:
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+        # mtime=0 keeps the output byte-identical across builds
+        variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+    return PrecompressedBody(
+        body=body,
+        etag=etag,
+        variants={name: data for name, data in variants.items() if len(data) < len(body)}
+    )
+
+
+class CompressionMiddleware:
+    """
+    Compress HTTP responses according to the client's Accept-Encoding
+
+    Buffered responses smaller than ``minimum_size`` are sent as-is. Streamed
+    responses are compressed and flushed chunk by chunk, never buffered whole.
+    Strong ETags on compressed responses are made weak. Range requests and
+    partial responses are never compressed: Content-Range counts identity
+    bytes, so compressing would make it describe bytes the client never gets.
+    Paths in ``excluded_paths`` bypass the middleware entirely.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        compresslevel: int = 6,
+        excluded_paths: Sequence[str] = ()
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.excluded_paths = tuple(excluded_paths)
+        self.available = supported_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""), self.available)
+        if encoding is None or "range" in request_headers:
+            await self.app(scope, receive, send)
+            return
+
+        initial: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal initial, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                    or "content-range" in headers
+                    or headers.get("content-type", "").startswith(EXCLUDED_CONTENT_TYPES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # Hold the headers until the first body chunk shows the size
+                    initial = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if initial is not None:
+                start, initial = initial, None
+                headers = MutableHeaders(raw=start["headers"])
+                headers.add_vary_header("Accept-Encoding")
+
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.compresslevel)
+                body = compressor.compress(body, final=not more_body)
+                headers["Content-Encoding"] = encoding
+                # The encoded bytes differ from the ones the strong validator
+                # describes; downgrade it like the identity-only ETag it is
+                etag = headers.get("etag")
+                if etag is not None and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                # Ranges are served on the identity bytes only
+                if "accept-ranges" in headers:
+                    del headers["Accept-Ranges"]
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                return
+
+            body = compressor.compress(body, final=not more_body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -3,6 +3,7 @@ Application configuration settings
 """
 from pydantic_settings import BaseSettings
 from pathlib import Path
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -25,10 +26,85 @@ class Settings(BaseSettings):
     KMEANS_MODEL_PATH: str = str(MODEL_DIR / "kmeans_model.pkl")
     SCALER_MODEL_PATH: str = str(MODEL_DIR / "scaler.pkl")
     PROCESSED_DATA_PATH: str = str(DATA_DIR / "processed" / "mall_customers_processed.csv")
+    MODEL_FLOAT32: bool = False  # float32 centroid math, enabled only if training assignments match float64
+    
+    # Shadow model (candidate scored on sampled /predict traffic)
+    SHADOW_MODEL_DIR: Optional[str] = None  # directory with kmeans_model.pkl and scaler.pkl
+    SHADOW_SAMPLE_RATE: float = 0.1
+    SHADOW_QUEUE_SIZE: int = 10_000
+    SHADOW_BATCH_SIZE: int = 512
+    
+    # Data pipeline
+    RAW_DATA_PATH: str = str(DATA_DIR / "raw" / "mall_customers.csv")
+    DATA_CACHE_DIR: str = str(DATA_DIR / "cache")
+    
+    # Scoring jobs
+    JOBS_DIR: str = str(DATA_DIR / "jobs")
+    JOB_WORKERS: int = 2
+    JOB_MAX_PENDING: int = 16  # queued + running jobs before submissions get 503
+    JOB_CHUNK_ROWS: int = 100_000
+    JOB_RETENTION_SECONDS: int = 24 * 3600
+    JOB_MAX_RETAINED: int = 100  # finished jobs kept on disk
+    JOB_CLEANUP_INTERVAL_SECONDS: int = 300  # how often retention is enforced while idle
+    JOB_MAX_UPLOAD_BYTES: int = 512 * 1024 * 1024  # checked while the upload is received
+    
+    # Columnar bulk predictions
+    BULK_MAX_ROWS: int = 100_000
+    BULK_MAX_BODY_BYTES: int = 8 * 1024 * 1024  # checked before the body is parsed
+    BULK_MAX_ERRORS: int = 100  # row errors described per response
+    
+    # Segment analytics band lower bounds (the last band is open-ended)
+    ANALYTICS_AGE_BANDS: list = [18, 25, 35, 45, 55, 65]
+    ANALYTICS_INCOME_BANDS: list = [0, 30, 60, 90, 120]  # $k
+    
+    # Streaming predictions (WebSocket)
+    STREAM_MAX_MESSAGE_SIZE: int = 64 * 1024  # characters per message
+    STREAM_MAX_PENDING: int = 64  # queued messages per connection before reads pause
+    STREAM_BATCH_MESSAGES: int = 32  # queued messages scored in one model call
+    STREAM_BATCH_LINES: int = 20_000  # lines scored in one model call (a larger single message goes alone)
+    STREAM_MAX_CONNECTIONS: int = 32  # open streams per worker; more are closed with code 1013
+    
+    # Admin diagnostics (disabled unless a token is set)
+    ADMIN_TOKEN: Optional[str] = None
+    DIAGNOSTICS_TRACE_FRAMES: int = 1  # stack frames kept per tracemalloc allocation
     
     # CORS
     ALLOWED_ORIGINS: list = ["*"]
     
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller buffered bodies are sent as-is
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_EXCLUDED_PATHS: list = ["/api/v1/predict"]
+    
+    # Admission control
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 64  # shared by all route classes
+    ADMISSION_ROUTE_CLASSES: dict = {
+        # priority: lower is served first; wait_budget in seconds
+        "predict": {"max_in_flight": 64, "max_queue": 512, "wait_budget": 0.25, "priority": 0},
+        "bulk": {"max_in_flight": 4, "max_queue": 16, "wait_budget": 2.0, "priority": 1},
+        "heavy": {"max_in_flight": 4, "max_queue": 16, "wait_budget": 1.0, "priority": 1}
+    }
+    # Path prefix -> route class (longest prefix wins; unlisted paths are not limited)
+    ADMISSION_ROUTES: dict = {
+        "/api/v1/predict": "predict",
+        "/api/v1/predict/bulk": "bulk",
+        "/api/v1/clusters": "heavy",
+        "/api/v1/segments": "heavy"
+    }
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000  # records beyond this are dropped, never waited on
+    LOG_SLOW_REQUEST_MS: float = 250.0  # always log requests slower than this
+    LOG_SAMPLE_RATES: dict = {
+        # Path prefix -> fraction of successful requests to log
+        "/api/v1/predict": 0.01,
+        "/api/v1/predict/bulk": 1.0,
+        "/static": 0.0
+    }
+    
     # Cluster Names
     CLUSTER_NAMES: dict = {
         0: 'Average Customer',
@@ -0,0 +1,181 @@
+"""
+Runtime memory diagnostics
+Process memory, per-component sizes and tracemalloc allocation snapshots
+"""
+import gc
+import resource
+import sys
+import threading
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """
+    Read the resident memory of this process
+
+    Returns:
+        Dictionary with rss_bytes, peak_rss_bytes and virtual_bytes
+        (rss_bytes is None where /proc is unavailable)
+    """
+    fields = {"VmRSS": "rss_bytes", "VmHWM": "peak_rss_bytes", "VmSize": "virtual_bytes"}
+    memory: Dict[str, Optional[int]] = {name: None for name in fields.values()}
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    # Values are reported in kB
+                    memory[fields[key]] = int(value.split()[0]) * 1024
+    except OSError:
+        # ru_maxrss is in kB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory["peak_rss_bytes"] = peak if sys.platform == "darwin" else peak * 1024
+    return memory
+
+
+class MemoryDiagnostics:
+    """
+    Registry of memory-holding components plus tracemalloc snapshots
+
+    Components register a callable returning a dictionary of sizes; the
+    callables are only invoked when a report is requested. tracemalloc is
+    started on the first allocation report and keeps the previous snapshot
+    so the next report can be diffed against it.
+    """
+
+    def __init__(self, trace_frames: int = 1):
+        self.trace_frames = trace_frames
+        self._components: Dict[str, Callable[[], Dict]] = {}
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def register(self, name: str, report: Callable[[], Dict]) -> None:
+        """
+        Register a component
+
+        Args:
+            name: Component name in reports
+            report: Callable returning the component's sizes
+        """
+        self._components[name] = report
+
+    def components(self) -> Dict[str, Dict]:
+        """
+        Collect the sizes of all registered components
+
+        Returns:
+            Component name -> its report (or the error raised while collecting it)
+        """
+        reports = {}
+        for name, report in self._components.items():
+            try:
+                reports[name] = report()
+            except Exception as e:
+                reports[name] = {"error": str(e)}
+        return reports
+
+    @staticmethod
+    def is_tracing() -> bool:
+        return tracemalloc.is_tracing()
+
+    def stop_tracing(self) -> None:
+        """Stop tracemalloc and drop the stored snapshot"""
+        with self._lock:
+            tracemalloc.stop()
+            self._previous = None
+
+    def allocations(self, limit: int = 20, diff: bool = False, group_by: str = "lineno") -> Dict:
+        """
+        Report the top allocation sites
+
+        Args:
+            limit: Number of entries to return
+            diff: Compare against the snapshot taken by the previous call
+            group_by: "lineno", "filename" or "traceback"
+
+        Returns:
+            Dictionary with tracing state, traced totals and the top entries
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.trace_frames)
+                # Baseline for the first diff
+                self._previous = self._take_snapshot()
+                return {
+                    "tracing": True,
+                    "started": True,
+                    "detail": "tracemalloc started; allocations are tracked from now on",
+                    "top": []
+                }
+
+            gc.collect()
+            snapshot = self._take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            previous, self._previous = self._previous, snapshot
+
+        if diff and previous is not None:
+            stats = snapshot.compare_to(previous, group_by)
+            top = [
+                {
+                    "location": self._location(stat.traceback),
+                    "size_bytes": stat.size,
+                    "size_diff_bytes": stat.size_diff,
+                    "count": stat.count,
+                    "count_diff": stat.count_diff
+                }
+                for stat in stats[:limit]
+            ]
+        else:
+            top = [
+                {
+                    "location": self._location(stat.traceback),
+                    "size_bytes": stat.size,
+                    "count": stat.count
+                }
+                for stat in snapshot.statistics(group_by)[:limit]
+            ]
+
+        return {
+            "tracing": True,
+            "started": False,
+            "diff": bool(diff and previous is not None),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "top": top
+        }
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+
+    @staticmethod
+    def _location(traceback: tracemalloc.Traceback) -> List[str]:
+        return [f"{frame.filename}:{frame.lineno}" for frame in traceback]
+
+    def report(self) -> Dict:
+        """
+        Full memory report without allocation tracing
+
+        Returns:
+            Dictionary with process memory, GC counters and component sizes
+        """
+        return {
+            "process": process_memory(),
+            "gc": {
+                "counts": list(gc.get_count()),
+                "tracked_objects": len(gc.get_objects())
+            },
+            "components": self.components(),
+            "tracemalloc": self.is_tracing()
+        }
+
+
+# Global diagnostics instance
+memory_diagnostics = MemoryDiagnostics(settings.DIAGNOSTICS_TRACE_FRAMES)
@@ -0,0 +1,143 @@
+"""
+Fingerprinted static assets
+Content-hash URLs, precompressed variants and cache headers for app/static
+"""
+import hashlib
+import mimetypes
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from app.core.compression import PrecompressedBody, precompress
+from app.core.config import settings
+
+
+# Cache-Control for content-addressed URLs and for plain (mutable) URLs
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Only text-like assets are worth precompressing
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+@dataclass
+class StaticAsset:
+    """One file under the static directory"""
+    path: str  # relative to the static directory, e.g. "css/style.css"
+    fingerprinted_path: str  # e.g. "css/style.3b1f0c9a2e.css"
+    content_type: str
+    content: PrecompressedBody
+
+
+def fingerprint_path(path: str, digest: str) -> str:
+    """Insert a content digest before the file extension"""
+    relative = Path(path)
+    return str(relative.with_name(f"{relative.stem}.{digest}{relative.suffix}"))
+
+
+class StaticAssets:
+    """
+    In-memory manifest of the static directory
+
+    Every file is read, hashed and precompressed once. Templates link to the
+    fingerprinted URL, which can be cached forever; the plain URL keeps
+    working with revalidation.
+    """
+
+    def __init__(self, directory: Path, url_prefix: str = "/static", digest_size: int = 10):
+        self.directory = Path(directory)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.digest_size = digest_size
+        self._by_path: Dict[str, Tuple[StaticAsset, bool]] = {}
+        self._assets: Dict[str, StaticAsset] = {}
+        self._lock = threading.Lock()
+        self.version: Optional[str] = None
+
+    def build(self) -> int:
+        """
+        Scan the static directory and rebuild the manifest
+
+        Returns:
+            Number of assets
+        """
+        assets: Dict[str, StaticAsset] = {}
+        by_path: Dict[str, Tuple[StaticAsset, bool]] = {}
+        manifest_digest = hashlib.sha256()
+
+        for file_path in sorted(p for p in self.directory.rglob("*") if p.is_file()):
+            relative = file_path.relative_to(self.directory).as_posix()
+            data = file_path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()[:self.digest_size]
+            content_type = mimetypes.guess_type(relative)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type == "application/javascript":
+                content_type += "; charset=utf-8"
+
+            if content_type.startswith(COMPRESSIBLE_TYPES):
+                content = precompress(data)
+            else:
+                content = PrecompressedBody(body=data, etag=f'"{digest}"')
+
+            asset = StaticAsset(
+                path=relative,
+                fingerprinted_path=fingerprint_path(relative, digest),
+                content_type=content_type,
+                content=content
+            )
+            assets[relative] = asset
+            by_path[relative] = (asset, False)
+            by_path[asset.fingerprinted_path] = (asset, True)
+            manifest_digest.update(f"{relative}:{digest}\n".encode())
+
+        with self._lock:
+            self._assets = assets
+            self._by_path = by_path
+            self.version = manifest_digest.hexdigest()[:12]
+        return len(assets)
+
+    def _ensure_built(self) -> None:
+        if self.version is None:
+            self.build()
+
+    def url(self, path: str) -> str:
+        """
+        URL of an asset, fingerprinted when the file is known
+
+        Args:
+            path: Path relative to the static directory
+
+        Returns:
+            URL path for templates
+        """
+        self._ensure_built()
+        path = path.lstrip("/")
+        asset = self._assets.get(path)
+        return f"{self.url_prefix}/{asset.fingerprinted_path if asset else path}"
+
+    def lookup(self, path: str) -> Tuple[Optional[StaticAsset], bool]:
+        """
+        Find the asset for a request path
+
+        Args:
+            path: Path relative to the static directory (plain or fingerprinted)
+
+        Returns:
+            Tuple of (asset or None, whether the path is fingerprinted)
+        """
+        self._ensure_built()
+        return self._by_path.get(path.lstrip("/"), (None, False))
+
+    def memory_usage(self) -> Dict:
+        """Number and total size of the assets held in memory"""
+        assets = list(self._assets.values())
+        return {
+            "assets": len(assets),
+            "bytes": sum(
+                len(a.content.body) + sum(len(v) for v in a.content.variants.values())
+                for a in assets
+            )
+        }
+
+
+# Global static asset manifest
+static_assets = StaticAssets(settings.BASE_DIR / "app" / "static")
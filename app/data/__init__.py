@@ -0,0 +1,14 @@
+"""Data pipeline - Preprocessing and columnar dataset cache"""
+from .preprocessing import (
+    ProcessedDataset,
+    build_processed_cache,
+    load_processed_dataset,
+    dataset_store
+)
+
+__all__ = [
+    "ProcessedDataset",
+    "build_processed_cache",
+    "load_processed_dataset",
+    "dataset_store"
+]
@@ -0,0 +1,412 @@
+"""
+Processed dataset pipeline
+Turns the raw customer CSV into a typed, columnar, memory-mapped cache
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.utils.helpers import touch
+
+
+# Bump when the on-disk layout or the preprocessing steps change
+CACHE_FORMAT_VERSION = 1
+
+# Raw column -> processed column (same steps as 01_eda_preprocessing.ipynb)
+RAW_COLUMN_MAP = {
+    'Gender': 'Gender',
+    'Age': 'Age',
+    'Annual Income (k$)': 'Annual_Income',
+    'Spending Score (1-100)': 'Spending_Score'
+}
+
+# Storage dtype of each processed column
+COLUMN_DTYPES = {
+    'Gender': np.int8,
+    'Age': np.int16,
+    'Annual_Income': np.int32,
+    'Spending_Score': np.int16
+}
+
+# Gender label encoding (matches sklearn LabelEncoder's sorted classes)
+GENDER_CATEGORIES = ['Female', 'Male']
+
+FEATURE_COLUMNS = ['Annual_Income', 'Spending_Score']
+
+POINTER_PREFIX = "current-"
+MANIFEST_FILE = "manifest.json"
+CHUNK_ROWS = 1_000_000
+
+# Sources whose cache is kept side by side; the least recently used beyond
+# this are dropped
+CACHE_MAX_SOURCES = 4
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 digest of a file without loading it into memory
+
+    Args:
+        path: File to hash
+        block_size: Read size in bytes
+
+    Returns:
+        Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def count_data_rows(path: Path, block_size: int = 1 << 20) -> int:
+    """
+    Count CSV data rows (lines minus header) with a raw byte scan
+
+    Trailing blank lines are not counted. Blank lines elsewhere and quoted
+    fields spanning lines are, so the result is an upper bound on the records
+    pandas parses.
+    """
+    lines = 0
+    last = b''
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            lines += block.count(b'\n')
+            last = block
+    content = last.rstrip(b'\r\n')
+    if len(content) < len(last):
+        # Newlines after the last record: one ends it, the rest are blank lines
+        lines -= last[len(content):].count(b'\n') - (1 if content else 0)
+    elif last:
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def _source_stat(path: Path) -> Dict:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _read_json(path: Path) -> Optional[Dict]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_json_atomic(path: Path, payload: Dict) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _pointer_path(cache_dir: Path, raw_path: Path) -> Path:
+    """Pointer file of one source; every source gets its own"""
+    key = hashlib.sha256(str(raw_path).encode()).hexdigest()[:12]
+    return cache_dir / f"{POINTER_PREFIX}{key}.json"
+
+
+def _prune_cache(cache_dir: Path, keep_pointer: Path, max_sources: int) -> None:
+    """
+    Drop the least recently used sources and every version no pointer references
+
+    Args:
+        cache_dir: Cache root directory
+        keep_pointer: Pointer of the source just built, never dropped
+        max_sources: Sources kept side by side
+    """
+    # Pointer of the single-source layout
+    (cache_dir / "current.json").unlink(missing_ok=True)
+
+    pointers = sorted(
+        cache_dir.glob(f"{POINTER_PREFIX}*.json"),
+        key=lambda path: path.stat().st_mtime_ns,
+        reverse=True
+    )
+    kept = [keep_pointer] + [path for path in pointers if path != keep_pointer][:max(max_sources - 1, 0)]
+    for path in pointers:
+        if path not in kept:
+            path.unlink(missing_ok=True)
+
+    live = {(_read_json(path) or {}).get("version") for path in kept}
+    # Open memory maps of dropped versions stay valid on POSIX
+    for entry in cache_dir.iterdir():
+        if entry.is_dir() and entry.name not in live and not entry.name.startswith('.'):
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def preprocess_chunk(raw: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Apply the preprocessing steps to a chunk of raw rows
+
+    Drops the ID, label-encodes Gender and renames the columns.
+
+    Args:
+        raw: DataFrame with the raw CSV columns
+
+    Returns:
+        Dictionary of processed column arrays
+    """
+    columns = {}
+    for raw_name, name in RAW_COLUMN_MAP.items():
+        values = raw[raw_name]
+        if name == 'Gender':
+            codes = pd.Categorical(values, categories=GENDER_CATEGORIES).codes
+            if (codes < 0).any():
+                raise ValueError(f"Unknown Gender values: {sorted(set(values) - set(GENDER_CATEGORIES))}")
+            values = codes
+        values = np.asarray(values)
+        if values.dtype.kind == 'f' and not np.array_equal(values, np.round(values)):
+            raise ValueError(f"Column '{raw_name}' must hold whole numbers")
+        columns[name] = values.astype(COLUMN_DTYPES[name])
+    return columns
+
+
+def build_processed_cache(
+    raw_path: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    force: bool = False
+) -> Path:
+    """
+    Build the columnar cache for a raw CSV, reusing it if the source is unchanged
+
+    Each column is stored as its own ``.npy`` file under a directory named after
+    the source digest. Every source has its own pointer file naming its live
+    version, so caches of different sources (the real data, synthetic sets)
+    live side by side; up to CACHE_MAX_SOURCES sources are kept.
+
+    Args:
+        raw_path: Raw customer CSV (defaults to settings.RAW_DATA_PATH)
+        cache_dir: Cache root directory (defaults to settings.DATA_CACHE_DIR)
+        force: Rebuild even if the cache is up to date
+
+    Returns:
+        Path to the directory holding the cached columns
+    """
+    raw_path = Path(raw_path or settings.RAW_DATA_PATH).resolve()
+    cache_dir = Path(cache_dir or settings.DATA_CACHE_DIR)
+    pointer_path = _pointer_path(cache_dir, raw_path)
+
+    stat = _source_stat(raw_path)
+    pointer = _read_json(pointer_path)
+
+    if not force and pointer and pointer.get("source") == str(raw_path) \
+            and pointer.get("format_version") == CACHE_FORMAT_VERSION:
+        version_dir = cache_dir / pointer["version"]
+        if (version_dir / MANIFEST_FILE).exists():
+            # Cheap check first, only hash when the file metadata moved.
+            # Touching the pointer marks the source as recently used.
+            if pointer["stat"] == stat:
+                touch(pointer_path)
+                return version_dir
+            if file_sha256(raw_path) == pointer["sha256"]:
+                pointer["stat"] = stat
+                _write_json_atomic(pointer_path, pointer)
+                touch(pointer_path)
+                return version_dir
+
+    sha256 = file_sha256(raw_path)
+    version = sha256[:16]
+    version_dir = cache_dir / version
+    build_dir = cache_dir / f".build-{version}-{os.getpid()}"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    build_dir.mkdir(parents=True)
+
+    # Upper bound; trimmed to the parsed row count below
+    n_rows = count_data_rows(raw_path)
+    arrays = {
+        name: np.lib.format.open_memmap(
+            build_dir / f"{name}.npy", mode='w+', dtype=dtype, shape=(n_rows,)
+        )
+        for name, dtype in COLUMN_DTYPES.items()
+    }
+
+    offset = 0
+    reader = pd.read_csv(raw_path, usecols=list(RAW_COLUMN_MAP), chunksize=CHUNK_ROWS)
+    for chunk in reader:
+        columns = preprocess_chunk(chunk)
+        end = offset + len(chunk)
+        if end > n_rows:
+            del arrays
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise ValueError(f"Row count mismatch in {raw_path}: at most {n_rows} rows, parsed {end}")
+        for name, values in columns.items():
+            arrays[name][offset:end] = values
+        offset = end
+
+    if offset < n_rows:
+        # Blank lines or multi-line fields: copy the parsed rows into exact-size files
+        for name, array in arrays.items():
+            trimmed = np.lib.format.open_memmap(
+                build_dir / f"{name}.trim.npy", mode='w+', dtype=array.dtype, shape=(offset,)
+            )
+            trimmed[:] = array[:offset]
+            trimmed.flush()
+            del trimmed
+            os.replace(build_dir / f"{name}.trim.npy", build_dir / f"{name}.npy")
+    else:
+        for array in arrays.values():
+            array.flush()
+    del arrays
+    n_rows = offset
+
+    _write_json_atomic(build_dir / MANIFEST_FILE, {
+        "format_version": CACHE_FORMAT_VERSION,
+        "source": str(raw_path),
+        "sha256": sha256,
+        "n_rows": n_rows,
+        "columns": {name: np.dtype(dtype).str for name, dtype in COLUMN_DTYPES.items()},
+        "categories": {"Gender": GENDER_CATEGORIES}
+    })
+
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.replace(build_dir, version_dir)
+
+    _write_json_atomic(pointer_path, {
+        "format_version": CACHE_FORMAT_VERSION,
+        "source": str(raw_path),
+        "stat": stat,
+        "sha256": sha256,
+        "version": version
+    })
+    touch(pointer_path)
+
+    _prune_cache(cache_dir, pointer_path, CACHE_MAX_SOURCES)
+    return version_dir
+
+
+class ProcessedDataset:
+    """
+    Read-only view over a cached processed dataset
+
+    Columns are memory-mapped NumPy arrays, so reading them does not parse
+    or copy the data.
+    """
+
+    def __init__(self, version_dir: Path):
+        self.path = Path(version_dir)
+        manifest = _read_json(self.path / MANIFEST_FILE)
+        if manifest is None:
+            raise FileNotFoundError(f"Dataset cache manifest not found in {self.path}")
+
+        self.manifest = manifest
+        self.version: str = self.path.name
+        self.n_rows: int = manifest["n_rows"]
+        self.categories: Dict[str, List[str]] = manifest["categories"]
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.load(self.path / f"{name}.npy", mmap_mode='r')
+            for name in manifest["columns"]
+        }
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.columns)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the mapped columns in bytes"""
+        return sum(column.nbytes for column in self.columns.values())
+
+    def features(self, dtype=np.float64) -> np.ndarray:
+        """
+        Get the model feature matrix
+
+        Returns:
+            Array of shape (n_rows, 2) with Annual_Income and Spending_Score
+        """
+        X = np.empty((self.n_rows, len(FEATURE_COLUMNS)), dtype=dtype)
+        for i, name in enumerate(FEATURE_COLUMNS):
+            X[:, i] = self.columns[name]
+        return X
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Materialize the dataset as a DataFrame (copies the data)
+
+        Returns:
+            DataFrame with the processed columns
+        """
+        return pd.DataFrame({name: np.asarray(column) for name, column in self.columns.items()})
+
+
+def load_processed_dataset(
+    raw_path: Optional[str] = None,
+    cache_dir: Optional[str] = None
+) -> ProcessedDataset:
+    """
+    Load the processed dataset, rebuilding the cache first if the source changed
+
+    Args:
+        raw_path: Raw customer CSV (defaults to settings.RAW_DATA_PATH)
+        cache_dir: Cache root directory (defaults to settings.DATA_CACHE_DIR)
+
+    Returns:
+        ProcessedDataset backed by memory-mapped columns
+    """
+    return ProcessedDataset(build_processed_cache(raw_path, cache_dir))
+
+
+class DatasetStore:
+    """
+    Process-wide holder of the current processed dataset
+
+    Re-opens the cache only when the raw source changes on disk.
+    """
+
+    def __init__(self):
+        self._dataset: Optional[ProcessedDataset] = None
+        self._stat: Optional[Dict] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ProcessedDataset:
+        """
+        Get the current dataset
+
+        Returns:
+            ProcessedDataset for settings.RAW_DATA_PATH
+        """
+        stat = _source_stat(Path(settings.RAW_DATA_PATH))
+        with self._lock:
+            if self._dataset is None or stat != self._stat:
+                self._dataset = load_processed_dataset()
+                self._stat = stat
+            return self._dataset
+
+    def memory_usage(self) -> Dict:
+        """
+        Size of the currently open dataset, without opening one
+
+        The columns are memory-mapped, so mapped_bytes is address space that
+        the OS pages in on demand rather than heap memory.
+        """
+        with self._lock:
+            dataset = self._dataset
+        if dataset is None:
+            return {"loaded": False}
+        return {
+            "loaded": True,
+            "version": dataset.version,
+            "rows": len(dataset),
+            "mapped_bytes": dataset.nbytes
+        }
+
+
+# Global dataset instance
+dataset_store = DatasetStore()
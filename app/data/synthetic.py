@@ -0,0 +1,114 @@
+"""
+Synthetic customer data
+Generates arbitrarily large datasets with the raw file's schema and distribution
+"""
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.data.preprocessing import RAW_COLUMN_MAP
+
+
+# Numeric raw columns that are resampled with kernel noise
+NUMERIC_COLUMNS = ['Age', 'Annual Income (k$)', 'Spending Score (1-100)']
+
+# Rows per generator block; every block gets its own seed derived from the
+# run seed, so a given (seed, rows, block size) always yields the same file
+BLOCK_ROWS = 1_000_000
+
+
+def silverman_bandwidth(values: np.ndarray) -> float:
+    """Rule-of-thumb Gaussian kernel bandwidth for a 1-D sample"""
+    return 1.06 * float(np.std(values)) * len(values) ** (-1 / 5)
+
+
+def generate_customers(
+    source: pd.DataFrame,
+    n_rows: int,
+    seed: int = 42,
+    block_rows: int = BLOCK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """
+    Smoothed bootstrap of a raw customer table
+
+    Each synthetic customer copies a random source row (keeping Gender, Age,
+    income and score jointly distributed like the source), then adds Gaussian
+    kernel noise to the numeric columns, rounds them to whole numbers and clips
+    them to the source range.
+
+    Args:
+        source: Raw customer table (raw column names)
+        n_rows: Number of rows to generate
+        seed: Seed; the same seed, n_rows and block_rows always yield the same rows
+        block_rows: Rows per yielded block
+
+    Yields:
+        DataFrames with the raw schema, CustomerID numbered from 1
+    """
+    missing = [name for name in ['CustomerID', *RAW_COLUMN_MAP] if name not in source.columns]
+    if missing:
+        raise ValueError(f"Source is missing columns: {missing}")
+
+    numeric = {name: source[name].to_numpy(dtype=np.float64) for name in NUMERIC_COLUMNS}
+    bandwidth = {name: silverman_bandwidth(values) for name, values in numeric.items()}
+    bounds = {name: (values.min(), values.max()) for name, values in numeric.items()}
+    genders = source['Gender'].to_numpy()
+
+    n_blocks = -(-n_rows // block_rows)
+    block_seeds = np.random.SeedSequence(seed).spawn(n_blocks)
+    for block, block_seed in enumerate(block_seeds):
+        start = block * block_rows
+        size = min(block_rows, n_rows - start)
+        rng = np.random.default_rng(block_seed)
+        picks = rng.integers(0, len(source), size=size)
+
+        frame = {
+            'CustomerID': np.arange(start + 1, start + size + 1, dtype=np.int64),
+            'Gender': genders[picks]
+        }
+        for name in NUMERIC_COLUMNS:
+            values = numeric[name][picks] + rng.normal(0.0, bandwidth[name], size=size)
+            low, high = bounds[name]
+            frame[name] = np.clip(np.rint(values), low, high).astype(np.int32)
+        yield pd.DataFrame(frame, columns=list(source.columns))
+
+
+def write_synthetic_csv(
+    output_path: str,
+    n_rows: int,
+    seed: int = 42,
+    source_path: Optional[str] = None,
+    block_rows: int = BLOCK_ROWS
+) -> Path:
+    """
+    Write a synthetic raw customer CSV block by block
+
+    Memory use is bounded by one block regardless of n_rows. The file is
+    written under a temporary name and renamed when complete.
+
+    Args:
+        output_path: Destination CSV
+        n_rows: Number of rows
+        seed: Generator seed
+        source_path: Raw CSV to imitate (defaults to settings.RAW_DATA_PATH)
+        block_rows: Rows generated and written per block
+
+    Returns:
+        Path of the written file
+    """
+    source = pd.read_csv(source_path or settings.RAW_DATA_PATH)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+
+    with open(tmp_path, 'w', newline='') as out:
+        header = True
+        for frame in generate_customers(source, n_rows, seed, block_rows):
+            frame.to_csv(out, index=False, header=header)
+            header = False
+
+    tmp_path.replace(output_path)
+    return output_path
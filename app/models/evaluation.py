@@ -0,0 +1,176 @@
+"""
+Cluster stability evaluation
+Refits the model on bootstrap resamples in a process pool that shares the
+feature matrix through shared memory
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+from threadpoolctl import threadpool_limits
+
+from app.models.training import DEFAULT_ENGINE, build_estimator, matched_agreement
+
+
+# Clusters with a mean Jaccard below this are usually considered unstable
+DEFAULT_MIN_STABILITY = 0.75
+
+# Per-worker view of the shared feature matrix and reference labels
+_shared: Dict = {}
+
+
+def clusterwise_jaccard(reference: np.ndarray, labels: np.ndarray, n_clusters: int) -> np.ndarray:
+    """
+    Best Jaccard similarity of every reference cluster with any cluster in labels
+
+    Args:
+        reference: Reference cluster labels
+        labels: Labels of the same points from another clustering
+        n_clusters: Number of reference clusters
+
+    Returns:
+        Array of shape (n_clusters,); NaN for clusters absent from the points
+    """
+    n_other = int(labels.max()) + 1 if len(labels) else 0
+    contingency = np.zeros((n_clusters, max(n_other, 1)), dtype=np.int64)
+    np.add.at(contingency, (reference, labels), 1)
+    sizes_ref = contingency.sum(axis=1, keepdims=True)
+    sizes_other = contingency.sum(axis=0, keepdims=True)
+    union = sizes_ref + sizes_other - contingency
+    with np.errstate(invalid='ignore', divide='ignore'):
+        jaccard = np.where(union > 0, contingency / union, 0.0).max(axis=1)
+    return np.where(sizes_ref[:, 0] > 0, jaccard, np.nan)
+
+
+def _attach(names: Dict[str, str], shapes: Dict[str, tuple], dtypes: Dict[str, str]) -> None:
+    """Pool initializer: map the shared arrays and keep each worker single-threaded"""
+    for key, name in names.items():
+        block = shared_memory.SharedMemory(name=name)
+        _shared[f"{key}_block"] = block
+        _shared[key] = np.ndarray(shapes[key], dtype=dtypes[key], buffer=block.buf)
+    # One BLAS/OpenMP thread per process, the pool provides the parallelism
+    _shared["limits"] = threadpool_limits(1)
+
+
+def _bootstrap_fit(seed: int, engine: str, n_clusters: int, n_init: int) -> Dict:
+    """Fit one bootstrap resample and compare it with the reference labels"""
+    X = _shared["X"]
+    reference = _shared["reference"]
+    rng = np.random.default_rng(seed)
+    sample = rng.integers(0, len(X), size=len(X))
+
+    estimator = build_estimator(engine, n_clusters=n_clusters, random_state=seed, n_init=n_init)
+    estimator.fit(X[sample])
+    labels = estimator.predict(X)
+
+    # Stability is judged on the points the resample actually contained
+    seen = np.unique(sample)
+    return {
+        "jaccard": clusterwise_jaccard(reference[seen], labels[seen], n_clusters),
+        "agreement": matched_agreement(labels, reference),
+        "adjusted_rand": float(adjusted_rand_score(reference, labels))
+    }
+
+
+def _share(array: np.ndarray) -> shared_memory.SharedMemory:
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+    return block
+
+
+def bootstrap_stability(
+    X_scaled: np.ndarray,
+    reference_labels: np.ndarray,
+    n_resamples: int = 100,
+    engine: str = DEFAULT_ENGINE,
+    n_init: int = 10,
+    random_state: int = 42,
+    workers: Optional[int] = None
+) -> Dict:
+    """
+    Refit on bootstrap resamples and measure how well clusters are reproduced
+
+    The feature matrix and reference labels are placed in shared memory once;
+    workers map them instead of receiving a pickled copy per task.
+
+    Args:
+        X_scaled: Scaled feature matrix
+        reference_labels: Cluster labels of the model under evaluation
+        n_resamples: Number of bootstrap resamples
+        engine: Training engine used for the refits
+        n_init: k-means++ restarts per refit
+        random_state: Seed for the resample seeds
+        workers: Worker processes (defaults to the CPU count)
+
+    Returns:
+        Dictionary with per-cluster Jaccard summaries and agreement with the reference
+    """
+    X_scaled = np.ascontiguousarray(X_scaled, dtype=np.float64)
+    reference_labels = np.ascontiguousarray(reference_labels, dtype=np.int64)
+    n_clusters = int(reference_labels.max()) + 1
+    seeds = np.random.SeedSequence(random_state).generate_state(n_resamples)
+    workers = max(1, min(workers or os.cpu_count() or 1, n_resamples))
+
+    arrays = {"X": X_scaled, "reference": reference_labels}
+    blocks = {key: _share(array) for key, array in arrays.items()}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach,
+            initargs=(
+                {key: block.name for key, block in blocks.items()},
+                {key: array.shape for key, array in arrays.items()},
+                {key: array.dtype.str for key, array in arrays.items()}
+            )
+        ) as pool:
+            runs = list(pool.map(
+                _bootstrap_fit,
+                [int(seed) for seed in seeds],
+                [engine] * n_resamples,
+                [n_clusters] * n_resamples,
+                [n_init] * n_resamples,
+                chunksize=max(1, n_resamples // (workers * 4))
+            ))
+    finally:
+        for block in blocks.values():
+            block.close()
+            block.unlink()
+
+    jaccard = np.vstack([run["jaccard"] for run in runs])
+    agreement = np.array([run["agreement"] for run in runs])
+    adjusted_rand = np.array([run["adjusted_rand"] for run in runs])
+
+    return {
+        "n_resamples": n_resamples,
+        "workers": workers,
+        "clusters": [
+            {
+                "cluster": cluster,
+                "size": int(np.count_nonzero(reference_labels == cluster)),
+                "jaccard_mean": float(np.nanmean(jaccard[:, cluster])),
+                "jaccard_p05": float(np.nanpercentile(jaccard[:, cluster], 5)),
+                "jaccard_min": float(np.nanmin(jaccard[:, cluster]))
+            }
+            for cluster in range(n_clusters)
+        ],
+        "agreement_mean": float(agreement.mean()),
+        "agreement_p05": float(np.percentile(agreement, 5)),
+        "adjusted_rand_mean": float(adjusted_rand.mean())
+    }
+
+
+def unstable_clusters(report: Dict, min_stability: float = DEFAULT_MIN_STABILITY) -> List[int]:
+    """
+    Clusters whose mean bootstrap Jaccard is below the threshold
+
+    Args:
+        report: Output of bootstrap_stability
+        min_stability: Minimum mean Jaccard
+
+    Returns:
+        Cluster ids failing the threshold
+    """
+    return [c["cluster"] for c in report["clusters"] if c["jaccard_mean"] < min_stability]
@@ -2,17 +2,30 @@
 Machine Learning Model Handler
 Handles model loading, prediction, and persistence
 """
+import hashlib
+import logging
 import pickle
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import NamedTuple, Tuple, Optional
 from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 
 from app.core.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
+class SoftAssignment(NamedTuple):
+    """Nearest-centroid assignment together with how firmly each row belongs to it"""
+    cluster_id: np.ndarray  # (n,) assigned cluster
+    distances: np.ndarray  # (n, n_clusters) Euclidean distances in scaled feature space
+    margin: np.ndarray  # (n,) second-nearest minus nearest distance
+    membership: np.ndarray  # (n,) normalized membership of the assigned cluster, 1/n_clusters..1
+
+
 class CustomerSegmentationModel:
     """
     Handles the KMeans clustering model for customer segmentation
@@ -23,34 +36,59 @@ class CustomerSegmentationModel:
         self.scaler: Optional[StandardScaler] = None
         self.cluster_names = settings.CLUSTER_NAMES
         self.is_loaded = False
+        self.model_version: Optional[str] = None
+        # Inference parameters (scaler and centroids) in the active precision
+        self.dtype = np.float64
+        self._mean: Optional[np.ndarray] = None
+        self._scale: Optional[np.ndarray] = None
+        self._centers: Optional[np.ndarray] = None
+        self._centers_sq: Optional[np.ndarray] = None
     
-    def load_models(self) -> bool:
+    @staticmethod
+    def _version_of(*payloads: bytes) -> str:
+        """Short content hash identifying a set of model artifacts"""
+        digest = hashlib.sha256()
+        for payload in payloads:
+            digest.update(payload)
+        return digest.hexdigest()[:12]
+    
+    def load_models(self, kmeans_path: Optional[str] = None, scaler_path: Optional[str] = None) -> bool:
         """
         Load the trained KMeans model and scaler from disk
         
+        Args:
+            kmeans_path: KMeans pickle (defaults to settings.KMEANS_MODEL_PATH)
+            scaler_path: Scaler pickle (defaults to settings.SCALER_MODEL_PATH)
+        
         Returns:
             bool: True if models loaded successfully, False otherwise
         """
+        kmeans_path = kmeans_path or settings.KMEANS_MODEL_PATH
+        scaler_path = scaler_path or settings.SCALER_MODEL_PATH
         try:
             # Load KMeans model
-            with open(settings.KMEANS_MODEL_PATH, 'rb') as f:
-                self.kmeans = pickle.load(f)
+            with open(kmeans_path, 'rb') as f:
+                kmeans_bytes = f.read()
+            self.kmeans = pickle.loads(kmeans_bytes)
             
             # Load Scaler
-            with open(settings.SCALER_MODEL_PATH, 'rb') as f:
-                self.scaler = pickle.load(f)
+            with open(scaler_path, 'rb') as f:
+                scaler_bytes = f.read()
+            self.scaler = pickle.loads(scaler_bytes)
             
+            self.model_version = self._version_of(kmeans_bytes, scaler_bytes)
             self.is_loaded = True
-            print(f"Models loaded successfully from {settings.MODEL_DIR}")
+            self._configure_precision()
+            logger.info("Models loaded successfully from %s", Path(kmeans_path).parent)
             return True
             
         except FileNotFoundError as e:
-            print(f"Model files not found: {e}")
-            print("Please train the model first using the notebook")
+            logger.warning("Model files not found: %s", e)
+            logger.warning("Please train the model first using the notebook")
             self.is_loaded = False
             return False
         except Exception as e:
-            print(f"Error loading models: {e}")
+            logger.exception("Error loading models: %s", e)
             self.is_loaded = False
             return False
     
@@ -70,23 +108,121 @@ class CustomerSegmentationModel:
             Path(settings.MODEL_DIR).mkdir(parents=True, exist_ok=True)
             
             # Save models
+            kmeans_bytes = pickle.dumps(kmeans)
+            scaler_bytes = pickle.dumps(scaler)
+            
             with open(settings.KMEANS_MODEL_PATH, 'wb') as f:
-                pickle.dump(kmeans, f)
+                f.write(kmeans_bytes)
             
             with open(settings.SCALER_MODEL_PATH, 'wb') as f:
-                pickle.dump(scaler, f)
+                f.write(scaler_bytes)
             
             self.kmeans = kmeans
             self.scaler = scaler
+            self.model_version = self._version_of(kmeans_bytes, scaler_bytes)
             self.is_loaded = True
+            self._configure_precision()
             
-            print(f"Models saved successfully to {settings.MODEL_DIR}")
+            logger.info("Models saved successfully to %s", settings.MODEL_DIR)
             return True
             
         except Exception as e:
-            print(f"Error saving models: {e}")
+            logger.exception("Error saving models: %s", e)
             return False
     
+    def _set_precision(self, dtype) -> None:
+        """Cast the scaler and centroid parameters used for inference to dtype"""
+        self.dtype = np.dtype(dtype).type
+        self._mean = np.asarray(self.scaler.mean_, dtype=self.dtype)
+        self._scale = np.asarray(self.scaler.scale_, dtype=self.dtype)
+        self._centers = np.ascontiguousarray(self.kmeans.cluster_centers_, dtype=self.dtype)
+        self._centers_sq = np.einsum('ij,ij->i', self._centers, self._centers)
+    
+    def _configure_precision(self) -> None:
+        """
+        Select the inference precision for freshly loaded models
+        
+        float32 (MODEL_FLOAT32) is only enabled when it assigns every training
+        customer to the same cluster as float64; otherwise the model stays in
+        float64.
+        """
+        self._set_precision(np.float64)
+        if not settings.MODEL_FLOAT32:
+            return
+        
+        try:
+            from app.data.preprocessing import dataset_store
+            dataset = dataset_store.get()
+            income = np.asarray(dataset['Annual_Income'])
+            score = np.asarray(dataset['Spending_Score'])
+        except Exception as e:
+            logger.warning("float32 inference disabled, training data unavailable: %s", e)
+            return
+        
+        reference = self._assign(income, score)
+        self._set_precision(np.float32)
+        mismatches = int(np.count_nonzero(self._assign(income, score) != reference))
+        if mismatches:
+            self._set_precision(np.float64)
+            logger.warning(
+                "float32 inference disabled, %d of %d training assignments differ from float64",
+                mismatches, len(reference)
+            )
+            return
+        logger.info("float32 inference enabled, verified on %d training customers", len(reference))
+    
+    def _distance_matrix(self, annual_income: np.ndarray, spending_score: np.ndarray,
+                         exact: bool = False) -> np.ndarray:
+        """
+        Squared distances to every centroid in the active precision
+        
+        Args:
+            annual_income: Annual incomes in thousands
+            spending_score: Spending scores (1-100)
+            exact: Include the per-sample ||x||^2 term; without it the rows are
+                only shifted, which does not change the argmin
+        
+        Returns:
+            Array of shape (n_samples, n_clusters)
+        """
+        X = np.empty((len(annual_income), 2), dtype=self.dtype)
+        X[:, 0] = annual_income
+        X[:, 1] = spending_score
+        X -= self._mean
+        X /= self._scale
+        
+        distances = X @ self._centers.T
+        distances *= -2.0
+        distances += self._centers_sq
+        if exact:
+            distances += np.einsum('ij,ij->i', X, X)[:, None]
+            # Cancellation can leave tiny negatives next to a centroid
+            np.maximum(distances, 0, out=distances)
+        return distances
+    
+    def _assign(self, annual_income: np.ndarray, spending_score: np.ndarray) -> np.ndarray:
+        """Nearest-centroid assignment in the active precision"""
+        return self._distance_matrix(annual_income, spending_score).argmin(axis=1)
+    
+    def _soft_assign(self, annual_income: np.ndarray, spending_score: np.ndarray) -> SoftAssignment:
+        """Assignment, distances, margin and membership from one distance matrix"""
+        distances = self._distance_matrix(annual_income, spending_score, exact=True)
+        cluster_id = distances.argmin(axis=1)
+        rows = np.arange(len(cluster_id))
+        
+        # Fuzzy c-means membership (m=2): inverse squared distances, normalized
+        weights = distances + np.finfo(self.dtype).eps
+        np.reciprocal(weights, out=weights)
+        membership = weights[rows, cluster_id] / weights.sum(axis=1)
+        
+        np.sqrt(distances, out=distances)
+        if distances.shape[1] > 1:
+            nearest_two = np.partition(distances, 1, axis=1)
+            margin = nearest_two[:, 1] - nearest_two[:, 0]
+        else:
+            margin = np.full(len(cluster_id), np.inf, dtype=self.dtype)
+        return SoftAssignment(cluster_id, distances, margin, membership)
+    
     def predict(self, annual_income: float, spending_score: float) -> Tuple[int, str]:
         """
         Predict the customer segment
@@ -101,21 +237,55 @@ class CustomerSegmentationModel:
         if not self.is_loaded:
             raise RuntimeError("Models not loaded. Please load models first.")
         
-        # Create dataframe
-        new_data = pd.DataFrame(
-            [[annual_income, spending_score]], 
-            columns=['Annual_Income', 'Spending_Score']
-        )
-        
-        # Scale the data
-        new_scaled = self.scaler.transform(new_data)
-        
-        # Predict cluster
-        cluster_id = int(self.kmeans.predict(new_scaled)[0])
+        cluster_id = int(self._assign([annual_income], [spending_score])[0])
         cluster_name = self.cluster_names.get(cluster_id, "Unknown")
         
         return cluster_id, cluster_name
     
+    def predict_batch(self, annual_income: np.ndarray, spending_score: np.ndarray) -> np.ndarray:
+        """
+        Predict customer segments for many customers in one vectorized pass
+        
+        Applies the scaler and the nearest-centroid rule directly on NumPy
+        arrays, without building a DataFrame. Inputs are converted straight
+        into the active precision (float32 when enabled).
+        
+        Args:
+            annual_income: Annual incomes in thousands
+            spending_score: Spending scores (1-100)
+            
+        Returns:
+            Array of cluster ids
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Models not loaded. Please load models first.")
+        
+        return self._assign(annual_income, spending_score)
+    
+    def predict_soft(self, annual_income: np.ndarray, spending_score: np.ndarray) -> SoftAssignment:
+        """
+        Predict segments with distances to every centroid
+        
+        The assignment and its confidence come from the same vectorized
+        distance matrix as predict_batch, so there is no second pass. Distances
+        are in the scaled feature space the model was fitted in. The margin is
+        how much closer the assigned centroid is than the runner-up (0 on a
+        boundary); membership is the assigned cluster's normalized
+        inverse-squared-distance weight (1 on the centroid, 1/n_clusters when
+        equidistant from all).
+        
+        Args:
+            annual_income: Annual incomes in thousands
+            spending_score: Spending scores (1-100)
+            
+        Returns:
+            SoftAssignment of arrays
+        """
+        if not self.is_loaded:
+            raise RuntimeError("Models not loaded. Please load models first.")
+        
+        return self._soft_assign(annual_income, spending_score)
+    
     def get_cluster_centroids(self) -> pd.DataFrame:
         """
         Get the cluster centroids in original scale
@@ -138,6 +308,30 @@ class CustomerSegmentationModel:
         
         return df
     
+    def memory_usage(self) -> dict:
+        """
+        Get the size of the arrays held by the model
+        
+        Returns:
+            Dictionary of array sizes in bytes
+        """
+        if not self.is_loaded:
+            return {"loaded": False}
+        fitted = [
+            self.kmeans.cluster_centers_,
+            getattr(self.kmeans, 'labels_', None),
+            self.scaler.mean_,
+            self.scaler.scale_,
+            getattr(self.scaler, 'var_', None)
+        ]
+        inference = [self._mean, self._scale, self._centers, self._centers_sq]
+        return {
+            "loaded": True,
+            "precision": np.dtype(self.dtype).name,
+            "fitted_bytes": sum(a.nbytes for a in fitted if a is not None),
+            "inference_bytes": sum(a.nbytes for a in inference)
+        }
+    
     def get_model_info(self) -> dict:
         """
         Get information about the loaded model
@@ -151,6 +345,8 @@ class CustomerSegmentationModel:
             "features_used": ["Annual_Income", "Spending_Score"],
             "model_loaded": self.is_loaded,
             "scaler_loaded": self.scaler is not None,
+            "model_version": self.model_version,
+            "precision": np.dtype(self.dtype).name,
             "cluster_names": self.cluster_names
         }
 
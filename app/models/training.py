@@ -0,0 +1,301 @@
+"""
+KMeans training engines
+Builds the clustering estimator for a selectable algorithm, benchmarks the
+engines and caches training runs by content hash
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import sklearn
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import adjusted_rand_score
+
+from app.data.preprocessing import CACHE_FORMAT_VERSION
+from app.utils.helpers import touch
+
+
+# Engine name -> short description
+TRAINING_ENGINES = {
+    "lloyd": "Classic Lloyd iterations (sklearn KMeans, algorithm='lloyd')",
+    "elkan": "Triangle-inequality accelerated Lloyd (sklearn KMeans, algorithm='elkan')",
+    "minibatch": "Mini-batch updates on random subsets (sklearn MiniBatchKMeans)"
+}
+
+DEFAULT_ENGINE = "lloyd"
+
+
+def build_estimator(
+    engine: str = DEFAULT_ENGINE,
+    n_clusters: int = 5,
+    random_state: int = 42,
+    n_init: int = 10,
+    batch_size: int = 1024
+):
+    """
+    Create an unfitted clustering estimator for the given engine
+
+    Args:
+        engine: One of TRAINING_ENGINES
+        n_clusters: Number of clusters
+        random_state: Seed for initialization
+        n_init: Number of k-means++ restarts
+        batch_size: Mini-batch size (minibatch engine only)
+
+    Returns:
+        KMeans or MiniBatchKMeans instance
+    """
+    if engine not in TRAINING_ENGINES:
+        raise ValueError(f"Unknown training engine '{engine}'. Choose from: {', '.join(TRAINING_ENGINES)}")
+
+    if engine == "minibatch":
+        return MiniBatchKMeans(
+            n_clusters=n_clusters,
+            init='k-means++',
+            random_state=random_state,
+            n_init=n_init,
+            batch_size=batch_size
+        )
+
+    return KMeans(
+        n_clusters=n_clusters,
+        init='k-means++',
+        random_state=random_state,
+        n_init=n_init,
+        algorithm=engine
+    )
+
+
+def matched_agreement(labels: np.ndarray, reference_labels: np.ndarray) -> float:
+    """
+    Fraction of points with the same cluster after optimally matching label ids
+
+    Args:
+        labels: Cluster labels to compare
+        reference_labels: Reference cluster labels
+
+    Returns:
+        Agreement in [0, 1], invariant to label permutations
+    """
+    n_labels = int(max(labels.max(), reference_labels.max())) + 1
+    contingency = np.zeros((n_labels, n_labels), dtype=np.int64)
+    np.add.at(contingency, (reference_labels, labels), 1)
+    return contingency_agreement(contingency)[0]
+
+
+def contingency_agreement(contingency: np.ndarray) -> Tuple[float, Dict[int, int]]:
+    """
+    Matched agreement from a reference x other contingency table
+
+    Args:
+        contingency: Counts of points per (reference label, other label)
+
+    Returns:
+        Tuple of (agreement in [0, 1], reference label -> matched other label)
+    """
+    total = contingency.sum()
+    if total == 0:
+        return 0.0, {}
+    rows, cols = linear_sum_assignment(contingency, maximize=True)
+    return float(contingency[rows, cols].sum() / total), {int(r): int(c) for r, c in zip(rows, cols)}
+
+
+def benchmark_engines(
+    X_scaled: np.ndarray,
+    engines: Optional[Sequence[str]] = None,
+    reference_engine: str = DEFAULT_ENGINE,
+    repeats: int = 1,
+    **estimator_kwargs
+) -> List[Dict]:
+    """
+    Fit every engine on the same scaled data and compare it to the reference
+
+    Args:
+        X_scaled: Scaled feature matrix
+        engines: Engines to run (defaults to all)
+        reference_engine: Engine whose labels and inertia are the reference
+        repeats: Fits per engine; the best wall time is reported
+        **estimator_kwargs: Passed to build_estimator
+
+    Returns:
+        One result dictionary per engine, reference first
+    """
+    engines = list(engines or TRAINING_ENGINES)
+    if reference_engine in engines:
+        engines.remove(reference_engine)
+    engines.insert(0, reference_engine)
+
+    results = []
+    reference = None
+    for engine in engines:
+        best_time = None
+        for _ in range(max(repeats, 1)):
+            estimator = build_estimator(engine, **estimator_kwargs)
+            start = time.perf_counter()
+            estimator.fit(X_scaled)
+            elapsed = time.perf_counter() - start
+            best_time = elapsed if best_time is None else min(best_time, elapsed)
+
+        labels = estimator.predict(X_scaled)
+        if reference is None:
+            reference = {"labels": labels, "inertia": estimator.inertia_}
+
+        results.append({
+            "engine": engine,
+            "wall_time_s": best_time,
+            "n_iter": int(estimator.n_iter_),
+            "inertia": float(estimator.inertia_),
+            "inertia_delta": float(estimator.inertia_ / reference["inertia"] - 1.0),
+            "agreement": matched_agreement(labels, reference["labels"]),
+            "adjusted_rand": float(adjusted_rand_score(reference["labels"], labels))
+        })
+
+    return results
+
+
+def select_engine(
+    results: List[Dict],
+    inertia_tolerance: float = 0.01,
+    min_agreement: float = 0.99
+) -> Optional[str]:
+    """
+    Pick the fastest engine that stays within tolerance of the reference
+
+    Args:
+        results: Output of benchmark_engines
+        inertia_tolerance: Maximum relative inertia increase
+        min_agreement: Minimum matched label agreement
+
+    Returns:
+        Engine name, or None if no engine qualifies
+    """
+    eligible = [
+        r for r in results
+        if r["inertia_delta"] <= inertia_tolerance and r["agreement"] >= min_agreement
+    ]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda r: r["wall_time_s"])["engine"]
+
+
+# Training artifact cache
+CACHE_KMEANS_FILE = "kmeans_model.pkl"
+CACHE_SCALER_FILE = "scaler.pkl"
+CACHE_LABELS_FILE = "labels.npy"
+CACHE_META_FILE = "meta.json"
+
+
+def training_fingerprint(data_digest: str, config: Dict) -> str:
+    """
+    Identify a training run by its input data and configuration
+
+    The dataset cache format version is included, so runs cached from a
+    different format are never returned.
+
+    Args:
+        data_digest: Content hash of the training data
+        config: Hyperparameters, seed and anything else that changes the result
+
+    Returns:
+        Hex fingerprint string
+    """
+    payload = json.dumps(
+        {
+            "data": data_digest,
+            "config": config,
+            "sklearn": sklearn.__version__,
+            "cache_format": CACHE_FORMAT_VERSION
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+def load_training_run(cache_dir: Path, fingerprint: str) -> Optional[Dict]:
+    """
+    Load the artifacts of a previous run with the same fingerprint
+
+    Args:
+        cache_dir: Training cache directory
+        fingerprint: Output of training_fingerprint
+
+    Returns:
+        Dictionary with kmeans_bytes, scaler_bytes, labels and meta, or None on a miss
+    """
+    run_dir = Path(cache_dir) / fingerprint
+    try:
+        with open(run_dir / CACHE_META_FILE, 'r') as f:
+            meta = json.load(f)
+        run = {
+            "kmeans_bytes": (run_dir / CACHE_KMEANS_FILE).read_bytes(),
+            "scaler_bytes": (run_dir / CACHE_SCALER_FILE).read_bytes(),
+            "labels": np.load(run_dir / CACHE_LABELS_FILE),
+            "meta": meta
+        }
+    except (OSError, ValueError):
+        return None
+    # Mark as recently used for pruning
+    touch(run_dir)
+    return run
+
+
+def store_training_run(
+    cache_dir: Path,
+    fingerprint: str,
+    kmeans_bytes: bytes,
+    scaler_bytes: bytes,
+    labels: np.ndarray,
+    meta: Dict,
+    max_entries: int = 10
+) -> Path:
+    """
+    Store the artifacts of a training run under its fingerprint
+
+    Args:
+        cache_dir: Training cache directory
+        fingerprint: Output of training_fingerprint
+        kmeans_bytes: Pickled clustering model
+        scaler_bytes: Pickled scaler
+        labels: Cluster labels of the training data
+        meta: Run metadata (config, inertia, ...)
+        max_entries: Number of most recently used runs to keep
+
+    Returns:
+        Directory holding the run
+    """
+    cache_dir = Path(cache_dir)
+    run_dir = cache_dir / fingerprint
+    build_dir = cache_dir / f".build-{fingerprint}-{os.getpid()}"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    build_dir.mkdir(parents=True)
+
+    (build_dir / CACHE_KMEANS_FILE).write_bytes(kmeans_bytes)
+    (build_dir / CACHE_SCALER_FILE).write_bytes(scaler_bytes)
+    np.save(build_dir / CACHE_LABELS_FILE, labels)
+    with open(build_dir / CACHE_META_FILE, 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(run_dir, ignore_errors=True)
+    os.replace(build_dir, run_dir)
+    touch(run_dir)
+
+    runs = sorted(
+        (entry for entry in cache_dir.iterdir() if entry.is_dir() and not entry.name.startswith('.')),
+        key=lambda entry: entry.stat().st_mtime_ns,
+        reverse=True
+    )
+    for entry in runs[max_entries:]:
+        shutil.rmtree(entry, ignore_errors=True)
+
+    return run_dir
+
+
+def labels_digest(labels: np.ndarray) -> str:
+    """Content hash of a label array, used to detect changed assignments"""
+    return hashlib.sha256(np.ascontiguousarray(labels, dtype=np.int32).tobytes()).hexdigest()
@@ -2,13 +2,33 @@
 from .customer import (
     CustomerInput, 
     PredictionResponse, 
+    AssignmentConfidence,
     ClusterStats,
-    ModelInfo
+    ModelInfo,
+    ShadowReport,
+    Centroid,
+    SegmentMapResponse
 )
+from .columnar import BulkPredictionRequest, BulkPredictionResponse, RowError, validate_customer_columns
+from .job import JobDatasetRequest, JobResponse
+from .analytics import SegmentSlice, SegmentQueryResponse, SegmentDimensions
 
 __all__ = [
     "CustomerInput", 
     "PredictionResponse", 
+    "AssignmentConfidence",
     "ClusterStats",
-    "ModelInfo"
+    "ModelInfo",
+    "ShadowReport",
+    "Centroid",
+    "SegmentMapResponse",
+    "BulkPredictionRequest",
+    "BulkPredictionResponse",
+    "RowError",
+    "validate_customer_columns",
+    "JobDatasetRequest",
+    "JobResponse",
+    "SegmentSlice",
+    "SegmentQueryResponse",
+    "SegmentDimensions"
 ]
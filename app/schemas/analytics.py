@@ -0,0 +1,43 @@
+"""
+Pydantic schemas for segment analytics
+"""
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class SegmentSlice(BaseModel):
+    """Schema for the customers in one slice or group"""
+    key: Dict[str, str] = Field(..., description="Group-by dimension values (empty for the total)")
+    count: int
+    avg_income: Optional[float] = None
+    avg_spending_score: Optional[float] = None
+    avg_age: Optional[float] = None
+
+
+class SegmentQueryResponse(BaseModel):
+    """Schema for a segment analytics query"""
+    dataset_version: str
+    model_version: Optional[str] = None
+    filters: Dict[str, List[str]]
+    group_by: List[str]
+    total: SegmentSlice
+    groups: List[SegmentSlice]
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "dataset_version": "194975e1f84d29ee",
+                "model_version": "7531f09bb963",
+                "filters": {"gender": ["Female"], "age_band": ["18-24", "25-34"]},
+                "group_by": ["cluster"],
+                "total": {"key": {}, "count": 51, "avg_income": 57.14, "avg_spending_score": 62.27, "avg_age": 27.08},
+                "groups": [
+                    {"key": {"cluster": "1"}, "count": 15, "avg_income": 82.27, "avg_spending_score": 82.47, "avg_age": 30.53}
+                ]
+            }
+        }
+
+
+class SegmentDimensions(BaseModel):
+    """Schema for the dimension values accepted as filters"""
+    dimensions: Dict[str, List[str]]
@@ -0,0 +1,181 @@
+"""
+Columnar schemas for bulk prediction
+Parallel feature arrays validated in one vectorized pass instead of per-row models
+"""
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from app.schemas.customer import ANNUAL_INCOME_RANGE, SPENDING_SCORE_RANGE
+
+
+class BulkPredictionRequest(BaseModel):
+    """
+    Schema for a columnar bulk prediction request
+
+    Documents the wire format only; the endpoint converts the decoded
+    arrays with NumPy instead of validating them element by element.
+    """
+    annual_income: List[float] = Field(..., description="Annual incomes in thousands ($k)")
+    spending_score: List[int] = Field(..., description="Spending scores (1-100), same length")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "annual_income": [70.0, 15.0, 120.0],
+                "spending_score": [75, 39, 20]
+            }
+        }
+
+
+class RowError(BaseModel):
+    """Schema for one invalid value"""
+    index: int = Field(..., description="Row index in the request arrays")
+    field: str
+    message: str
+
+
+class BulkPredictionResponse(BaseModel):
+    """Schema for a columnar bulk prediction response"""
+    model_version: Optional[str] = None
+    count: int
+    cluster_id: List[int] = Field(..., description="Cluster per row, -1 for invalid rows")
+    cluster_names: Dict[str, str] = Field(..., description="Cluster id -> name")
+    error_count: int = Field(..., description="Number of invalid values")
+    errors: List[RowError] = Field(..., description="Invalid values (truncated to the first few)")
+    distances: Optional[List[Optional[List[float]]]] = Field(
+        None, description="Per row, distance to each centroid (only with soft=true; null for invalid rows)"
+    )
+    margin: Optional[List[Optional[float]]] = Field(
+        None, description="Per row, second-nearest minus nearest distance (only with soft=true)"
+    )
+    membership: Optional[List[Optional[float]]] = Field(
+        None, description="Per row, normalized membership of the assigned cluster (only with soft=true)"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "model_version": "3f9c2a71be04",
+                "count": 3,
+                "cluster_id": [1, 4, -1],
+                "cluster_names": {"0": "Average Customer", "1": "VIP / Whale"},
+                "error_count": 1,
+                "errors": [{"index": 2, "field": "spending_score", "message": "Spending score must be between 1 and 100"}]
+            }
+        }
+
+
+class ColumnValidation(NamedTuple):
+    """Result of validate_customer_columns"""
+    annual_income: np.ndarray  # float64, NaN where not numeric
+    spending_score: np.ndarray  # float64, NaN where not numeric
+    valid: np.ndarray  # bool mask of rows the model can score
+    error_count: int
+    errors: List[Dict[str, Any]]
+
+
+# Python types accepted as numbers; bool is an int subclass but not a number here
+NUMERIC_TYPES = (int, float)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (*NUMERIC_TYPES, np.integer, np.floating)) \
+        and not isinstance(value, (bool, np.bool_))
+
+
+def to_float_array(values: Sequence) -> np.ndarray:
+    """
+    Convert a column to float64, mapping non-numeric entries to NaN
+
+    Only ints and floats count as numbers: strings (numeric or not),
+    booleans and null become NaN whether or not the column is mixed.
+    Numeric arrays and all-number lists are converted in one NumPy call;
+    anything else is checked element by element.
+
+    Args:
+        values: List or array of values
+
+    Returns:
+        1-D float64 array
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iuf":
+        array = values.astype(np.float64, copy=False)
+    elif not isinstance(values, np.ndarray) and set(map(type, values)) <= set(NUMERIC_TYPES):
+        array = np.asarray(values, dtype=np.float64)
+    else:
+        if any(isinstance(value, (list, tuple, dict, np.ndarray)) for value in values):
+            raise ValueError("Columns must be flat arrays")
+        array = np.array([value if _is_number(value) else np.nan for value in values], dtype=np.float64)
+    if array.ndim != 1:
+        raise ValueError("Columns must be flat arrays")
+    return array
+
+
+def validate_customer_columns(
+    annual_income: Sequence,
+    spending_score: Sequence,
+    max_errors: int = 100
+) -> ColumnValidation:
+    """
+    Validate parallel income and spending score columns in one pass
+
+    Applies the same domain as CustomerInput: income within
+    ANNUAL_INCOME_RANGE, spending score a whole number within
+    SPENDING_SCORE_RANGE.
+
+    Args:
+        annual_income: Annual incomes in thousands
+        spending_score: Spending scores
+        max_errors: Maximum number of row errors to describe
+
+    Returns:
+        ColumnValidation with the converted columns, validity mask and errors
+
+    Raises:
+        ValueError: If the columns are not flat arrays of the same length
+    """
+    income = to_float_array(annual_income)
+    score = to_float_array(spending_score)
+    if len(income) != len(score):
+        raise ValueError(
+            f"annual_income has {len(income)} values but spending_score has {len(score)}"
+        )
+
+    checks = [
+        ("annual_income", np.isnan(income), "Annual income must be a number"),
+        (
+            "annual_income",
+            ~np.isnan(income) & ((income < ANNUAL_INCOME_RANGE[0]) | (income > ANNUAL_INCOME_RANGE[1])),
+            f"Annual income must be between {ANNUAL_INCOME_RANGE[0]:g} and {ANNUAL_INCOME_RANGE[1]:g}"
+        ),
+        ("spending_score", np.isnan(score), "Spending score must be a number"),
+        (
+            "spending_score",
+            ~np.isnan(score) & ((score < SPENDING_SCORE_RANGE[0]) | (score > SPENDING_SCORE_RANGE[1])),
+            f"Spending score must be between {SPENDING_SCORE_RANGE[0]} and {SPENDING_SCORE_RANGE[1]}"
+        ),
+        (
+            "spending_score",
+            ~np.isnan(score) & (score >= SPENDING_SCORE_RANGE[0]) & (score <= SPENDING_SCORE_RANGE[1])
+            & (score != np.round(score)),
+            "Spending score must be a whole number"
+        ),
+    ]
+
+    invalid = np.zeros(len(income), dtype=bool)
+    for _, mask, _ in checks:
+        invalid |= mask
+
+    # Describe the first max_errors invalid rows
+    rows = np.flatnonzero(invalid)[:max_errors]
+    errors: List[Dict[str, Any]] = [
+        {"index": int(index), "field": field, "message": message}
+        for field, mask, message in checks
+        for index in rows[mask[rows]]
+    ]
+    errors.sort(key=lambda error: error["index"])
+    error_count = int(sum(np.count_nonzero(mask) for _, mask, _ in checks))
+
+    return ColumnValidation(income, score, ~invalid, error_count, errors)
@@ -2,22 +2,27 @@
 Pydantic schemas for customer data validation
 """
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import Dict, List, Optional
+
+
+# Valid input domain shared by all prediction schemas
+ANNUAL_INCOME_RANGE = (0.0, 200.0)
+SPENDING_SCORE_RANGE = (1, 100)
 
 
 class CustomerInput(BaseModel):
     """Schema for customer input data"""
     annual_income: float = Field(
         ..., 
-        ge=0, 
-        le=200,
+        ge=ANNUAL_INCOME_RANGE[0], 
+        le=ANNUAL_INCOME_RANGE[1],
         description="Annual Income in thousands ($k)",
         example=70.0
     )
     spending_score: int = Field(
         ..., 
-        ge=1, 
-        le=100,
+        ge=SPENDING_SCORE_RANGE[0], 
+        le=SPENDING_SCORE_RANGE[1],
         description="Spending Score (1-100)",
         example=75
     )
@@ -43,6 +48,13 @@ class CustomerInput(BaseModel):
         }
 
 
+class AssignmentConfidence(BaseModel):
+    """Schema for how firmly a customer belongs to the assigned segment"""
+    distances: List[float] = Field(..., description="Distance to each cluster centroid (by cluster id) in scaled feature space")
+    margin: float = Field(..., description="Distance to the second-nearest centroid minus distance to the nearest")
+    membership: float = Field(..., description="Normalized membership of the assigned cluster (1/n_clusters to 1)")
+
+
 class PredictionResponse(BaseModel):
     """Schema for prediction response"""
     cluster_id: int = Field(..., description="Numerical cluster ID")
@@ -51,6 +63,7 @@ class PredictionResponse(BaseModel):
     spending_score: int = Field(..., description="Input spending score")
     description: str = Field(..., description="Cluster description")
     marketing_strategy: str = Field(..., description="Recommended marketing strategy")
+    confidence: Optional[AssignmentConfidence] = Field(None, description="Only when requested with soft=true")
     
     class Config:
         json_schema_extra = {
@@ -82,3 +95,51 @@ class ModelInfo(BaseModel):
     features_used: list = ["Annual_Income", "Spending_Score"]
     model_loaded: bool
     scaler_loaded: bool
+    model_version: Optional[str] = None
+    precision: Optional[str] = None
+
+
+class ShadowReport(BaseModel):
+    """Schema for the shadow model comparison"""
+    enabled: bool
+    active_version: Optional[str] = None
+    candidate_version: Optional[str] = None
+    sample_rate: float
+    observed: int = Field(..., description="Sampled predictions scored by both models")
+    dropped: int = Field(..., description="Samples dropped because the shadow queue was full")
+    queued: int
+    raw_agreement: Optional[float] = Field(None, description="Fraction with the same cluster id")
+    matched_agreement: Optional[float] = Field(None, description="Agreement after optimally matching cluster ids")
+    cluster_mapping: Dict[str, int] = Field(..., description="Active cluster -> matched candidate cluster")
+    matrix: List[List[int]] = Field(..., description="Counts per (active cluster, candidate cluster)")
+
+
+class Centroid(BaseModel):
+    """Schema for a cluster centroid in original scale"""
+    cluster_id: int
+    cluster_name: str
+    annual_income: float
+    spending_score: float
+
+
+class SegmentMapResponse(BaseModel):
+    """
+    Schema for the decision-region raster
+    
+    Pixel (row, col) covers annual_income = income_min + col * income_step and
+    spending_score = score_min + row * score_step. Rows are stored bottom-up
+    (lowest score first), pixels row-major, as flat [cluster_id, run_length] pairs.
+    income_max / score_max are the last column / row, never outside the input domain.
+    """
+    model_version: str
+    encoding: str = "rle"
+    width: int
+    height: int
+    income_min: float
+    income_max: float
+    income_step: float
+    score_min: float
+    score_max: float
+    score_step: float
+    runs: List[int] = Field(..., description="Flat [cluster_id, run_length, ...] pairs")
+    centroids: List[Centroid]
@@ -0,0 +1,49 @@
+"""
+Pydantic schemas for asynchronous scoring jobs
+"""
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class JobDatasetRequest(BaseModel):
+    """Schema for scoring a server-side dataset"""
+    dataset: str = Field(
+        "processed",
+        description="Dataset reference (e.g. 'processed' for the processed customer data)"
+    )
+
+
+class JobResponse(BaseModel):
+    """Schema for job status"""
+    job_id: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    source: str
+    progress: float = Field(..., description="Fraction of rows scored (0-1)")
+    rows_total: Optional[int] = None
+    rows_done: int = 0
+    rows_invalid: int = Field(0, description="Rows outside the valid input domain")
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    status_url: str
+    result_url: Optional[str] = None
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2a9c1e5b7d4e0f9a8b6c5d4e3f2a1b",
+                "status": "running",
+                "source": "upload:customers.csv",
+                "progress": 0.4,
+                "rows_total": 1000000,
+                "rows_done": 400000,
+                "rows_invalid": 0,
+                "created_at": 1760870000.0,
+                "started_at": 1760870001.0,
+                "finished_at": None,
+                "error": None,
+                "status_url": "/api/v1/jobs/3f2a9c1e5b7d4e0f9a8b6c5d4e3f2a1b",
+                "result_url": None
+            }
+        }
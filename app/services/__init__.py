@@ -1,4 +1,22 @@
 """Service layer - Business logic"""
 from .prediction_service import PredictionService, prediction_service
+from .segment_map_service import SegmentMapService, segment_map_service
+from .job_service import JobService, job_service
+from .stream_service import StreamPredictionService, stream_prediction_service
+from .analytics_service import SegmentAnalyticsService, segment_analytics_service
+from .shadow_service import ShadowService, shadow_service
 
-__all__ = ["PredictionService", "prediction_service"]
+__all__ = [
+    "PredictionService",
+    "prediction_service",
+    "SegmentMapService",
+    "segment_map_service",
+    "JobService",
+    "job_service",
+    "StreamPredictionService",
+    "stream_prediction_service",
+    "SegmentAnalyticsService",
+    "segment_analytics_service",
+    "ShadowService",
+    "shadow_service"
+]
@@ -0,0 +1,321 @@
+"""
+Segment analytics
+Slices customers by Gender, Age band, income band and cluster from indexes
+precomputed once per dataset and model version
+"""
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.data.preprocessing import dataset_store, GENDER_CATEGORIES, ProcessedDataset
+from app.models.ml_model import ml_model
+
+
+# Dimension order of the aggregate cube
+DIMENSIONS = ("gender", "age_band", "income_band", "cluster")
+
+# Columns summed per cube cell
+MEASURES = ("Annual_Income", "Spending_Score", "Age")
+
+
+def band_labels(edges: Sequence[float], unit: str = "") -> List[str]:
+    """
+    Labels for half-open bands [edges[i], edges[i + 1])
+
+    Args:
+        edges: Ascending band lower bounds; the last band is open-ended
+        unit: Suffix appended to each bound
+
+    Returns:
+        One label per band, e.g. ["18-24", "25-34", "35+"]
+    """
+    labels = [
+        f"{low:g}{unit}-{high - 1:g}{unit}"
+        for low, high in zip(edges[:-1], edges[1:])
+    ]
+    labels.append(f"{edges[-1]:g}{unit}+")
+    return labels
+
+
+def band_codes(values: np.ndarray, edges: Sequence[float]) -> np.ndarray:
+    """Band index of every value; values below the first edge fall in band 0"""
+    return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, len(edges) - 1).astype(np.int8)
+
+
+class SegmentIndex:
+    """
+    Precomputed aggregates and bitmap indexes over one dataset and model
+
+    ``counts`` and ``sums`` form a dense cube over DIMENSIONS, so any
+    filter / group-by combination is a slice and a sum over the cube.
+    ``bitmaps`` hold one packed bit per customer for every dimension value
+    and are combined with bitwise AND / OR to list matching customers.
+    """
+
+    def __init__(self, dataset: ProcessedDataset):
+        self.dataset = dataset
+        self.dataset_version = dataset.version
+        self.model_version = ml_model.model_version
+        self.n_rows = len(dataset)
+
+        gender_categories = dataset.categories.get('Gender', GENDER_CATEGORIES)
+        cluster_ids = sorted(ml_model.cluster_names)
+        self.levels: Dict[str, List[str]] = {
+            "gender": list(gender_categories),
+            "age_band": band_labels(settings.ANALYTICS_AGE_BANDS),
+            "income_band": band_labels(settings.ANALYTICS_INCOME_BANDS, "k"),
+            "cluster": [str(cluster_id) for cluster_id in cluster_ids],
+        }
+
+        codes = {
+            "gender": np.asarray(dataset['Gender'], dtype=np.int8),
+            "age_band": band_codes(dataset['Age'], settings.ANALYTICS_AGE_BANDS),
+            "income_band": band_codes(dataset['Annual_Income'], settings.ANALYTICS_INCOME_BANDS),
+            "cluster": ml_model.predict_batch(dataset['Annual_Income'], dataset['Spending_Score']).astype(np.int8),
+        }
+
+        self.clusters = codes["cluster"]
+
+        shape = tuple(len(self.levels[dim]) for dim in DIMENSIONS)
+        cell = np.ravel_multi_index(tuple(codes[dim] for dim in DIMENSIONS), shape)
+        n_cells = int(np.prod(shape))
+        self.counts = np.bincount(cell, minlength=n_cells).reshape(shape)
+        self.sums = {
+            name: np.bincount(cell, weights=dataset[name], minlength=n_cells).reshape(shape)
+            for name in MEASURES
+        }
+
+        self.bitmaps: Dict[str, np.ndarray] = {
+            dim: np.stack([np.packbits(codes[dim] == code) for code in range(len(self.levels[dim]))])
+            for dim in DIMENSIONS
+        }
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.counts.nbytes
+            + self.clusters.nbytes
+            + sum(array.nbytes for array in self.sums.values())
+            + sum(bitmap.nbytes for bitmap in self.bitmaps.values())
+        )
+
+    def resolve_filters(self, filters: Dict[str, Optional[Sequence[str]]]) -> Dict[str, List[int]]:
+        """
+        Translate filter labels into level indexes
+
+        Args:
+            filters: Dimension -> accepted labels (None or empty means all)
+
+        Returns:
+            Dimension -> level indexes
+
+        Raises:
+            ValueError: If a dimension or label is unknown
+        """
+        selection = {dim: list(range(len(self.levels[dim]))) for dim in DIMENSIONS}
+        for dim, labels in filters.items():
+            if dim not in self.levels:
+                raise ValueError(f"Unknown dimension '{dim}'. Choose from: {', '.join(DIMENSIONS)}")
+            if not labels:
+                continue
+            unknown = [label for label in labels if label not in self.levels[dim]]
+            if unknown:
+                raise ValueError(
+                    f"Unknown {dim} value(s) {unknown}. Choose from: {', '.join(self.levels[dim])}"
+                )
+            selection[dim] = sorted({self.levels[dim].index(label) for label in labels})
+        return selection
+
+    def aggregate(
+        self,
+        filters: Dict[str, Optional[Sequence[str]]],
+        group_by: Sequence[str] = ()
+    ) -> Tuple[Dict, List[Dict]]:
+        """
+        Counts and averages for a filtered slice, optionally grouped
+
+        Args:
+            filters: Dimension -> accepted labels
+            group_by: Dimensions to break the slice down by
+
+        Returns:
+            Tuple of (total, groups); groups with no customers are omitted
+        """
+        for dim in group_by:
+            if dim not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension '{dim}'. Choose from: {', '.join(DIMENSIONS)}")
+        selection = self.resolve_filters(filters)
+        index = np.ix_(*(selection[dim] for dim in DIMENSIONS))
+
+        # Keep the group-by axes, sum the rest
+        keep = [DIMENSIONS.index(dim) for dim in DIMENSIONS if dim in group_by]
+        drop = tuple(axis for axis in range(len(DIMENSIONS)) if axis not in keep)
+        counts = self.counts[index].sum(axis=drop)
+        sums = {name: array[index].sum(axis=drop) for name, array in self.sums.items()}
+
+        total = self._summary({}, int(counts.sum()), {name: float(s.sum()) for name, s in sums.items()})
+
+        groups = []
+        if keep:
+            kept_dims = [DIMENSIONS[axis] for axis in keep]
+            for position in zip(*np.nonzero(counts)):
+                key = {
+                    dim: self.levels[dim][selection[dim][i]]
+                    for dim, i in zip(kept_dims, position)
+                }
+                groups.append(self._summary(
+                    key,
+                    int(counts[position]),
+                    {name: float(s[position]) for name, s in sums.items()}
+                ))
+        return total, groups
+
+    @staticmethod
+    def _summary(key: Dict[str, str], count: int, sums: Dict[str, float]) -> Dict:
+        def mean(name):
+            return round(sums[name] / count, 2) if count else None
+        return {
+            "key": key,
+            "count": count,
+            "avg_income": mean("Annual_Income"),
+            "avg_spending_score": mean("Spending_Score"),
+            "avg_age": mean("Age")
+        }
+
+    def matching_rows(self, filters: Dict[str, Optional[Sequence[str]]]) -> np.ndarray:
+        """
+        Row indexes of customers matching every filter
+
+        Args:
+            filters: Dimension -> accepted labels
+
+        Returns:
+            Sorted row indexes
+        """
+        selection = self.resolve_filters(filters)
+        mask = None
+        for dim in DIMENSIONS:
+            if len(selection[dim]) == len(self.levels[dim]):
+                continue
+            dim_mask = np.bitwise_or.reduce(self.bitmaps[dim][selection[dim]], axis=0)
+            mask = dim_mask if mask is None else mask & dim_mask
+        if mask is None:
+            return np.arange(self.n_rows)
+        return np.flatnonzero(np.unpackbits(mask, count=self.n_rows))
+
+
+class SegmentAnalyticsService:
+    """
+    Holds the segment index for the current dataset and model
+
+    The index is rebuilt only when the dataset version or the model
+    version changes.
+    """
+
+    def __init__(self):
+        self._index: Optional[SegmentIndex] = None
+        self._lock = threading.Lock()
+
+    def get_index(self) -> SegmentIndex:
+        """
+        Get the index for the current dataset and model, building it if needed
+
+        Returns:
+            SegmentIndex
+        """
+        if not ml_model.is_loaded:
+            raise RuntimeError("Models not loaded. Please load models first.")
+        dataset = dataset_store.get()
+        with self._lock:
+            index = self._index
+            if index is None or index.dataset_version != dataset.version \
+                    or index.model_version != ml_model.model_version:
+                index = SegmentIndex(dataset)
+                self._index = index
+            return index
+
+    def query(
+        self,
+        filters: Dict[str, Optional[Sequence[str]]],
+        group_by: Sequence[str] = ()
+    ) -> Dict:
+        """
+        Aggregate a customer slice
+
+        Args:
+            filters: Dimension -> accepted labels
+            group_by: Dimensions to break the slice down by
+
+        Returns:
+            Dictionary matching SegmentQueryResponse
+        """
+        index = self.get_index()
+        total, groups = index.aggregate(filters, group_by)
+        return {
+            "dataset_version": index.dataset_version,
+            "model_version": index.model_version,
+            "filters": {dim: list(labels) for dim, labels in filters.items() if labels},
+            "group_by": list(group_by),
+            "total": total,
+            "groups": groups
+        }
+
+    def iter_customers_csv(
+        self,
+        filters: Dict[str, Optional[Sequence[str]]],
+        chunk_rows: int = 10_000
+    ) -> Iterator[str]:
+        """
+        Stream the customers matching the filters as CSV
+
+        Args:
+            filters: Dimension -> accepted labels
+            chunk_rows: Rows formatted per yielded chunk
+
+        Yields:
+            CSV text chunks, header first
+        """
+        index = self.get_index()
+        rows = index.matching_rows(filters)
+        dataset = index.dataset
+
+        gender = np.array(index.levels["gender"], dtype=object)
+        cluster_names = np.array(
+            [ml_model.cluster_names.get(int(c), "Unknown") for c in index.levels["cluster"]],
+            dtype=object
+        )
+        age_bands = np.array(index.levels["age_band"], dtype=object)
+        income_bands = np.array(index.levels["income_band"], dtype=object)
+
+        yield "Gender,Age,Annual_Income,Spending_Score,Age_Band,Income_Band,Cluster,Cluster_Name\n"
+        for start in range(0, len(rows), chunk_rows):
+            chunk = rows[start:start + chunk_rows]
+            age = np.asarray(dataset['Age'][chunk])
+            income = np.asarray(dataset['Annual_Income'][chunk])
+            score = np.asarray(dataset['Spending_Score'][chunk])
+            clusters = index.clusters[chunk]
+            columns = zip(
+                gender[np.asarray(dataset['Gender'][chunk])],
+                age,
+                income,
+                score,
+                age_bands[band_codes(age, settings.ANALYTICS_AGE_BANDS)],
+                income_bands[band_codes(income, settings.ANALYTICS_INCOME_BANDS)],
+                clusters,
+                cluster_names[clusters]
+            )
+            yield "".join(",".join(map(str, row)) + "\n" for row in columns)
+
+    def memory_usage(self) -> Dict:
+        """Size of the current index"""
+        with self._lock:
+            index = self._index
+        if index is None:
+            return {"built": False}
+        return {"built": True, "rows": index.n_rows, "bytes": index.nbytes}
+
+
+# Service instance
+segment_analytics_service = SegmentAnalyticsService()
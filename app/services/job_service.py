@@ -0,0 +1,387 @@
+"""
+Asynchronous scoring jobs
+Runs large scoring requests on a local worker pool and keeps results on disk
+"""
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import settings
+from app.data.preprocessing import dataset_store, count_data_rows, GENDER_CATEGORIES
+from app.models.ml_model import ml_model
+from app.schemas.columnar import validate_customer_columns
+
+
+logger = logging.getLogger(__name__)
+
+# Accepted column names for the two model features in uploaded CSVs
+INCOME_COLUMNS = ('Annual_Income', 'Annual Income (k$)', 'annual_income')
+SCORE_COLUMNS = ('Spending_Score', 'Spending Score (1-100)', 'spending_score')
+
+JOB_FILE = "job.json"
+INPUT_FILE = "input.csv"
+RESULT_FILE = "result.csv"
+
+
+class JobStatus:
+    """Job lifecycle states"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobQueueFull(Exception):
+    """Raised when too many jobs are already waiting"""
+
+
+@dataclass
+class Job:
+    """State of one scoring job"""
+    job_id: str
+    source: str
+    status: str = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    rows_total: Optional[int] = None
+    rows_done: int = 0
+    rows_invalid: int = 0
+    error: Optional[str] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == JobStatus.SUCCEEDED:
+            return 1.0
+        if not self.rows_total:
+            return 0.0
+        return min(self.rows_done / self.rows_total, 1.0)
+
+
+def _find_column(columns: List[str], candidates) -> Optional[str]:
+    for name in candidates:
+        if name in columns:
+            return name
+    return None
+
+
+def _processed_dataset_chunks(chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield the cached processed dataset in chunks, with Gender decoded"""
+    dataset = dataset_store.get()
+    categories = np.array(dataset.categories.get('Gender', GENDER_CATEGORIES))
+    for start in range(0, len(dataset), chunk_rows):
+        chunk = {name: np.asarray(column[start:start + chunk_rows]) for name, column in dataset.columns.items()}
+        if 'Gender' in chunk:
+            chunk['Gender'] = categories[chunk['Gender']]
+        yield pd.DataFrame(chunk)
+
+
+# Dataset references accepted by submit_dataset: name -> (row count, chunk iterator)
+DATASETS: Dict[str, Dict[str, Callable]] = {
+    "processed": {
+        "rows": lambda: len(dataset_store.get()),
+        "chunks": _processed_dataset_chunks
+    }
+}
+
+
+class JobService:
+    """
+    Manages scoring jobs
+
+    Jobs run on a thread pool (NumPy releases the GIL during the heavy
+    array math), write their results under ``JOBS_DIR/<job_id>/`` and are
+    deleted once they exceed the retention age or count.
+    """
+
+    def __init__(self):
+        self.jobs_dir = Path(settings.JOBS_DIR)
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Create the worker pool and restore jobs left on disk"""
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.JOB_WORKERS,
+            thread_name_prefix="scoring-job"
+        )
+
+        for job_file in self.jobs_dir.glob(f"*/{JOB_FILE}"):
+            try:
+                with open(job_file, 'r') as f:
+                    job = Job(**json.load(f))
+            except (OSError, ValueError, TypeError):
+                shutil.rmtree(job_file.parent, ignore_errors=True)
+                continue
+            if job.status not in JobStatus.FINISHED:
+                # The worker that owned it is gone
+                job.status = JobStatus.FAILED
+                job.error = "Interrupted by server restart"
+                job.finished_at = time.time()
+                self._save(job)
+            self._jobs[job.job_id] = job
+
+        self.cleanup()
+
+    def start_cleanup(self) -> None:
+        """
+        Enforce retention every JOB_CLEANUP_INTERVAL_SECONDS, not only on submission
+
+        Must be called from the running event loop.
+        """
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_periodically())
+
+    async def stop_cleanup(self) -> None:
+        """Stop the periodic cleanup"""
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+            try:
+                await self._cleanup_task
+            except asyncio.CancelledError:
+                pass
+            self._cleanup_task = None
+
+    async def _cleanup_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_CLEANUP_INTERVAL_SECONDS)
+            try:
+                # Deleting result directories is blocking file I/O
+                removed = await asyncio.to_thread(self.cleanup)
+            except Exception:
+                logger.exception("Job cleanup failed")
+                continue
+            if removed:
+                logger.info("Removed %d expired jobs", removed)
+
+    def shutdown(self) -> None:
+        """Stop accepting work and drop queued jobs"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _job_dir(self, job_id: str) -> Path:
+        return self.jobs_dir / job_id
+
+    def _save(self, job: Job) -> None:
+        job_dir = self._job_dir(job.job_id)
+        tmp_path = job_dir / (JOB_FILE + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(asdict(job), f)
+        os.replace(tmp_path, job_dir / JOB_FILE)
+
+    def _create(self, source: str) -> Job:
+        if self._executor is None:
+            raise RuntimeError("Job service is not running")
+        self.cleanup()
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.status not in JobStatus.FINISHED)
+            if pending >= settings.JOB_MAX_PENDING:
+                raise JobQueueFull(f"{pending} jobs are already pending")
+            job = Job(job_id=uuid.uuid4().hex, source=source)
+            self._jobs[job.job_id] = job
+        self._job_dir(job.job_id).mkdir(parents=True)
+        self._save(job)
+        return job
+
+    def _fail(self, job: Job, error: str) -> None:
+        """Mark a job that never reached a worker as failed"""
+        # In-memory state first: it is what counts toward JOB_MAX_PENDING
+        job.status = JobStatus.FAILED
+        job.error = error
+        job.finished_at = time.time()
+        try:
+            self._save(job)
+        except OSError:
+            logger.exception("Could not save failed job", extra={"fields": {"job_id": job.job_id}})
+
+    def submit_file(self, fileobj: BinaryIO, filename: str) -> Job:
+        """
+        Queue a job that scores an uploaded CSV
+
+        Args:
+            fileobj: Readable binary file with the CSV contents
+            filename: Original file name, for reference
+
+        Returns:
+            The queued Job
+        """
+        job = self._create(f"upload:{filename}")
+        input_path = self._job_dir(job.job_id) / INPUT_FILE
+        try:
+            with open(input_path, 'wb') as out:
+                shutil.copyfileobj(fileobj, out, length=1 << 20)
+
+            job.rows_total = count_data_rows(input_path)
+            self._save(job)
+            self._executor.submit(self._run, job, lambda: pd.read_csv(input_path, chunksize=settings.JOB_CHUNK_ROWS))
+        except Exception as e:
+            # A queued job without a worker would count as pending forever
+            input_path.unlink(missing_ok=True)
+            self._fail(job, f"Upload failed: {e}")
+            raise
+        return job
+
+    def submit_dataset(self, name: str) -> Job:
+        """
+        Queue a job that scores a named server-side dataset
+
+        Args:
+            name: Key of DATASETS
+
+        Returns:
+            The queued Job
+        """
+        if name not in DATASETS:
+            raise KeyError(name)
+        dataset = DATASETS[name]
+        rows_total = dataset["rows"]()
+        job = self._create(f"dataset:{name}")
+        job.rows_total = rows_total
+        try:
+            self._save(job)
+            self._executor.submit(self._run, job, lambda: dataset["chunks"](settings.JOB_CHUNK_ROWS))
+        except Exception as e:
+            self._fail(job, f"Submission failed: {e}")
+            raise
+        return job
+
+    def _run(self, job: Job, open_chunks: Callable[[], Iterator[pd.DataFrame]]) -> None:
+        job_dir = self._job_dir(job.job_id)
+        tmp_path = job_dir / (RESULT_FILE + ".tmp")
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        self._save(job)
+        logger.info("Scoring job started", extra={"fields": {"job_id": job.job_id, "source": job.source}})
+
+        try:
+            with open(tmp_path, 'w', newline='') as out:
+                header = True
+                for chunk in open_chunks():
+                    scored = self._score_chunk(chunk)
+                    job.rows_invalid += int((scored['Cluster'] < 0).sum())
+                    scored.to_csv(out, index=False, header=header)
+                    header = False
+                    job.rows_done += len(chunk)
+                    self._save(job)
+
+            os.replace(tmp_path, job_dir / RESULT_FILE)
+            (job_dir / INPUT_FILE).unlink(missing_ok=True)
+            job.status = JobStatus.SUCCEEDED
+        except Exception as e:
+            logger.exception("Scoring job failed", extra={"fields": {"job_id": job.job_id}})
+            tmp_path.unlink(missing_ok=True)
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self._save(job)
+            logger.info("Scoring job finished", extra={"fields": {
+                "job_id": job.job_id,
+                "status": job.status,
+                "rows": job.rows_done,
+                "duration_s": round(job.finished_at - job.started_at, 3)
+            }})
+
+    @staticmethod
+    def _score_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+        """Append Cluster and Cluster_Name; rows outside the input domain get -1 / 'Invalid'"""
+        columns = list(chunk.columns)
+        income_col = _find_column(columns, INCOME_COLUMNS)
+        score_col = _find_column(columns, SCORE_COLUMNS)
+        if income_col is None or score_col is None:
+            raise ValueError(
+                f"CSV must contain an income column ({', '.join(INCOME_COLUMNS)}) "
+                f"and a spending score column ({', '.join(SCORE_COLUMNS)})"
+            )
+
+        columns = validate_customer_columns(
+            pd.to_numeric(chunk[income_col], errors='coerce').to_numpy(dtype=np.float64),
+            pd.to_numeric(chunk[score_col], errors='coerce').to_numpy(dtype=np.float64),
+            max_errors=0
+        )
+        valid = columns.valid
+
+        clusters = np.full(len(chunk), -1, dtype=np.int64)
+        if valid.any():
+            clusters[valid] = ml_model.predict_batch(columns.annual_income[valid], columns.spending_score[valid])
+
+        # Index -1 (invalid rows) picks the trailing "Invalid"
+        n_clusters = len(ml_model.kmeans.cluster_centers_)
+        names = np.array(
+            [ml_model.cluster_names.get(i, "Unknown") for i in range(n_clusters)] + ["Invalid"],
+            dtype=object
+        )
+        chunk = chunk.copy()
+        chunk['Cluster'] = clusters
+        chunk['Cluster_Name'] = names[clusters]
+        return chunk
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id, or None if unknown or expired"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def result_path(self, job_id: str) -> Optional[Path]:
+        """Get the result file of a finished job"""
+        job = self.get(job_id)
+        if job is None or job.status != JobStatus.SUCCEEDED:
+            return None
+        path = self._job_dir(job_id) / RESULT_FILE
+        return path if path.exists() else None
+
+    def memory_usage(self) -> Dict:
+        """Jobs tracked in memory; results themselves live on disk"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            "jobs": len(jobs),
+            "pending": sum(1 for job in jobs if job.status not in JobStatus.FINISHED)
+        }
+
+    def cleanup(self) -> int:
+        """
+        Delete finished jobs beyond the retention age or count
+
+        Returns:
+            Number of jobs removed
+        """
+        now = time.time()
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if job.status in JobStatus.FINISHED),
+                key=lambda job: job.finished_at or 0,
+                reverse=True
+            )
+            expired = [
+                job for i, job in enumerate(finished)
+                if i >= settings.JOB_MAX_RETAINED
+                or now - (job.finished_at or now) > settings.JOB_RETENTION_SECONDS
+            ]
+            for job in expired:
+                del self._jobs[job.job_id]
+
+        for job in expired:
+            shutil.rmtree(self._job_dir(job.job_id), ignore_errors=True)
+        return len(expired)
+
+
+# Service instance
+job_service = JobService()
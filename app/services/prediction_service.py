@@ -2,14 +2,21 @@
 Business logic layer for predictions
 Handles the business rules and data processing
 """
+import logging
 from typing import Dict, List
-import pandas as pd
+import numpy as np
 
 from app.models.ml_model import ml_model
-from app.schemas.customer import CustomerInput, PredictionResponse, ClusterStats
+from app.schemas.customer import CustomerInput, PredictionResponse, ClusterStats, AssignmentConfidence
+from app.schemas.columnar import validate_customer_columns
+from app.services.analytics_service import segment_analytics_service
+from app.services.shadow_service import shadow_service
 from app.core.config import settings
 
 
+logger = logging.getLogger(__name__)
+
+
 class PredictionService:
     """
     Service layer for customer segmentation predictions
@@ -57,21 +64,40 @@ class PredictionService:
         return strategies.get(cluster_id, "General marketing approach")
     
     @staticmethod
-    async def predict_segment(customer_data: CustomerInput) -> PredictionResponse:
+    async def predict_segment(customer_data: CustomerInput, soft: bool = False) -> PredictionResponse:
         """
         Predict customer segment based on income and spending score
         
         Args:
             customer_data: Customer input data
+            soft: Also return distances, margin and membership
             
         Returns:
             PredictionResponse with cluster information
         """
-        # Get prediction from ML model
-        cluster_id, cluster_name = ml_model.predict(
-            customer_data.annual_income,
-            customer_data.spending_score
-        )
+        confidence = None
+        if soft:
+            # Same distance matrix gives the assignment and its confidence
+            assignment = ml_model.predict_soft(
+                [customer_data.annual_income],
+                [customer_data.spending_score]
+            )
+            cluster_id = int(assignment.cluster_id[0])
+            cluster_name = ml_model.cluster_names.get(cluster_id, "Unknown")
+            confidence = AssignmentConfidence(
+                distances=assignment.distances[0].tolist(),
+                margin=float(assignment.margin[0]),
+                membership=float(assignment.membership[0])
+            )
+        else:
+            # Get prediction from ML model
+            cluster_id, cluster_name = ml_model.predict(
+                customer_data.annual_income,
+                customer_data.spending_score
+            )
+        
+        # Offer a sample to the shadow model (non-blocking)
+        shadow_service.observe(customer_data.annual_income, customer_data.spending_score, cluster_id)
         
         # Get business insights
         description = PredictionService.get_cluster_description(cluster_id)
@@ -84,11 +110,88 @@ class PredictionService:
             annual_income=customer_data.annual_income,
             spending_score=customer_data.spending_score,
             description=description,
-            marketing_strategy=marketing_strategy
+            marketing_strategy=marketing_strategy,
+            confidence=confidence
         )
         
         return response
     
+    @staticmethod
+    def predict_columns(annual_income, spending_score, soft: bool = False) -> Dict:
+        """
+        Predict segments for parallel feature columns
+        
+        Rows are validated in one vectorized pass and valid rows are scored in
+        one model call; no per-row objects are created.
+        
+        Args:
+            annual_income: Annual incomes in thousands
+            spending_score: Spending scores (1-100)
+            soft: Also return distances, margin and membership per row
+            
+        Returns:
+            Dictionary matching BulkPredictionResponse
+            
+        Raises:
+            ValueError: If the columns are malformed or differ in length
+        """
+        if not ml_model.is_loaded:
+            raise RuntimeError("Models not loaded. Please load models first.")
+        
+        columns = validate_customer_columns(
+            annual_income,
+            spending_score,
+            max_errors=settings.BULK_MAX_ERRORS
+        )
+        clusters = np.full(len(columns.valid), -1, dtype=np.int64)
+        if not soft:
+            if columns.valid.any():
+                clusters[columns.valid] = ml_model.predict_batch(
+                    columns.annual_income[columns.valid],
+                    columns.spending_score[columns.valid]
+                )
+            soft_columns = {}
+        else:
+            soft_columns = PredictionService._soft_columns(columns, clusters)
+        
+        return {
+            "model_version": ml_model.model_version,
+            "count": len(clusters),
+            "cluster_id": clusters.tolist(),
+            "cluster_names": {str(k): v for k, v in ml_model.cluster_names.items()},
+            "error_count": columns.error_count,
+            "errors": columns.errors,
+            **soft_columns
+        }
+    
+    @staticmethod
+    def _soft_columns(columns, clusters: np.ndarray) -> Dict:
+        """Score the valid rows with predict_soft, filling clusters in place"""
+        assignment = ml_model.predict_soft(
+            columns.annual_income[columns.valid],
+            columns.spending_score[columns.valid]
+        )
+        clusters[columns.valid] = assignment.cluster_id
+        
+        n_clusters = assignment.distances.shape[1]
+        distances = np.full((len(clusters), n_clusters), np.nan)
+        distances[columns.valid] = assignment.distances
+        margin = np.full(len(clusters), np.nan)
+        margin[columns.valid] = assignment.margin
+        membership = np.full(len(clusters), np.nan)
+        membership[columns.valid] = assignment.membership
+        
+        result = {
+            "distances": distances.tolist(),
+            "margin": margin.tolist(),
+            "membership": membership.tolist()
+        }
+        # Invalid rows are reported as null (NaN is not valid JSON)
+        for index in np.flatnonzero(~columns.valid).tolist():
+            for values in result.values():
+                values[index] = None
+        return result
+    
     @staticmethod
     async def get_cluster_statistics() -> List[ClusterStats]:
         """
@@ -98,28 +201,19 @@ class PredictionService:
             List of cluster statistics
         """
         try:
-            # Load processed data
-            df = pd.read_csv(settings.PROCESSED_DATA_PATH)
-            
-            # If clusters are not in the data, we need to predict them
-            if 'Cluster' not in df.columns:
-                # Predict clusters for all customers
-                X = df[['Annual_Income', 'Spending_Score']]
-                X_scaled = ml_model.scaler.transform(X)
-                df['Cluster'] = ml_model.kmeans.predict(X_scaled)
+            # Served from the precomputed segment cube, no rescan per request
+            _, groups = segment_analytics_service.get_index().aggregate({}, group_by=["cluster"])
             
-            # Calculate statistics
             stats = []
-            for cluster_id in sorted(df['Cluster'].unique()):
-                cluster_data = df[df['Cluster'] == cluster_id]
-                
+            for group in groups:
+                cluster_id = int(group["key"]["cluster"])
                 stat = ClusterStats(
-                    cluster_id=int(cluster_id),
+                    cluster_id=cluster_id,
                     cluster_name=settings.CLUSTER_NAMES.get(cluster_id, "Unknown"),
-                    count=len(cluster_data),
-                    avg_income=round(cluster_data['Annual_Income'].mean(), 2),
-                    avg_spending_score=round(cluster_data['Spending_Score'].mean(), 2),
-                    avg_age=round(cluster_data['Age'].mean(), 2) if 'Age' in df.columns else None
+                    count=group["count"],
+                    avg_income=group["avg_income"],
+                    avg_spending_score=group["avg_spending_score"],
+                    avg_age=group["avg_age"]
                 )
                 stats.append(stat)
             
@@ -128,7 +222,7 @@ class PredictionService:
         except FileNotFoundError:
             return []
         except Exception as e:
-            print(f"Error calculating statistics: {e}")
+            logger.exception("Error calculating statistics: %s", e)
             return []
     
     @staticmethod
@@ -0,0 +1,138 @@
+"""
+Decision-region map of the customer segments
+Rasterizes cluster ids over the income x spending-score plane once per model version
+"""
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+
+from app.models.ml_model import ml_model
+from app.schemas.customer import (
+    ANNUAL_INCOME_RANGE,
+    SPENDING_SCORE_RANGE,
+    Centroid,
+    SegmentMapResponse
+)
+
+
+def run_length_encode(values: np.ndarray) -> np.ndarray:
+    """
+    Run-length encode a 1-D array
+
+    Args:
+        values: Array to encode
+
+    Returns:
+        Flat array of [value, run_length, value, run_length, ...]
+    """
+    if values.size == 0:
+        return np.empty(0, dtype=np.int64)
+    boundaries = np.flatnonzero(values[1:] != values[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    lengths = np.diff(np.concatenate((starts, [values.size])))
+    return np.column_stack((values[starts], lengths)).ravel()
+
+
+class SegmentMapService:
+    """
+    Builds and caches the segment map raster
+
+    Every pixel is assigned in a single vectorized predict call, and the
+    encoded result is kept per (model version, resolution).
+    """
+
+    MAX_CACHED_MAPS = 8
+
+    def __init__(self):
+        self._cache: "OrderedDict[Tuple[str, float], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def build_map(self, income_step: float = 0.5) -> SegmentMapResponse:
+        """
+        Compute the segment map for the loaded model
+
+        Args:
+            income_step: Income resolution in thousands per pixel
+
+        Returns:
+            SegmentMapResponse with the RLE raster and centroids
+        """
+        income_min, income_max = ANNUAL_INCOME_RANGE
+        score_min, score_max = SPENDING_SCORE_RANGE
+
+        # Whole steps that fit in the domain; a step that does not divide the
+        # range stops short of income_max instead of running past it
+        n_incomes = int(np.floor((income_max - income_min) / income_step + 1e-9)) + 1
+        incomes = np.minimum(income_min + income_step * np.arange(n_incomes), income_max)
+        scores = np.arange(score_min, score_max + 1, dtype=np.float64)
+
+        # Row-major grid, lowest spending score first
+        grid_income, grid_score = np.meshgrid(incomes, scores)
+        labels = ml_model.predict_batch(grid_income.ravel(), grid_score.ravel())
+
+        centroids = [
+            Centroid(
+                cluster_id=int(row.Cluster),
+                cluster_name=str(row.Cluster_Name),
+                annual_income=round(float(row.Annual_Income), 2),
+                spending_score=round(float(row.Spending_Score), 2)
+            )
+            for row in ml_model.get_cluster_centroids().itertuples()
+        ]
+
+        return SegmentMapResponse(
+            model_version=ml_model.model_version,
+            width=len(incomes),
+            height=len(scores),
+            income_min=income_min,
+            income_max=float(incomes[-1]),
+            income_step=income_step,
+            score_min=float(score_min),
+            score_max=float(scores[-1]),
+            score_step=1.0,
+            runs=run_length_encode(labels).tolist(),
+            centroids=centroids
+        )
+
+    def get_map_json(self, income_step: float = 0.5) -> Tuple[str, bytes]:
+        """
+        Get the serialized segment map, building it on first use
+
+        Args:
+            income_step: Income resolution in thousands per pixel
+
+        Returns:
+            Tuple of (model_version, JSON body)
+        """
+        if not ml_model.is_loaded:
+            raise RuntimeError("Models not loaded.")
+
+        key = (ml_model.model_version, income_step)
+        with self._lock:
+            body = self._cache.get(key)
+            if body is not None:
+                self._cache.move_to_end(key)
+                return key[0], body
+
+        body = self.build_map(income_step).model_dump_json().encode()
+
+        with self._lock:
+            self._cache[key] = body
+            while len(self._cache) > self.MAX_CACHED_MAPS:
+                self._cache.popitem(last=False)
+        return key[0], body
+
+    def memory_usage(self) -> dict:
+        """Number and total size of the cached map bodies"""
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.MAX_CACHED_MAPS,
+                "bytes": sum(len(body) for body in self._cache.values())
+            }
+
+
+# Service instance
+segment_map_service = SegmentMapService()
@@ -0,0 +1,175 @@
+"""
+Shadow model evaluation
+Scores a sample of live predictions with a candidate model off the request path
+and tracks how its assignments agree with the active model
+"""
+import asyncio
+import logging
+import random
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.ml_model import CustomerSegmentationModel, ml_model
+from app.models.training import contingency_agreement
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowService:
+    """
+    Runs a candidate model in the shadow of the active one
+
+    Request handlers only enqueue sampled inputs (never blocking, dropping
+    when the queue is full); a background task scores them in batches with
+    the candidate and adds them to an active x candidate agreement matrix.
+    """
+
+    def __init__(self):
+        self.candidate = CustomerSegmentationModel()
+        self.sample_rate = settings.SHADOW_SAMPLE_RATE
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._active_version: Optional[str] = None
+        self.observed = 0
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None and self.candidate.is_loaded
+
+    def start(self) -> bool:
+        """
+        Load the candidate from SHADOW_MODEL_DIR and start the background scorer
+
+        Must be called from the running event loop.
+
+        Returns:
+            True if shadow mode is running
+        """
+        if not settings.SHADOW_MODEL_DIR:
+            return False
+        model_dir = Path(settings.SHADOW_MODEL_DIR)
+        if not self.candidate.load_models(
+            str(model_dir / "kmeans_model.pkl"),
+            str(model_dir / "scaler.pkl")
+        ):
+            logger.warning("Shadow model not loaded from %s", model_dir)
+            return False
+
+        self.reset()
+        self._queue = asyncio.Queue(maxsize=settings.SHADOW_QUEUE_SIZE)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Shadow model %s running on %.1f%% of /predict traffic",
+            self.candidate.model_version, self.sample_rate * 100
+        )
+        return True
+
+    async def stop(self) -> None:
+        """Stop the background scorer"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reset(self) -> None:
+        """Clear the agreement matrix and counters"""
+        n_active = len(ml_model.kmeans.cluster_centers_) if ml_model.is_loaded else 0
+        n_candidate = len(self.candidate.kmeans.cluster_centers_) if self.candidate.is_loaded else 0
+        self._matrix = np.zeros((n_active, n_candidate), dtype=np.int64)
+        self._active_version = ml_model.model_version
+        self.observed = 0
+        self.dropped = 0
+
+    def observe(self, annual_income: float, spending_score: float, active_cluster: int) -> None:
+        """
+        Offer one live prediction to the shadow model
+
+        Cheap and non-blocking: samples, then enqueues or drops.
+
+        Args:
+            annual_income: Request income
+            spending_score: Request spending score
+            active_cluster: Cluster assigned by the active model
+        """
+        if self._queue is None or random.random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait((annual_income, spending_score, active_cluster))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < settings.SHADOW_BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                self._score(np.array(batch, dtype=np.float64))
+            except Exception:
+                logger.exception("Shadow scoring failed")
+            # Let request handlers run between batches
+            await asyncio.sleep(0)
+
+    def _score(self, batch: np.ndarray) -> None:
+        if ml_model.model_version != self._active_version:
+            # The active model was swapped; old counts no longer apply
+            self.reset()
+        candidate = self.candidate.predict_batch(batch[:, 0], batch[:, 1])
+        np.add.at(self._matrix, (batch[:, 2].astype(np.int64), candidate), 1)
+        self.observed += len(batch)
+
+    def get_report(self) -> Dict:
+        """
+        Agreement between the active and candidate models so far
+
+        Returns:
+            Dictionary matching ShadowReport
+        """
+        report = {
+            "enabled": self.enabled,
+            "active_version": ml_model.model_version,
+            "candidate_version": self.candidate.model_version,
+            "sample_rate": self.sample_rate,
+            "observed": self.observed,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "raw_agreement": None,
+            "matched_agreement": None,
+            "cluster_mapping": {},
+            "matrix": []
+        }
+        if self._matrix is None:
+            return report
+
+        matrix = self._matrix.copy()
+        report["matrix"] = matrix.tolist()
+        if self.observed:
+            # Same cluster id (meaningful when the candidate keeps the label order)
+            k = min(matrix.shape)
+            report["raw_agreement"] = float(np.trace(matrix[:k, :k]) / matrix.sum())
+            # Best one-to-one matching of cluster ids, invariant to relabeling
+            agreement, mapping = contingency_agreement(matrix)
+            report["matched_agreement"] = agreement
+            report["cluster_mapping"] = {str(a): c for a, c in mapping.items()}
+        return report
+
+    def memory_usage(self) -> Dict:
+        """Candidate model arrays and the agreement matrix"""
+        return {
+            "candidate": self.candidate.memory_usage(),
+            "matrix_bytes": self._matrix.nbytes if self._matrix is not None else 0,
+            "queued": self._queue.qsize() if self._queue is not None else 0
+        }
+
+
+# Service instance
+shadow_service = ShadowService()
@@ -0,0 +1,118 @@
+"""
+Streaming predictions
+Parses compact "income,score" messages and scores many of them in one model pass
+"""
+from typing import List
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.ml_model import ml_model
+from app.schemas.columnar import validate_customer_columns
+
+
+# Cluster id returned for lines that cannot be parsed or are out of range
+INVALID_CLUSTER = -1
+
+
+def count_lines(text: str) -> int:
+    """Upper bound on the customers in a message, without parsing it"""
+    return text.count("\n") + 1
+
+
+def parse_points(text: str) -> np.ndarray:
+    """
+    Parse one message of "income,score" lines
+
+    Args:
+        text: Message body, one customer per line
+
+    Returns:
+        Array of shape (n_lines, 2); unparseable lines are NaN
+    """
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return np.empty((0, 2), dtype=np.float64)
+
+    # Fast path: every line is exactly one pair. The check is per line; a
+    # total field count alone would let a bad line borrow from the next one.
+    if all(line.count(",") == 1 for line in lines):
+        try:
+            return np.array(",".join(lines).split(","), dtype=np.float64).reshape(-1, 2)
+        except ValueError:
+            pass
+
+    points = np.full((len(lines), 2), np.nan)
+    for i, line in enumerate(lines):
+        fields = line.split(",")
+        if len(fields) != 2:
+            continue
+        try:
+            points[i] = float(fields[0]), float(fields[1])
+        except ValueError:
+            continue
+    return points
+
+
+class StreamPredictionService:
+    """
+    Scores batches of streamed messages with the shared model
+
+    Also counts the open streams so the endpoint can refuse new ones beyond
+    STREAM_MAX_CONNECTIONS; the count is only touched from the event loop.
+    """
+
+    def __init__(self):
+        self.connections = 0
+
+    def try_connect(self) -> bool:
+        """
+        Reserve a stream slot
+
+        Returns:
+            False if STREAM_MAX_CONNECTIONS streams are already open
+        """
+        if self.connections >= settings.STREAM_MAX_CONNECTIONS:
+            return False
+        self.connections += 1
+        return True
+
+    def disconnect(self) -> None:
+        """Release a slot taken by try_connect"""
+        self.connections -= 1
+
+    @staticmethod
+    def score_messages(messages: List[str]) -> List[str]:
+        """
+        Score several messages with a single model call
+
+        Args:
+            messages: Message bodies in arrival order
+
+        Returns:
+            One reply per message: the cluster ids of its lines, newline-separated,
+            with INVALID_CLUSTER for invalid lines
+        """
+        if not ml_model.is_loaded:
+            raise RuntimeError("Models not loaded. Please load models first.")
+
+        parsed = [parse_points(message) for message in messages]
+        points = np.concatenate(parsed) if parsed else np.empty((0, 2))
+        columns = validate_customer_columns(points[:, 0], points[:, 1], max_errors=0)
+        valid = columns.valid
+
+        clusters = np.full(len(points), INVALID_CLUSTER, dtype=np.int64)
+        if valid.any():
+            clusters[valid] = ml_model.predict_batch(columns.annual_income[valid], columns.spending_score[valid])
+
+        labels = clusters.astype(str)
+        replies = []
+        offset = 0
+        for chunk in parsed:
+            replies.append("\n".join(labels[offset:offset + len(chunk)]))
+            offset += len(chunk)
+        return replies
+
+
+# Service instance
+stream_prediction_service = StreamPredictionService()
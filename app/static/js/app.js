@@ -16,10 +16,23 @@ function updateRangeValue(inputId, displayId) {
   }
 }
 
+// Cluster colors shared by the result card and the segment map
+const CLUSTER_COLORS = {
+  0: "#8b5cf6", // Purple - Average
+  1: "#ef4444", // Red - VIP
+  2: "#f59e0b", // Orange - Young Trendsetter
+  3: "#10b981", // Green - High Earner Saver
+  4: "#3b82f6", // Blue - Budget Conscious
+};
+
+// Segment map state, kept to mark predicted customers
+let segmentMap = null;
+
 // Initialize range inputs
 document.addEventListener("DOMContentLoaded", () => {
   updateRangeValue("income", "incomeValue");
   updateRangeValue("spending", "spendingValue");
+  loadSegmentMap();
 });
 
 // Predict customer segment
@@ -81,15 +94,7 @@ function displayResult(data) {
   const resultDiv = document.getElementById("result");
 
   // Get cluster color
-  const clusterColors = {
-    0: "#8b5cf6", // Purple - Average
-    1: "#ef4444", // Red - VIP
-    2: "#f59e0b", // Orange - Young Trendsetter
-    3: "#10b981", // Green - High Earner Saver
-    4: "#3b82f6", // Blue - Budget Conscious
-  };
-
-  const color = clusterColors[data.cluster_id] || "#667eea";
+  const color = CLUSTER_COLORS[data.cluster_id] || "#667eea";
 
   resultDiv.innerHTML = `
         <div class="result-card" style="background: linear-gradient(135deg, ${color} 0%, ${color}dd 100%);">
@@ -125,11 +130,103 @@ function displayResult(data) {
     `;
 
   resultDiv.classList.remove("hidden");
+  drawSegmentMap(data);
 
   // Smooth scroll to result
   resultDiv.scrollIntoView({ behavior: "smooth", block: "nearest" });
 }
 
+// Load the run-length encoded segment map
+async function loadSegmentMap() {
+  const canvas = document.getElementById("segmentMap");
+  if (!canvas) return;
+
+  try {
+    const response = await fetch(`${API_BASE}/clusters/map`);
+    if (!response.ok) throw new Error("Failed to load segment map");
+
+    segmentMap = await response.json();
+    drawSegmentMap();
+    displaySegmentMapLegend(segmentMap.centroids);
+  } catch (error) {
+    console.error("Error loading segment map:", error);
+  }
+}
+
+// Convert "#rrggbb" into [r, g, b]
+function hexToRgb(hex) {
+  const value = parseInt(hex.slice(1), 16);
+  return [(value >> 16) & 255, (value >> 8) & 255, value & 255];
+}
+
+// Draw the segment map, optionally marking a predicted customer
+function drawSegmentMap(point) {
+  const canvas = document.getElementById("segmentMap");
+  if (!canvas || !segmentMap) return;
+
+  const { width, height, runs } = segmentMap;
+  canvas.width = width;
+  canvas.height = height;
+  const ctx = canvas.getContext("2d");
+  const image = ctx.createImageData(width, height);
+
+  // Decode runs; rows arrive lowest score first, canvas rows go top-down
+  let pixel = 0;
+  for (let i = 0; i < runs.length; i += 2) {
+    const [r, g, b] = hexToRgb(CLUSTER_COLORS[runs[i]] || "#667eea");
+    for (let n = 0; n < runs[i + 1]; n++, pixel++) {
+      const row = height - 1 - Math.floor(pixel / width);
+      const offset = (row * width + (pixel % width)) * 4;
+      image.data[offset] = r;
+      image.data[offset + 1] = g;
+      image.data[offset + 2] = b;
+      image.data[offset + 3] = 170;
+    }
+  }
+  ctx.putImageData(image, 0, 0);
+
+  const toCanvas = (income, score) => [
+    (income - segmentMap.income_min) / segmentMap.income_step,
+    height - 1 - (score - segmentMap.score_min) / segmentMap.score_step,
+  ];
+
+  // Centroids
+  ctx.strokeStyle = "#1f2937";
+  ctx.lineWidth = 2;
+  for (const centroid of segmentMap.centroids) {
+    const [x, y] = toCanvas(centroid.annual_income, centroid.spending_score);
+    ctx.beginPath();
+    ctx.moveTo(x - 4, y - 4);
+    ctx.lineTo(x + 4, y + 4);
+    ctx.moveTo(x + 4, y - 4);
+    ctx.lineTo(x - 4, y + 4);
+    ctx.stroke();
+  }
+
+  // Predicted customer
+  if (point) {
+    const [x, y] = toCanvas(point.annual_income, point.spending_score);
+    ctx.fillStyle = "#ffffff";
+    ctx.beginPath();
+    ctx.arc(x, y, 4, 0, 2 * Math.PI);
+    ctx.fill();
+    ctx.stroke();
+  }
+}
+
+// Display the segment map legend
+function displaySegmentMapLegend(centroids) {
+  const container = document.getElementById("segmentMapLegend");
+  if (!container) return;
+
+  container.innerHTML = centroids
+    .map(
+      (centroid) =>
+        `<span style="--swatch: ${CLUSTER_COLORS[centroid.cluster_id] || "#667eea"};">${centroid.cluster_name}</span>`,
+    )
+    .join("");
+}
+
 // Show error message
 function showError(message) {
   const errorDiv = document.getElementById("error");
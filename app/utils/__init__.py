@@ -1,4 +1,4 @@
 """Utility functions"""
-from .helpers import setup_logger, format_currency, get_timestamp
+from .helpers import setup_logger, format_currency, get_timestamp, touch
 
-__all__ = ["setup_logger", "format_currency", "get_timestamp"]
+__all__ = ["setup_logger", "format_currency", "get_timestamp", "touch"]
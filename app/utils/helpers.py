@@ -1,33 +1,28 @@
 """Utility functions"""
 import logging
+import os
+import time
 from datetime import datetime
+from pathlib import Path
+
+from app.core.logging_config import configure_logging
 
 
 def setup_logger(name: str) -> logging.Logger:
     """
     Setup application logger
     
+    Records go through the shared queue-backed handler on the root logger,
+    so calling this repeatedly never duplicates output.
+    
     Args:
         name: Logger name
         
     Returns:
         Configured logger
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Console handler
-    handler = logging.StreamHandler()
-    handler.setLevel(logging.INFO)
-    
-    # Formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
-    
-    logger.addHandler(handler)
-    return logger
+    configure_logging()
+    return logging.getLogger(name)
 
 
 def format_currency(amount: float) -> str:
@@ -51,3 +46,17 @@ def get_timestamp() -> str:
         Formatted timestamp string
     """
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def touch(path: Path) -> None:
+    """
+    Set a file's access and modification time to now
+    
+    The timestamp is passed explicitly: the implicit one is as coarse as the
+    kernel tick, so files touched in quick succession could not be ordered.
+    
+    Args:
+        path: File or directory to touch
+    """
+    now = time.time_ns()
+    os.utime(path, ns=(now, now))
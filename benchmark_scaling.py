@@ -0,0 +1,220 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+import pandas as pd
+from pathlib import Path
+
+from app.core.logging_config import configure_logging
+from generate_dataset import SYNTHETIC_DIR, default_output_path, parse_rows
+
+# Paths
+BASE_DIR = Path(__file__).resolve().parent
+BENCH_DIR = SYNTHETIC_DIR / "bench"
+
+DEFAULT_SIZES = [10 ** 5, 10 ** 6, 10 ** 7]
+STAGES = ["generate", "preprocess", "train", "stats", "score"]
+
+logger = logging.getLogger("benchmark_scaling")
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_stage(stage, rows, data_path, work_dir, seed=42):
+    """
+    Run one stage in this process and return its measurements
+
+    Called in a fresh child process per stage so the peak RSS belongs to
+    that stage alone.
+    """
+    import numpy as np
+    from app.core.config import settings
+    from app.data.preprocessing import build_processed_cache, dataset_store
+    from app.data.synthetic import write_synthetic_csv
+    from app.models.ml_model import ml_model
+    from app.services.analytics_service import segment_analytics_service
+    from app.services.prediction_service import prediction_service
+    from train_model import DATA_PATH, train_and_save_model
+
+    baseline_mb = _peak_rss_mb()
+    detail = {}
+    start = time.perf_counter()
+
+    if stage == "generate":
+        # Children see RAW_DATA_PATH pointing at the synthetic file; imitate the real one
+        write_synthetic_csv(data_path, rows, seed=seed, source_path=str(DATA_PATH))
+    elif stage == "preprocess":
+        build_processed_cache(data_path, force=True)
+    elif stage == "train":
+        if not train_and_save_model(force=True, data_path=data_path, model_dir=work_dir / "models",
+                                    marketing_list=False):
+            raise RuntimeError("Training failed")
+    else:
+        if not ml_model.load_models():
+            raise RuntimeError(f"No model in {work_dir / 'models'}")
+        if stage == "stats":
+            segment_analytics_service.get_index()
+            detail["index_build_s"] = time.perf_counter() - start
+            query_start = time.perf_counter()
+            stats = asyncio.run(prediction_service.get_cluster_statistics())
+            detail["query_s"] = time.perf_counter() - query_start
+            if sum(s.count for s in stats) != rows:
+                raise RuntimeError("Cluster statistics do not cover the dataset")
+        elif stage == "score":
+            # The bulk endpoint's service path, one request per BULK_MAX_ROWS rows
+            dataset = dataset_store.get()
+            income = dataset["Annual_Income"]
+            score = dataset["Spending_Score"]
+            request_rows = settings.BULK_MAX_ROWS
+            counts = np.zeros(ml_model.kmeans.n_clusters, dtype=np.int64)
+            for offset in range(0, rows, request_rows):
+                result = prediction_service.predict_columns(
+                    income[offset:offset + request_rows],
+                    score[offset:offset + request_rows]
+                )
+                counts += np.bincount(result["cluster_id"], minlength=len(counts))
+            detail["requests"] = -(-rows // request_rows)
+            detail["rows_per_s"] = rows / (time.perf_counter() - start)
+            detail["cluster_counts"] = counts.tolist()
+        else:
+            raise ValueError(f"Unknown stage: {stage}")
+
+    return {
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": _peak_rss_mb(),
+        "baseline_rss_mb": baseline_mb,
+        **detail
+    }
+
+
+def _stage_env(data_path, work_dir):
+    """Point the app settings at the benchmark's data, cache and model"""
+    env = dict(os.environ)
+    env.update({
+        "RAW_DATA_PATH": str(data_path),
+        "DATA_CACHE_DIR": str(work_dir / "cache"),
+        "KMEANS_MODEL_PATH": str(work_dir / "models" / "kmeans_model.pkl"),
+        "SCALER_MODEL_PATH": str(work_dir / "models" / "scaler.pkl"),
+        "LOG_LEVEL": env.get("LOG_LEVEL", "WARNING")
+    })
+    return env
+
+
+def _spawn_stage(stage, rows, data_path, work_dir, seed):
+    result_path = work_dir / f"{stage}.json"
+    result_path.unlink(missing_ok=True)
+    command = [
+        sys.executable, str(BASE_DIR / "benchmark_scaling.py"),
+        "--stage", stage,
+        "--sizes", str(rows),
+        "--data", str(data_path),
+        "--work-dir", str(work_dir),
+        "--seed", str(seed),
+        "--result", str(result_path)
+    ]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=BASE_DIR, env=_stage_env(data_path, work_dir))
+    wall = time.perf_counter() - start
+    if completed.returncode != 0 or not result_path.exists():
+        return {"stage": stage, "rows": rows, "ok": False, "wall_s": wall}
+    with open(result_path, 'r') as f:
+        result = json.load(f)
+    return {"stage": stage, "rows": rows, "ok": True, "wall_s": wall, **result}
+
+
+def benchmark_scaling(sizes=DEFAULT_SIZES, stages=STAGES, seed=42, regenerate=False,
+                      bench_dir=BENCH_DIR, output=None):
+    logger.info("=" * 60)
+    logger.info("Benchmarking Scaling...")
+    logger.info("=" * 60)
+    logger.info(f"Sizes: {', '.join(f'{rows:,}' for rows in sizes)}")
+    logger.info(f"Stages: {', '.join(stages)}")
+
+    results = []
+    for rows in sizes:
+        data_path = default_output_path(rows, seed)
+        work_dir = Path(bench_dir) / str(rows)
+        work_dir.mkdir(parents=True, exist_ok=True)
+
+        for stage in stages:
+            if stage == "generate" and data_path.exists() and not regenerate:
+                logger.info(f"{rows:>12,} generate: reusing {data_path}")
+                continue
+            result = _spawn_stage(stage, rows, data_path, work_dir, seed)
+            results.append(result)
+            if not result["ok"]:
+                logger.error(f"{rows:>12,} {stage}: failed, skipping the remaining stages for this size")
+                break
+            logger.info(
+                f"{rows:>12,} {stage}: {result['seconds']:.2f}s, "
+                f"peak RSS {result['peak_rss_mb']:,.0f} MB"
+            )
+
+    table = pd.DataFrame(results)
+    if not table.empty:
+        columns = [c for c in ["seconds", "wall_s", "peak_rss_mb", "baseline_rss_mb"] if c in table]
+        logger.info("=" * 60)
+        logger.info("\n%s", table.set_index(["rows", "stage"])[columns].round(2).to_string())
+        logger.info("=" * 60)
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results saved: {output}")
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time training, cluster statistics and bulk scoring on synthetic data of growing size"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=parse_rows,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Dataset sizes in rows, e.g. 1e5 1e6 1e7 1e8"
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=STAGES,
+        default=STAGES,
+        help="Stages to run per size"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed")
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate datasets that already exist")
+    parser.add_argument("--bench-dir", default=str(BENCH_DIR), help="Per-size caches and models")
+    parser.add_argument("--output", help="Write all measurements as JSON")
+    # Internal: run a single stage (used by the child processes)
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    configure_logging(fmt="text")
+
+    if args.stage:
+        result = run_stage(args.stage, args.sizes[0], Path(args.data), Path(args.work_dir), args.seed)
+        with open(args.result, 'w') as f:
+            json.dump(result, f)
+    else:
+        results = benchmark_scaling(
+            sizes=args.sizes,
+            stages=args.stages,
+            seed=args.seed,
+            regenerate=args.regenerate,
+            bench_dir=args.bench_dir,
+            output=args.output
+        )
+        if any(not r["ok"] for r in results):
+            sys.exit(1)
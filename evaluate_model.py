@@ -0,0 +1,119 @@
+import argparse
+import json
+import logging
+import sys
+import time
+import pandas as pd
+from pathlib import Path
+
+from app.core.logging_config import configure_logging
+from app.data.preprocessing import load_processed_dataset, FEATURE_COLUMNS
+from app.models.ml_model import ml_model
+from app.models.training import TRAINING_ENGINES, DEFAULT_ENGINE
+from app.models.evaluation import bootstrap_stability, unstable_clusters, DEFAULT_MIN_STABILITY
+
+# Paths
+BASE_DIR = Path(__file__).resolve().parent
+DATA_PATH = BASE_DIR / "data" / "raw" / "mall_customers.csv"
+
+logger = logging.getLogger("evaluate_model")
+
+
+def evaluate_stability(resamples=100, workers=None, engine=DEFAULT_ENGINE, n_init=10,
+                       seed=42, min_stability=DEFAULT_MIN_STABILITY, output=None):
+    logger.info("=" * 60)
+    logger.info("Evaluating Cluster Stability...")
+    logger.info("=" * 60)
+    
+    try:
+        dataset = load_processed_dataset(str(DATA_PATH))
+    except FileNotFoundError:
+        logger.error(f"Data file not found at {DATA_PATH}")
+        return None
+    
+    if not ml_model.load_models():
+        logger.error("Production model not found, train it first with train_model.py")
+        return None
+    
+    # Production scaling and labels are the reference
+    X = pd.DataFrame(dataset.features(), columns=FEATURE_COLUMNS)
+    X_scaled = ml_model.scaler.transform(X)
+    reference = ml_model.predict_batch(X['Annual_Income'].to_numpy(), X['Spending_Score'].to_numpy())
+    logger.info(f"Model {ml_model.model_version}: {len(X)} customers, {reference.max() + 1} clusters")
+    logger.info(f"Refitting on {resamples} bootstrap resamples (engine: {engine})...")
+    
+    start = time.perf_counter()
+    report = bootstrap_stability(
+        X_scaled,
+        reference,
+        n_resamples=resamples,
+        engine=engine,
+        n_init=n_init,
+        random_state=seed,
+        workers=workers
+    )
+    report["model_version"] = ml_model.model_version
+    report["wall_time_s"] = time.perf_counter() - start
+    logger.info(f"Done in {report['wall_time_s']:.1f}s on {report['workers']} workers")
+    
+    table = pd.DataFrame(report["clusters"]).set_index("cluster")
+    table.insert(0, "name", [ml_model.cluster_names.get(c, "Unknown") for c in table.index])
+    logger.info("Per-cluster stability (bootstrap Jaccard):")
+    logger.info("\n%s", table.round(3).to_string())
+    logger.info(f"Agreement with production: mean {report['agreement_mean']:.3f}, "
+                f"5th percentile {report['agreement_p05']:.3f}")
+    logger.info(f"Adjusted Rand index: mean {report['adjusted_rand_mean']:.3f}")
+    
+    unstable = unstable_clusters(report, min_stability)
+    report["min_stability"] = min_stability
+    report["unstable_clusters"] = unstable
+    logger.info("=" * 60)
+    if unstable:
+        logger.info(f"Unstable clusters (mean Jaccard < {min_stability}): {unstable}")
+    else:
+        logger.info(f"All clusters stable (mean Jaccard >= {min_stability})")
+    logger.info("=" * 60)
+    
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Report saved: {output}")
+    
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bootstrap stability of the production segmentation model")
+    parser.add_argument("--resamples", type=int, default=100, help="Number of bootstrap resamples")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument(
+        "--engine",
+        choices=list(TRAINING_ENGINES),
+        default=DEFAULT_ENGINE,
+        help="KMeans training algorithm for the refits"
+    )
+    parser.add_argument("--n-init", type=int, default=10, help="Number of k-means++ restarts per refit")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for the resamples")
+    parser.add_argument(
+        "--min-stability",
+        type=float,
+        default=DEFAULT_MIN_STABILITY,
+        help="Minimum mean Jaccard per cluster; exits with status 1 if any cluster is below"
+    )
+    parser.add_argument("--output", help="Write the full report as JSON")
+    args = parser.parse_args()
+    configure_logging(fmt="text")
+    
+    report = evaluate_stability(
+        resamples=args.resamples,
+        workers=args.workers,
+        engine=args.engine,
+        n_init=args.n_init,
+        seed=args.seed,
+        min_stability=args.min_stability,
+        output=args.output
+    )
+    if report is None:
+        sys.exit(2)
+    if report["unstable_clusters"]:
+        sys.exit(1)
@@ -0,0 +1,69 @@
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.data.synthetic import write_synthetic_csv, BLOCK_ROWS
+
+# Paths
+BASE_DIR = Path(__file__).resolve().parent
+SYNTHETIC_DIR = BASE_DIR / "data" / "synthetic"
+
+logger = logging.getLogger("generate_dataset")
+
+
+def parse_rows(value):
+    """Row counts may be written as 100000, 1e5 or 100_000"""
+    rows = int(float(str(value).replace("_", "")))
+    if rows < 1:
+        raise argparse.ArgumentTypeError(f"row count must be positive: {value}")
+    return rows
+
+
+def default_output_path(rows, seed=42):
+    return SYNTHETIC_DIR / f"mall_customers_{rows}_seed{seed}.csv"
+
+
+def generate_dataset(rows, output=None, seed=42, source=None, block_rows=BLOCK_ROWS):
+    logger.info("=" * 60)
+    logger.info("Generating Synthetic Customer Data...")
+    logger.info("=" * 60)
+
+    output = Path(output or default_output_path(rows, seed))
+    source = source or settings.RAW_DATA_PATH
+    logger.info(f"Source distribution: {source}")
+    logger.info(f"Rows: {rows:,} in blocks of {block_rows:,} (seed {seed})")
+
+    start = time.perf_counter()
+    try:
+        path = write_synthetic_csv(output, rows, seed=seed, source_path=source, block_rows=block_rows)
+    except FileNotFoundError:
+        logger.error(f"Source data file not found at {source}")
+        return None
+    elapsed = time.perf_counter() - start
+
+    size_mb = path.stat().st_size / 1e6
+    logger.info(f"Synthetic dataset saved: {path}")
+    logger.info(f"   {size_mb:,.1f} MB in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    logger.info("=" * 60)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic customer dataset")
+    parser.add_argument("--rows", type=parse_rows, required=True, help="Number of customers, e.g. 1e6")
+    parser.add_argument(
+        "--output",
+        help="Output CSV (default: data/synthetic/mall_customers_<rows>_seed<seed>.csv)"
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Generator seed")
+    parser.add_argument("--source", help="Raw CSV whose distribution is imitated (default: data/raw/mall_customers.csv)")
+    parser.add_argument("--block-rows", type=parse_rows, default=BLOCK_ROWS, help="Rows generated and written per block")
+    args = parser.parse_args()
+    configure_logging(fmt="text")
+
+    if generate_dataset(args.rows, args.output, args.seed, args.source, args.block_rows) is None:
+        sys.exit(2)
@@ -2,16 +2,43 @@
 Main FastAPI Application
 Customer Segmentation ML Application with MVC Architecture
 """
+import logging
 import uvicorn
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.admission import AdmissionControlMiddleware, admission_controller
+from app.core.logging_config import configure_logging, shutdown_logging, dropped_records, RequestLoggingMiddleware
+from app.core.diagnostics import memory_diagnostics
+from app.core.static_assets import static_assets
 from app.controllers.api_controller import router as api_router
+from app.controllers.job_controller import router as job_router
 from app.controllers.view_controller import router as view_router
+from app.controllers.admin_controller import router as admin_router
+from app.controllers.analytics_controller import router as analytics_router
+from app.data.preprocessing import dataset_store
 from app.models.ml_model import ml_model
+from app.services.job_service import job_service
+from app.services.segment_map_service import segment_map_service
+from app.services.analytics_service import segment_analytics_service
+from app.services.shadow_service import shadow_service
+
+
+# Logging is configured in the lifespan, after uvicorn has set up its own loggers
+logger = logging.getLogger("main")
+
+# Components reported by the admin memory diagnostics
+memory_diagnostics.register("model", ml_model.memory_usage)
+memory_diagnostics.register("dataset", dataset_store.memory_usage)
+memory_diagnostics.register("segment_map_cache", segment_map_service.memory_usage)
+memory_diagnostics.register("segment_index", segment_analytics_service.memory_usage)
+memory_diagnostics.register("static_assets", static_assets.memory_usage)
+memory_diagnostics.register("shadow", shadow_service.memory_usage)
+memory_diagnostics.register("jobs", job_service.memory_usage)
+memory_diagnostics.register("logging", lambda: {"dropped_records": dropped_records()})
 
 
 @asynccontextmanager
@@ -21,28 +48,41 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events
     """
     # Startup: Load ML models
-    print("=" * 50)
-    print("Starting Customer Segmentation API...")
-    print("=" * 50)
+    configure_logging()
+    logger.info("Starting Customer Segmentation API...")
     
     success = ml_model.load_models()
     if success:
-        print("ML models loaded successfully")
+        logger.info("ML models loaded successfully")
+        # Precompute the segment analytics index while the data loads
+        try:
+            segment_analytics_service.get_index()
+        except Exception as e:
+            logger.warning("Segment index not built: %s", e)
     else:
-        print("Warning: ML models not loaded")
-        print("   Please train the model using the Jupyter notebooks")
-        print("   Then run the training script to save models")
+        logger.warning(
+            "ML models not loaded. Please train the model using the Jupyter notebooks, "
+            "then run the training script to save models"
+        )
+    
+    job_service.start()
+    job_service.start_cleanup()
+    if success:
+        shadow_service.start()
+    
+    # Hash and precompress static files once
+    logger.info("Static assets ready: %d files", static_assets.build())
     
-    print("=" * 50)
-    print(f"Application started: {settings.APP_NAME} v{settings.APP_VERSION}")
-    print("=" * 50)
+    logger.info("Application started: %s v%s", settings.APP_NAME, settings.APP_VERSION)
     
     yield
     
     # Shutdown
-    print("\n" + "=" * 50)
-    print("🛑 Shutting down Customer Segmentation API...")
-    print("=" * 50)
+    logger.info("Shutting down Customer Segmentation API...")
+    await shadow_service.stop()
+    await job_service.stop_cleanup()
+    job_service.shutdown()
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -55,6 +95,14 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Admission control (sheds load with 503 + Retry-After before work starts)
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        controller=admission_controller,
+        routes=settings.ADMISSION_ROUTES,
+    )
+
 # CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -64,15 +112,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files
-app.mount(
-    "/static", 
-    StaticFiles(directory=str(settings.BASE_DIR / "app" / "static")), 
-    name="static"
+# Response compression (content-negotiated, streams chunk by chunk)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    compresslevel=settings.COMPRESSION_LEVEL,
+    excluded_paths=settings.COMPRESSION_EXCLUDED_PATHS,
 )
 
+# Request ids and sampled structured access logs (outermost, so it times everything)
+app.add_middleware(RequestLoggingMiddleware)
+
+# Static files are served from memory by the view router (fingerprinted, precompressed)
+
 # Include routers
 app.include_router(api_router)  # API endpoints
+app.include_router(job_router)  # Asynchronous scoring jobs
+app.include_router(analytics_router)  # Segment analytics
+app.include_router(admin_router)  # Admin diagnostics (requires ADMIN_TOKEN)
 app.include_router(view_router)  # HTML views
 
 # Root endpoint redirect
@@ -94,5 +151,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,  # Enable auto-reload for development
-        log_level="info"
+        log_level="info",
+        access_log=False  # RequestLoggingMiddleware writes access logs off the event loop
     )
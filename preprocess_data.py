@@ -0,0 +1,52 @@
+import argparse
+import logging
+
+from app.core.config import settings
+from app.core.logging_config import configure_logging
+from app.data.preprocessing import build_processed_cache, ProcessedDataset
+
+
+logger = logging.getLogger("preprocess_data")
+
+
+def preprocess_data(raw_path=None, cache_dir=None, force=False, export_csv=None):
+    logger.info("=" * 60)
+    logger.info("Preprocessing Customer Data...")
+    logger.info("=" * 60)
+
+    raw_path = raw_path or settings.RAW_DATA_PATH
+    logger.info(f"Source: {raw_path}")
+    try:
+        version_dir = build_processed_cache(raw_path, cache_dir, force=force)
+    except FileNotFoundError:
+        logger.error(f"Raw data file not found at {raw_path}")
+        return False
+
+    dataset = ProcessedDataset(version_dir)
+    logger.info(f"Columnar cache ready: {version_dir}")
+    logger.info(f"   Rows: {len(dataset)}")
+    for name, column in dataset.columns.items():
+        logger.info(f"   {name}: {column.dtype}")
+
+    if export_csv:
+        dataset.to_frame().to_csv(export_csv, index=False)
+        logger.info(f"Processed CSV exported: {export_csv}")
+
+    logger.info("=" * 60)
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the processed dataset cache")
+    parser.add_argument("--raw", help="Raw customer CSV (default: data/raw/mall_customers.csv)")
+    parser.add_argument("--cache-dir", help="Cache directory (default: data/cache)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the source is unchanged")
+    parser.add_argument(
+        "--export-csv",
+        nargs="?",
+        const=settings.PROCESSED_DATA_PATH,
+        help="Also write the processed CSV used by the notebooks"
+    )
+    args = parser.parse_args()
+    configure_logging(fmt="text")
+    preprocess_data(args.raw, args.cache_dir, args.force, args.export_csv)
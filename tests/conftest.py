@@ -0,0 +1,47 @@
+"""
+Shared fixtures
+
+Caches, jobs and logs are redirected to a temporary directory before the app
+is imported, so tests never touch data/cache, data/jobs or the model artifacts.
+"""
+import os
+import tempfile
+from pathlib import Path
+
+_TMP = Path(tempfile.mkdtemp(prefix="segmentation-tests-"))
+os.environ.setdefault("DATA_CACHE_DIR", str(_TMP / "cache"))
+os.environ.setdefault("JOBS_DIR", str(_TMP / "jobs"))
+os.environ.setdefault("LOG_FORMAT", "text")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.models.ml_model import ml_model  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def model():
+    """The production model, loaded once"""
+    if not ml_model.is_loaded and not ml_model.load_models():
+        pytest.skip("Model artifacts not available")
+    return ml_model
+
+
+@pytest.fixture(scope="session")
+def client(model):
+    """TestClient for the full application (lifespan included)"""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def tmp_settings(monkeypatch):
+    """Override settings attributes for one test"""
+    def override(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(settings, name, value)
+    return override
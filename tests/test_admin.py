@@ -0,0 +1,61 @@
+"""Admin memory diagnostics"""
+import pytest
+
+from app.core.diagnostics import MemoryDiagnostics, memory_diagnostics, process_memory
+
+MEMORY_URL = "/api/v1/admin/memory"
+
+
+@pytest.fixture
+def admin(tmp_settings):
+    tmp_settings(ADMIN_TOKEN="secret")
+    yield {"X-Admin-Token": "secret"}
+    memory_diagnostics.stop_tracing()
+
+
+def test_hidden_without_token_configured(client, tmp_settings):
+    tmp_settings(ADMIN_TOKEN=None)
+    assert client.get(MEMORY_URL, headers={"X-Admin-Token": "anything"}).status_code == 404
+
+
+def test_wrong_token_is_forbidden(client, admin):
+    assert client.get(MEMORY_URL).status_code == 403
+    assert client.get(MEMORY_URL, headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_report_lists_components(client, admin):
+    response = client.get(MEMORY_URL, headers=admin)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["process"]["rss_bytes"] > 0
+    assert {"model", "dataset", "segment_map_cache", "segment_index", "jobs", "logging"} <= set(report["components"])
+    assert report["components"]["model"]["loaded"] is True
+    assert report["tracemalloc"] is False
+
+
+def test_tracing_starts_then_reports_and_stops(client, admin):
+    first = client.get(MEMORY_URL, params={"top": 5}, headers=admin).json()
+    assert first["allocations"]["started"] is True
+
+    second = client.get(MEMORY_URL, params={"top": 5, "diff": True}, headers=admin).json()
+    allocations = second["allocations"]
+    assert allocations["started"] is False and allocations["diff"] is True
+    assert len(allocations["top"]) <= 5
+    assert all("size_diff_bytes" in entry for entry in allocations["top"])
+
+    assert client.delete(f"{MEMORY_URL}/trace", headers=admin).status_code == 204
+    assert client.get(MEMORY_URL, headers=admin).json()["tracemalloc"] is False
+
+
+def test_failing_component_is_reported_not_raised():
+    diagnostics = MemoryDiagnostics()
+    diagnostics.register("ok", lambda: {"bytes": 1})
+    diagnostics.register("broken", lambda: 1 / 0)
+    components = diagnostics.components()
+    assert components["ok"] == {"bytes": 1}
+    assert "division by zero" in components["broken"]["error"]
+
+
+def test_process_memory_reads_proc():
+    memory = process_memory()
+    assert memory["peak_rss_bytes"] >= memory["rss_bytes"] > 0
@@ -0,0 +1,106 @@
+"""Admission control and load shedding"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.admission import AdmissionControlMiddleware, AdmissionController, Overloaded, classify_route
+
+
+def _controller(max_in_flight=8, **overrides):
+    classes = {
+        "predict": {"max_in_flight": 1, "max_queue": 2, "wait_budget": 0.5, "priority": 0},
+        "bulk": {"max_in_flight": 1, "max_queue": 2, "wait_budget": 0.5, "priority": 1}
+    }
+    for name, config in overrides.items():
+        classes[name].update(config)
+    return AdmissionController(classes, max_in_flight)
+
+
+def test_classify_route_longest_prefix():
+    routes = {"/api/v1/predict": "predict", "/api/v1/predict/bulk": "bulk"}
+    assert classify_route("/api/v1/predict", routes) == "predict"
+    assert classify_route("/api/v1/predict/bulk", routes) == "bulk"
+    assert classify_route("/api/v1/predictions", routes) is None
+    assert classify_route("/", routes) is None
+
+
+def test_waiter_gets_the_freed_slot():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire("predict")
+        waiting = asyncio.ensure_future(controller.acquire("predict"))
+        await asyncio.sleep(0)
+        assert controller.snapshot()["classes"]["predict"]["queued"] == 1
+
+        controller.release("predict", 0.01)
+        await waiting
+        state = controller.snapshot()["classes"]["predict"]
+        assert (state["in_flight"], state["queued"], state["admitted"]) == (1, 0, 2)
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_is_shed():
+    async def scenario():
+        controller = _controller(predict={"max_queue": 1})
+        await controller.acquire("predict")
+        waiting = asyncio.ensure_future(controller.acquire("predict"))
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as shed:
+            await controller.acquire("predict")
+        assert shed.value.retry_after > 0
+        controller.release("predict", 0.01)
+        await waiting
+        assert controller.snapshot()["classes"]["predict"]["rejected"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_wait_budget_expires():
+    async def scenario():
+        controller = _controller(predict={"wait_budget": 0.05, "max_queue": 5})
+        controller.classes["predict"].service_time = 0.0
+        await controller.acquire("predict")
+        with pytest.raises(Overloaded):
+            await controller.acquire("predict")
+        assert controller.snapshot()["classes"]["predict"]["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_higher_priority_waiter_is_served_first():
+    async def scenario():
+        # One global slot shared by both classes
+        controller = _controller(max_in_flight=1)
+        await controller.acquire("bulk")
+        predict = asyncio.ensure_future(controller.acquire("predict"))
+        await asyncio.sleep(0)
+
+        # Lower priority is shed while a higher-priority request waits
+        with pytest.raises(Overloaded):
+            await controller.acquire("bulk")
+
+        controller.release("bulk", 0.01)
+        await predict
+        assert controller.snapshot()["classes"]["predict"]["in_flight"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_middleware_rejects_with_retry_after():
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/api/v1/predict", ok), Route("/other", ok)])
+    controller = _controller(predict={"max_in_flight": 0, "max_queue": 0})
+    app.add_middleware(AdmissionControlMiddleware, controller=controller, routes={"/api/v1/predict": "predict"})
+
+    with TestClient(app) as client:
+        shed = client.get("/api/v1/predict")
+        assert shed.status_code == 503
+        assert int(shed.headers["Retry-After"]) >= 1
+        assert client.get("/other").status_code == 200
@@ -0,0 +1,122 @@
+"""Segment analytics cube and bitmap indexes, checked against pandas"""
+import io
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.data.preprocessing import dataset_store
+from app.services.analytics_service import DIMENSIONS, band_codes, band_labels, segment_analytics_service
+
+
+@pytest.fixture(scope="module")
+def frame(model):
+    """Every customer with its dimension labels, computed independently of the cube"""
+    dataset = dataset_store.get()
+    df = dataset.to_frame()
+
+    def bands(values, edges, unit=""):
+        bins = [*edges, np.inf]
+        codes = pd.cut(values, bins=bins, right=False, labels=False)
+        # Values below the first edge belong to the first band
+        codes = codes.fillna(0).astype(int)
+        return np.array(band_labels(edges, unit))[codes]
+
+    df["gender"] = np.array(dataset.categories["Gender"])[df["Gender"]]
+    df["age_band"] = bands(df["Age"], settings.ANALYTICS_AGE_BANDS)
+    df["income_band"] = bands(df["Annual_Income"], settings.ANALYTICS_INCOME_BANDS, "k")
+    df["cluster"] = model.predict_batch(df["Annual_Income"], df["Spending_Score"]).astype(str)
+    return df
+
+
+@pytest.fixture(scope="module")
+def index(model):
+    return segment_analytics_service.get_index()
+
+
+def _expected(df, group_by):
+    grouped = df.groupby(list(group_by)).agg(
+        count=("Age", "size"),
+        avg_income=("Annual_Income", "mean"),
+        avg_spending_score=("Spending_Score", "mean"),
+        avg_age=("Age", "mean")
+    ).round(2)
+    return {
+        tuple(key if isinstance(key, tuple) else (key,)): row.to_dict()
+        for key, row in grouped.iterrows()
+    }
+
+
+def test_band_helpers():
+    assert band_labels([18, 25, 35]) == ["18-24", "25-34", "35+"]
+    assert band_labels([0, 30], "k") == ["0k-29k", "30k+"]
+    np.testing.assert_array_equal(band_codes(np.array([10, 18, 24, 25, 99]), [18, 25, 35]), [0, 0, 0, 1, 2])
+
+
+@pytest.mark.parametrize("group_by", [g for n in (1, 2) for g in combinations(DIMENSIONS, n)])
+def test_grouped_aggregates_match_pandas(index, frame, group_by):
+    total, groups = index.aggregate({}, group_by)
+    assert total["count"] == len(frame)
+
+    expected = _expected(frame, group_by)
+    actual = {
+        tuple(group["key"][dim] for dim in group_by): {
+            name: group[name] for name in ("count", "avg_income", "avg_spending_score", "avg_age")
+        }
+        for group in groups
+    }
+    assert actual.keys() == expected.keys()
+    for key, row in expected.items():
+        assert actual[key]["count"] == row["count"]
+        for name in ("avg_income", "avg_spending_score", "avg_age"):
+            assert actual[key][name] == pytest.approx(row[name], abs=0.01)
+
+
+def test_filtered_slice_matches_pandas(index, frame):
+    filters = {"gender": ["Female"], "age_band": ["25-34", "35-44"], "cluster": ["1", "3"]}
+    total, groups = index.aggregate(filters, ["cluster"])
+
+    mask = (frame["gender"] == "Female") & frame["age_band"].isin(["25-34", "35-44"]) \
+        & frame["cluster"].isin(["1", "3"])
+    subset = frame[mask]
+    assert total["count"] == len(subset)
+    assert total["avg_income"] == pytest.approx(round(subset["Annual_Income"].mean(), 2), abs=0.01)
+    assert {g["key"]["cluster"]: g["count"] for g in groups} == subset["cluster"].value_counts().to_dict()
+
+    np.testing.assert_array_equal(index.matching_rows(filters), np.flatnonzero(mask.to_numpy()))
+
+
+def test_unknown_values_rejected(index):
+    with pytest.raises(ValueError, match="Unknown gender"):
+        index.aggregate({"gender": ["Other"]})
+    with pytest.raises(ValueError, match="Unknown dimension"):
+        index.aggregate({}, ["region"])
+
+
+def test_query_endpoint(client, frame):
+    response = client.get(
+        "/api/v1/segments/query",
+        params={"gender": "Male", "group_by": ["income_band"]}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    males = frame[frame["gender"] == "Male"]
+    assert body["total"]["count"] == len(males)
+    assert {g["key"]["income_band"]: g["count"] for g in body["groups"]} == males["income_band"].value_counts().to_dict()
+
+    assert client.get("/api/v1/segments/query", params={"cluster": "9"}).status_code == 422
+    assert set(client.get("/api/v1/segments/dimensions").json()["dimensions"]) == set(DIMENSIONS)
+
+
+def test_customers_csv(client, frame):
+    response = client.get("/api/v1/segments/customers", params={"cluster": ["0", "2"]})
+    assert response.status_code == 200
+    exported = pd.read_csv(io.StringIO(response.text))
+    expected = frame[frame["cluster"].isin(["0", "2"])]
+    assert len(exported) == len(expected)
+    np.testing.assert_array_equal(exported["Annual_Income"], expected["Annual_Income"])
+    np.testing.assert_array_equal(exported["Age_Band"], expected["age_band"])
+
+    assert client.get("/api/v1/segments/customers", params={"age_band": "0-1"}).status_code == 422
@@ -0,0 +1,161 @@
+"""Columnar validation and the bulk prediction endpoint"""
+import json
+
+import numpy as np
+import pytest
+
+from app.schemas.columnar import to_float_array, validate_customer_columns
+
+BULK_URL = "/api/v1/predict/bulk"
+
+
+def test_to_float_array_maps_non_numeric_to_nan():
+    array = to_float_array([1, 2.5, "x", None, True])
+    np.testing.assert_array_equal(array[:2], [1.0, 2.5])
+    assert np.isnan(array[2:]).all()
+
+
+@pytest.mark.parametrize("column, expected", [
+    ([70, 15.5], [70.0, 15.5]),
+    (["70", "15"], [np.nan, np.nan]),
+    (["70", 15], [np.nan, 15.0]),
+    ([True, False], [np.nan, np.nan]),
+    ([True, 15], [np.nan, 15.0])
+])
+def test_to_float_array_only_accepts_numbers(column, expected):
+    # Uniform columns take the fast path, mixed ones the fallback; both agree
+    np.testing.assert_array_equal(to_float_array(column), expected)
+
+
+def test_to_float_array_mixed_fallback():
+    array = to_float_array([70, "x", 15.5, None, np.int64(3), "80", False])
+    np.testing.assert_array_equal(array[[0, 2, 4]], [70.0, 15.5, 3.0])
+    assert np.isnan(array[[1, 3, 5, 6]]).all()
+    with pytest.raises(ValueError):
+        to_float_array([70, "x", [1, 2]])
+
+
+def test_to_float_array_rejects_nested():
+    with pytest.raises(ValueError):
+        to_float_array([[1, 2], [3, 4]])
+
+
+def test_validate_customer_columns_flags_each_rule():
+    columns = validate_customer_columns(
+        [70, "x", -1, 201, 50, 50, 50],
+        [75, 50, 50, 50, 0, 101, 50.5]
+    )
+    assert columns.valid.tolist() == [True] + [False] * 6
+    assert columns.error_count == 6
+    assert [error["index"] for error in columns.errors] == [1, 2, 3, 4, 5, 6]
+    assert {error["field"] for error in columns.errors[:3]} == {"annual_income"}
+    assert columns.errors[-1]["message"] == "Spending score must be a whole number"
+
+
+def test_validate_customer_columns_truncates_descriptions():
+    columns = validate_customer_columns([-1] * 10, [50] * 10, max_errors=3)
+    assert columns.error_count == 10
+    assert [error["index"] for error in columns.errors] == [0, 1, 2]
+
+
+def test_validate_customer_columns_length_mismatch():
+    with pytest.raises(ValueError):
+        validate_customer_columns([1, 2], [3])
+
+
+def test_bulk_matches_predict_batch(client, model):
+    income = [70.0, 15.0, 120.0, 300.0]
+    score = [75, 39, 20, 50]
+    response = client.post(BULK_URL, json={"annual_income": income, "spending_score": score})
+    assert response.status_code == 200
+    body = response.json()
+    expected = model.predict_batch(np.array(income[:3]), np.array(score[:3], dtype=float))
+    assert body["cluster_id"] == expected.tolist() + [-1]
+    assert body["count"] == 4
+    assert body["error_count"] == 1
+    assert body["errors"][0]["index"] == 3
+    assert body["model_version"] == model.model_version
+
+
+@pytest.mark.parametrize("payload", [
+    {"annual_income": [70]},
+    {"annual_income": 70, "spending_score": 75},
+    [70, 75],
+])
+def test_bulk_malformed_body_is_422(client, payload):
+    assert client.post(BULK_URL, json=payload).status_code == 422
+
+
+def test_bulk_invalid_json_is_422(client):
+    response = client.post(BULK_URL, content=b"{not json", headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+
+
+def test_bulk_length_mismatch_is_422(client):
+    response = client.post(BULK_URL, json={"annual_income": [70, 80], "spending_score": [75]})
+    assert response.status_code == 422
+
+
+def test_bulk_rejects_too_many_rows_in_either_column(client, tmp_settings):
+    tmp_settings(BULK_MAX_ROWS=5)
+    short_income = {"annual_income": [70], "spending_score": [75] * 6}
+    assert client.post(BULK_URL, json=short_income).status_code == 413
+    short_score = {"annual_income": [70] * 6, "spending_score": [75]}
+    assert client.post(BULK_URL, json=short_score).status_code == 413
+
+
+def test_bulk_rejects_large_content_length_before_parsing(client, tmp_settings):
+    tmp_settings(BULK_MAX_BODY_BYTES=64)
+    # Not even valid JSON: a 413 proves the body was never parsed
+    response = client.post(BULK_URL, content=b"x" * 65, headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
+
+
+def test_bulk_rejects_large_chunked_body(client, tmp_settings):
+    tmp_settings(BULK_MAX_BODY_BYTES=64)
+
+    def chunks():
+        for _ in range(10):
+            yield b"x" * 16
+
+    response = client.post(BULK_URL, content=chunks(), headers={"Content-Type": "application/json"})
+    assert "content-length" not in response.request.headers
+    assert response.status_code == 413
+
+
+def test_bulk_body_within_byte_limit(client, tmp_settings):
+    body = json.dumps({"annual_income": [70], "spending_score": [75]}).encode()
+    tmp_settings(BULK_MAX_BODY_BYTES=len(body))
+    response = client.post(BULK_URL, content=body, headers={"Content-Type": "application/json"})
+    assert response.status_code == 200
+
+
+def test_soft_bulk_matches_kmeans_transform(client, model):
+    income = [15, 137, 60, "x"]
+    score = [39, 83, 50, 50]
+    body = client.post(BULK_URL, params={"soft": True},
+                       json={"annual_income": income, "spending_score": score}).json()
+
+    expected = model.kmeans.transform(model.scaler.transform(np.array([income[:3], score[:3]], dtype=float).T))
+    np.testing.assert_allclose(body["distances"][:3], expected, rtol=1e-9)
+    assert body["cluster_id"][:3] == expected.argmin(axis=1).tolist()
+    assert body["cluster_id"][3] == -1
+    assert body["distances"][3] is None and body["margin"][3] is None and body["membership"][3] is None
+
+
+def test_hard_bulk_omits_soft_fields(client):
+    body = client.post(BULK_URL, json={"annual_income": [60], "spending_score": [50]}).json()
+    assert body.get("distances") is None and body.get("membership") is None
+
+
+def test_soft_single_prediction(client, model):
+    payload = {"annual_income": 137, "spending_score": 83}
+    hard = client.post("/api/v1/predict", json=payload).json()
+    assert "confidence" not in hard
+
+    soft = client.post("/api/v1/predict", params={"soft": True}, json=payload).json()
+    assert soft["cluster_id"] == hard["cluster_id"]
+    expected = model.kmeans.transform(model.scaler.transform(np.array([[137.0, 83.0]])))[0]
+    np.testing.assert_allclose(soft["confidence"]["distances"], expected, rtol=1e-9)
+    assert 0 < soft["confidence"]["margin"]
+    assert 0.2 < soft["confidence"]["membership"] <= 1
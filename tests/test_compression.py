@@ -0,0 +1,134 @@
+"""Content-negotiated compression middleware"""
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+LARGE = "segment " * 1000
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0.5, deflate", "deflate"),
+    ("deflate;q=0.1, gzip;q=0.9", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("identity", None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header, ["gzip", "deflate"]) == expected
+
+
+@pytest.fixture(scope="module")
+def app_client(tmp_path_factory):
+    app = FastAPI()
+    download = tmp_path_factory.mktemp("download") / "result.csv"
+    download.write_text(LARGE)
+
+    @app.get("/download")
+    def download_file():
+        return FileResponse(download, media_type="text/csv")
+
+    @app.get("/partial")
+    def partial():
+        # A 206 built by hand, with no Range header on the request
+        return PlainTextResponse(
+            LARGE[:500], status_code=206,
+            headers={"Content-Range": f"bytes 0-499/{len(LARGE)}"}
+        )
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(LARGE, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f"chunk {i}\n" for i in range(100)), media_type="text/plain")
+
+    @app.get("/excluded")
+    def excluded():
+        return PlainTextResponse(LARGE)
+
+    app.add_middleware(CompressionMiddleware, minimum_size=100, excluded_paths=["/excluded"])
+    return TestClient(app)
+
+
+def _raw(client, path, encoding):
+    """Fetch without letting httpx decode the body"""
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_large_body_is_gzipped(app_client):
+    response, body = _raw(app_client, "/large", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) == len(body)
+    assert gzip.decompress(body).decode() == LARGE
+
+
+def test_deflate_uses_zlib_container(app_client):
+    response, body = _raw(app_client, "/large", "deflate")
+    assert response.headers["content-encoding"] == "deflate"
+    assert zlib.decompress(body).decode() == LARGE
+
+
+def test_compressed_response_gets_weak_etag(app_client):
+    response, _ = _raw(app_client, "/large", "gzip")
+    assert response.headers["etag"] == 'W/"v1"'
+    plain, _ = _raw(app_client, "/large", "identity")
+    assert plain.headers["etag"] == '"v1"'
+
+
+def test_small_body_is_not_compressed(app_client):
+    response, body = _raw(app_client, "/small", "gzip")
+    assert "content-encoding" not in response.headers
+    assert body == b"tiny"
+
+
+def test_streamed_body_is_compressed_incrementally(app_client):
+    response, body = _raw(app_client, "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(body).decode() == "".join(f"chunk {i}\n" for i in range(100))
+
+
+def test_excluded_path_is_untouched(app_client):
+    response, body = _raw(app_client, "/excluded", "gzip")
+    assert "content-encoding" not in response.headers
+    assert body.decode() == LARGE
+
+
+def test_range_request_is_not_compressed(app_client):
+    with app_client.stream("GET", "/download", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-99"}) as response:
+        body = b"".join(response.iter_raw())
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-range"] == f"bytes 0-99/{len(LARGE)}"
+    assert body.decode() == LARGE[:100]
+
+
+def test_partial_response_is_not_compressed(app_client):
+    response, body = _raw(app_client, "/partial", "gzip")
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert body.decode() == LARGE[:500]
+
+
+def test_compressed_download_drops_accept_ranges(app_client):
+    response, body = _raw(app_client, "/download", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-ranges" not in response.headers
+    assert gzip.decompress(body).decode() == LARGE
+    plain, _ = _raw(app_client, "/download", "identity")
+    assert plain.headers["accept-ranges"] == "bytes"
@@ -0,0 +1,56 @@
+"""Bootstrap cluster stability"""
+import numpy as np
+import pytest
+
+from app.models.evaluation import bootstrap_stability, clusterwise_jaccard, unstable_clusters
+
+
+@pytest.fixture(scope="module")
+def blobs():
+    rng = np.random.default_rng(0)
+    centers = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0]])
+    X = np.vstack([center + rng.normal(0, 0.5, size=(60, 2)) for center in centers])
+    return X, np.repeat(np.arange(3), 60)
+
+
+def test_jaccard_ignores_label_ids():
+    reference = np.array([0, 0, 1, 1, 2, 2])
+    np.testing.assert_array_equal(clusterwise_jaccard(reference, np.array([2, 2, 0, 0, 1, 1]), 3), [1, 1, 1])
+
+
+def test_jaccard_partial_overlap():
+    reference = np.array([0, 0, 0, 1, 1, 1])
+    labels = np.array([0, 0, 1, 1, 1, 1])
+    # Cluster 0: {0,1,2} vs {0,1} -> 2/3; cluster 1: {3,4,5} vs {2,3,4,5} -> 3/4
+    np.testing.assert_allclose(clusterwise_jaccard(reference, labels, 2), [2 / 3, 3 / 4])
+
+
+def test_jaccard_absent_cluster_is_nan():
+    jaccard = clusterwise_jaccard(np.array([0, 0, 2]), np.array([1, 1, 0]), 3)
+    assert jaccard[0] == 1 and np.isnan(jaccard[1]) and jaccard[2] == 1
+
+
+def test_separated_clusters_are_stable(blobs):
+    X, reference = blobs
+    report = bootstrap_stability(X, reference, n_resamples=4, n_init=1, workers=2)
+    assert report["n_resamples"] == 4 and report["workers"] == 2
+    assert [c["size"] for c in report["clusters"]] == [60, 60, 60]
+    assert all(c["jaccard_min"] == 1.0 for c in report["clusters"])
+    assert report["agreement_mean"] == 1.0
+    assert unstable_clusters(report) == []
+
+
+def test_results_do_not_depend_on_worker_count(blobs):
+    X, _ = blobs
+    # Four clusters on three blobs: one blob is split differently per resample
+    reference = np.repeat(np.arange(4), 45)
+    one = bootstrap_stability(X, reference, n_resamples=3, n_init=1, workers=1, random_state=7)
+    two = bootstrap_stability(X, reference, n_resamples=3, n_init=1, workers=2, random_state=7)
+    assert one["clusters"] == two["clusters"]
+    assert one["agreement_mean"] == two["agreement_mean"]
+
+
+def test_unstable_clusters_threshold():
+    report = {"clusters": [{"cluster": 0, "jaccard_mean": 0.9}, {"cluster": 1, "jaccard_mean": 0.5}]}
+    assert unstable_clusters(report) == [1]
+    assert unstable_clusters(report, min_stability=0.95) == [0, 1]
@@ -0,0 +1,218 @@
+"""Scoring jobs: submission, execution, failure handling and the HTTP API"""
+import asyncio
+import importlib
+import io
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.job_service import JobQueueFull, JobService, JobStatus
+
+# The package re-exports the service instance under the module's name
+job_module = importlib.import_module("app.services.job_service")
+
+
+def _wait(service, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = service.get(job_id)
+        if job.status in JobStatus.FINISHED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.fixture
+def service(model, tmp_path, tmp_settings):
+    tmp_settings(JOBS_DIR=str(tmp_path / "jobs"), JOB_CHUNK_ROWS=3)
+    jobs = JobService()
+    jobs.start()
+    yield jobs
+    jobs.shutdown()
+
+
+class FailingUpload(io.RawIOBase):
+    """Upload whose stream breaks after the first read (client went away)"""
+
+    def __init__(self):
+        self.reads = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        self.reads += 1
+        if self.reads > 1:
+            raise OSError("connection reset")
+        data = b"Annual_Income,Spending_Score\n"
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def test_file_job_scores_every_row(service, model):
+    csv = "CustomerID,Annual_Income,Spending_Score\n1,70,75\n2,15,39\n3,300,50\n4,120,20\n5,60,abc\n"
+    job = service.submit_file(io.BytesIO(csv.encode()), "customers.csv")
+    assert job.rows_total == 5
+
+    job = _wait(service, job.job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.rows_done == 5
+    assert job.rows_invalid == 2
+
+    result = pd.read_csv(service.result_path(job.job_id))
+    expected = model.predict_batch(np.array([70.0, 15.0, 120.0]), np.array([75.0, 39.0, 20.0]))
+    assert result["Cluster"].tolist() == [expected[0], expected[1], -1, expected[2], -1]
+    assert result["CustomerID"].tolist() == [1, 2, 3, 4, 5]
+    assert result["Cluster_Name"].iloc[2] == "Invalid"
+
+
+def test_file_job_without_feature_columns_fails(service):
+    job = service.submit_file(io.BytesIO(b"a,b\n1,2\n"), "bad.csv")
+    job = _wait(service, job.job_id)
+    assert job.status == JobStatus.FAILED
+    assert "income column" in job.error
+    assert service.result_path(job.job_id) is None
+
+
+def test_broken_upload_marks_job_failed(service, tmp_settings):
+    tmp_settings(JOB_MAX_PENDING=2)
+    for _ in range(5):
+        with pytest.raises(OSError):
+            service.submit_file(io.BufferedReader(FailingUpload()), "broken.csv")
+
+    failed = [job for job in service._jobs.values() if job.status == JobStatus.FAILED]
+    assert len(failed) == 5
+    assert all(job.error.startswith("Upload failed") for job in failed)
+    assert service.memory_usage()["pending"] == 0
+
+    # Failed uploads must not use up the pending slots
+    job = service.submit_file(io.BytesIO(b"Annual_Income,Spending_Score\n70,75\n"), "ok.csv")
+    assert _wait(service, job.job_id).status == JobStatus.SUCCEEDED
+
+
+def test_row_count_failure_marks_job_failed(service, monkeypatch):
+    def broken_count(path):
+        raise OSError("disk error")
+
+    monkeypatch.setattr(job_module, "count_data_rows", broken_count)
+    with pytest.raises(OSError):
+        service.submit_file(io.BytesIO(b"Annual_Income,Spending_Score\n70,75\n"), "x.csv")
+    job, = service._jobs.values()
+    assert job.status == JobStatus.FAILED
+    assert not (service._job_dir(job.job_id) / job_module.INPUT_FILE).exists()
+
+
+def test_dataset_job(service):
+    job = service.submit_dataset("processed")
+    job = _wait(service, job.job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    result = pd.read_csv(service.result_path(job.job_id))
+    assert len(result) == job.rows_total == 200
+    assert (result["Cluster"] >= 0).all()
+    assert set(result["Gender"]) == {"Female", "Male"}
+
+
+def test_unknown_dataset(service):
+    with pytest.raises(KeyError):
+        service.submit_dataset("nope")
+
+
+def test_queue_full(service, monkeypatch, tmp_settings):
+    tmp_settings(JOB_MAX_PENDING=1)
+    release = threading.Event()
+    monkeypatch.setattr(service, "_run", lambda job, open_chunks: release.wait(5))
+    try:
+        service.submit_dataset("processed")
+        with pytest.raises(JobQueueFull):
+            service.submit_dataset("processed")
+    finally:
+        release.set()
+
+
+def test_restart_fails_interrupted_jobs(service, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(service, "_run", lambda job, open_chunks: release.wait(5))
+    job = service.submit_dataset("processed")
+    release.set()
+
+    restarted = JobService()
+    restarted.start()
+    try:
+        restored = restarted.get(job.job_id)
+        assert restored.status == JobStatus.FAILED
+        assert restored.error == "Interrupted by server restart"
+    finally:
+        restarted.shutdown()
+
+
+def test_retention_by_count(service, tmp_settings):
+    tmp_settings(JOB_MAX_RETAINED=1)
+    first = _wait(service, service.submit_dataset("processed").job_id)
+    second = _wait(service, service.submit_dataset("processed").job_id)
+    service.cleanup()
+    assert service.get(first.job_id) is None
+    assert not service._job_dir(first.job_id).exists()
+    assert service.get(second.job_id) is not None
+
+
+def test_job_api_round_trip(client):
+    csv = b"Annual_Income,Spending_Score\n70,75\n15,39\n"
+    response = client.post("/api/v1/jobs", files={"file": ("c.csv", csv, "text/csv")})
+    assert response.status_code == 202
+    status_url = response.headers["location"]
+
+    deadline = time.time() + 10
+    while (body := client.get(status_url).json())["status"] not in JobStatus.FINISHED:
+        assert time.time() < deadline
+        time.sleep(0.02)
+    assert body["status"] == JobStatus.SUCCEEDED
+    assert body["progress"] == 1.0
+
+    result = client.get(body["result_url"])
+    assert result.status_code == 200
+    assert pd.read_csv(io.StringIO(result.text))["Cluster"].notna().all()
+    assert client.get("/api/v1/jobs/unknown").status_code == 404
+
+
+def test_idle_server_enforces_retention(service, tmp_settings):
+    job = _wait(service, service.submit_dataset("processed").job_id)
+    tmp_settings(JOB_RETENTION_SECONDS=0, JOB_CLEANUP_INTERVAL_SECONDS=0.01)
+
+    async def idle():
+        service.start_cleanup()
+        deadline = time.time() + 5
+        while service.get(job.job_id) is not None and time.time() < deadline:
+            await asyncio.sleep(0.01)
+        await service.stop_cleanup()
+
+    asyncio.run(idle())
+    assert service.get(job.job_id) is None
+    assert not service._job_dir(job.job_id).exists()
+    assert service._cleanup_task is None
+
+
+def test_upload_size_limit(client, tmp_settings):
+    tmp_settings(JOB_MAX_UPLOAD_BYTES=200)
+    csv = b"Annual_Income,Spending_Score\n" + b"70,75\n" * 50
+    response = client.post("/api/v1/jobs", files={"file": ("c.csv", csv, "text/csv")})
+    assert response.status_code == 413
+
+    # Without a Content-Length the limit applies while the body streams in
+    boundary = "limit"
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"c.csv\"\r\n"
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode() + csv + f"\r\n--{boundary}--\r\n".encode()
+    response = client.post(
+        "/api/v1/jobs",
+        content=(body[i:i + 64] for i in range(0, len(body), 64)),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    assert response.status_code == 413
+
+    assert client.post("/api/v1/jobs", files={"other": ("c.csv", b"x", "text/csv")}).status_code == 422
+    small = client.post("/api/v1/jobs", files={"file": ("c.csv", b"Annual_Income,Spending_Score\n70,75\n", "text/csv")})
+    assert small.status_code == 202
@@ -0,0 +1,123 @@
+"""Queued structured logging"""
+import json
+import logging
+import queue
+import subprocess
+import sys
+
+import pytest
+
+from app.core.logging_config import (
+    DroppingQueueHandler,
+    JsonFormatter,
+    RequestContextFilter,
+    TextFormatter,
+    _sample_rate,
+    request_id_var
+)
+
+
+@pytest.fixture
+def queued_logger():
+    """Logger writing into a fresh DroppingQueueHandler; returns (logger, handler)"""
+    def make(maxsize=0):
+        handler = DroppingQueueHandler(queue.Queue(maxsize=maxsize))
+        handler.addFilter(RequestContextFilter())
+        logger = logging.getLogger(f"tests.logging.{id(handler)}")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        return logger, handler
+    return make
+
+
+def _log_exception(logger):
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception("failed for %s", "customer", extra={"fields": {"rows": 3}})
+
+
+def test_json_keeps_traceback_in_its_own_field(queued_logger):
+    logger, handler = queued_logger()
+    _log_exception(logger)
+
+    record = handler.queue.get_nowait()
+    assert record.exc_info is None
+
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["message"] == "failed for customer"
+    assert payload["exc_info"].startswith("Traceback")
+    assert "ZeroDivisionError" in payload["exc_info"]
+    assert payload["rows"] == 3
+
+
+def test_text_appends_traceback_once(queued_logger):
+    logger, handler = queued_logger()
+    _log_exception(logger)
+
+    line = TextFormatter().format(handler.queue.get_nowait())
+    assert "failed for customer" in line
+    assert line.count("Traceback") == 1
+    assert line.endswith("rows=3")
+
+
+def test_full_queue_drops_instead_of_blocking(queued_logger):
+    logger, handler = queued_logger(maxsize=2)
+    for i in range(5):
+        logger.info("record %d", i)
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_records_carry_the_request_id(queued_logger):
+    logger, handler = queued_logger()
+    token = request_id_var.set("abc123")
+    try:
+        logger.info("inside")
+    finally:
+        request_id_var.reset(token)
+    logger.info("outside")
+
+    inside = json.loads(JsonFormatter().format(handler.queue.get_nowait()))
+    outside = json.loads(JsonFormatter().format(handler.queue.get_nowait()))
+    assert inside["request_id"] == "abc123"
+    assert "request_id" not in outside
+
+
+def test_sample_rate_uses_longest_prefix():
+    rates = {"/api/v1/predict": 0.1, "/api/v1/predict/bulk": 0.5}
+    assert _sample_rate("/api/v1/predict/bulk", rates) == 0.5
+    assert _sample_rate("/api/v1/predict", rates) == 0.1
+    assert _sample_rate("/health", rates) == 1.0
+
+
+def test_request_id_is_echoed(client):
+    response = client.get("/api/v1/health", headers={"X-Request-ID": "req-42"})
+    assert response.headers["X-Request-ID"] == "req-42"
+    assert len(client.get("/api/v1/health").headers["X-Request-ID"]) == 16
+
+
+def test_uvicorn_loggers_go_through_the_queue(client, monkeypatch):
+    from app.core.logging_config import UVICORN_LOGGERS, configure_logging
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        # What uvicorn's own logging config leaves behind
+        monkeypatch.setattr(uvicorn_logger, "handlers", [logging.StreamHandler()])
+        monkeypatch.setattr(uvicorn_logger, "propagate", False)
+        monkeypatch.setattr(uvicorn_logger, "disabled", False)
+
+    configure_logging()
+    for name in UVICORN_LOGGERS:
+        assert logging.getLogger(name).handlers == []
+        assert logging.getLogger(name).propagate is True
+    assert logging.getLogger("uvicorn.access").disabled is True
+    assert logging.getLogger("uvicorn.error").disabled is False
+
+
+def test_importing_main_does_not_configure_logging():
+    code = "import main; from app.core import logging_config; print(logging_config._listener is None)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "True"
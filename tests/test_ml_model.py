@@ -0,0 +1,123 @@
+"""Model inference: vectorized and soft assignment, and the float32 guard"""
+import numpy as np
+import pytest
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from app.data.preprocessing import dataset_store
+from app.models.ml_model import CustomerSegmentationModel
+
+
+@pytest.fixture
+def training_data():
+    dataset = dataset_store.get()
+    return np.asarray(dataset['Annual_Income']), np.asarray(dataset['Spending_Score'])
+
+
+def _fresh_model(tmp_settings, float32):
+    tmp_settings(MODEL_FLOAT32=float32)
+    model = CustomerSegmentationModel()
+    assert model.load_models()
+    return model
+
+
+def _toy_model(centers):
+    """Model with the given centroids and an identity scaler"""
+    model = CustomerSegmentationModel()
+    model.scaler = StandardScaler().fit([[-1.0, -1.0], [1.0, 1.0]])
+    centers = np.asarray(centers, dtype=np.float64)
+    model.kmeans = KMeans(n_clusters=len(centers), init=centers, n_init=1, max_iter=1).fit(centers)
+    model.is_loaded = True
+    return model
+
+
+def test_predict_batch_matches_sklearn(model, training_data):
+    income, score = training_data
+    expected = model.kmeans.predict(model.scaler.transform(np.column_stack([income, score]).astype(np.float64)))
+    np.testing.assert_array_equal(model.predict_batch(income, score), expected)
+    assert model.predict(float(income[0]), float(score[0]))[0] == expected[0]
+
+
+def test_float64_by_default(tmp_settings):
+    model = _fresh_model(tmp_settings, float32=False)
+    assert model.dtype is np.float64
+    assert model.memory_usage()["precision"] == "float64"
+
+
+def test_float32_agrees_on_training_data(tmp_settings, training_data):
+    reference = _fresh_model(tmp_settings, float32=False)
+    model = _fresh_model(tmp_settings, float32=True)
+    income, score = training_data
+    # The shipped model passes the guard on its own training data
+    assert model.dtype is np.float32
+    np.testing.assert_array_equal(model.predict_batch(income, score), reference.predict_batch(income, score))
+
+
+def test_float32_rejected_when_assignments_differ(tmp_settings, monkeypatch):
+    tmp_settings(MODEL_FLOAT32=True)
+    # 0.5 + 1e-9 is nearer the second centroid in float64 and a tie in float32
+    monkeypatch.setattr(dataset_store, "get", lambda: {
+        'Annual_Income': np.array([0.5 + 1e-9, -3.0]),
+        'Spending_Score': np.array([0.0, 0.0])
+    })
+    model = _toy_model([[0.0, 0.0], [1.0, 0.0]])
+    model._configure_precision()
+    assert model.dtype is np.float64
+    assert model.predict_batch(np.array([0.5 + 1e-9]), np.array([0.0]))[0] == 1
+
+
+def test_float32_accepted_when_assignments_agree(tmp_settings, monkeypatch):
+    tmp_settings(MODEL_FLOAT32=True)
+    monkeypatch.setattr(dataset_store, "get", lambda: {
+        'Annual_Income': np.array([0.1, 0.9, -3.0]),
+        'Spending_Score': np.array([0.0, 0.0, 0.0])
+    })
+    model = _toy_model([[0.0, 0.0], [1.0, 0.0]])
+    model._configure_precision()
+    assert model.dtype is np.float32
+    assert model._centers.dtype == np.float32
+
+
+def test_float32_needs_training_data(tmp_settings, monkeypatch):
+    tmp_settings(MODEL_FLOAT32=True)
+
+    def unavailable():
+        raise FileNotFoundError("no data")
+
+    monkeypatch.setattr(dataset_store, "get", unavailable)
+    model = _toy_model([[0.0, 0.0], [1.0, 0.0]])
+    model._configure_precision()
+    assert model.dtype is np.float64
+
+
+def test_soft_distances_match_kmeans_transform(model, training_data):
+    income, score = training_data
+    expected = model.kmeans.transform(model.scaler.transform(np.column_stack([income, score]).astype(np.float64)))
+    soft = model.predict_soft(income, score)
+
+    np.testing.assert_allclose(soft.distances, expected, rtol=1e-9, atol=1e-9)
+    np.testing.assert_array_equal(soft.cluster_id, model.predict_batch(income, score))
+    np.testing.assert_array_equal(soft.cluster_id, expected.argmin(axis=1))
+
+
+def test_soft_margin_and_membership(model, training_data):
+    income, score = training_data
+    soft = model.predict_soft(income, score)
+    ordered = np.sort(soft.distances, axis=1)
+    np.testing.assert_allclose(soft.margin, ordered[:, 1] - ordered[:, 0])
+
+    inverse_sq = 1.0 / soft.distances ** 2
+    np.testing.assert_allclose(soft.membership, inverse_sq.max(axis=1) / inverse_sq.sum(axis=1), rtol=1e-9)
+    assert ((soft.membership > 1 / soft.distances.shape[1]) & (soft.membership <= 1)).all()
+
+
+def test_soft_membership_at_extremes():
+    model = _toy_model([[0.0, 0.0], [2.0, 0.0]])
+    model._set_precision(np.float64)
+    soft = model.predict_soft(np.array([0.0, 1.0]), np.array([0.0, 0.0]))
+    # On a centroid: membership 1, margin is the centroid spacing
+    assert soft.membership[0] == pytest.approx(1.0)
+    assert soft.margin[0] == pytest.approx(2.0)
+    # Equidistant: membership 1/k, margin 0
+    assert soft.membership[1] == pytest.approx(0.5)
+    assert soft.margin[1] == pytest.approx(0.0)
@@ -0,0 +1,139 @@
+"""Columnar dataset cache"""
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app.data.preprocessing as preprocessing
+from app.core.config import settings
+from app.data.preprocessing import (
+    DatasetStore,
+    build_processed_cache,
+    load_processed_dataset
+)
+
+
+@pytest.fixture
+def raw_csv(tmp_path):
+    path = tmp_path / "raw.csv"
+    shutil.copyfile(settings.RAW_DATA_PATH, path)
+    return path
+
+
+def _copy(tmp_path, name, rows=None):
+    frame = pd.read_csv(settings.RAW_DATA_PATH)
+    if rows is not None:
+        frame = frame.head(rows)
+    path = tmp_path / name
+    frame.to_csv(path, index=False)
+    return path
+
+
+def test_matches_pandas_preprocessing(raw_csv, tmp_path):
+    dataset = load_processed_dataset(raw_csv, tmp_path / "cache")
+    raw = pd.read_csv(raw_csv)
+
+    assert len(dataset) == len(raw)
+    np.testing.assert_array_equal(dataset["Annual_Income"], raw["Annual Income (k$)"])
+    np.testing.assert_array_equal(dataset["Spending_Score"], raw["Spending Score (1-100)"])
+    np.testing.assert_array_equal(dataset["Gender"], (raw["Gender"] == "Male").astype(int))
+    np.testing.assert_array_equal(
+        dataset.features(),
+        raw[["Annual Income (k$)", "Spending Score (1-100)"]].to_numpy(dtype=np.float64)
+    )
+
+
+def test_unchanged_source_is_reused(raw_csv, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    first = build_processed_cache(raw_csv, cache_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cache was rebuilt")
+
+    monkeypatch.setattr(preprocessing, "count_data_rows", fail)
+    assert build_processed_cache(raw_csv, cache_dir) == first
+
+
+def test_changed_source_is_rebuilt(raw_csv, tmp_path):
+    cache_dir = tmp_path / "cache"
+    first = build_processed_cache(raw_csv, cache_dir)
+
+    frame = pd.read_csv(raw_csv).head(50)
+    frame.to_csv(raw_csv, index=False)
+    second = build_processed_cache(raw_csv, cache_dir)
+
+    assert second != first
+    assert not first.exists()
+    assert len(load_processed_dataset(raw_csv, cache_dir)) == 50
+
+
+def test_two_sources_keep_their_caches(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    real = _copy(tmp_path, "real.csv")
+    synthetic = _copy(tmp_path, "synthetic.csv", rows=80)
+
+    real_dir = build_processed_cache(real, cache_dir)
+    synthetic_dir = build_processed_cache(synthetic, cache_dir)
+    assert real_dir.exists() and synthetic_dir.exists()
+
+    # Going back and forth never rebuilds either one
+    monkeypatch.setattr(preprocessing, "count_data_rows", lambda *a, **k: pytest.fail("cache was rebuilt"))
+    assert build_processed_cache(real, cache_dir) == real_dir
+    assert build_processed_cache(synthetic, cache_dir) == synthetic_dir
+
+
+def test_least_recently_used_source_is_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(preprocessing, "CACHE_MAX_SOURCES", 2)
+    cache_dir = tmp_path / "cache"
+    sources = [_copy(tmp_path, f"source{rows}.csv", rows=rows) for rows in (60, 70, 80)]
+
+    dirs = [build_processed_cache(path, cache_dir) for path in sources[:2]]
+    build_processed_cache(sources[0], cache_dir)  # source 0 is now the most recent
+    dirs.append(build_processed_cache(sources[2], cache_dir))
+
+    assert dirs[0].exists()
+    assert not dirs[1].exists()
+    assert dirs[2].exists()
+    assert len(list(cache_dir.glob("current-*.json"))) == 2
+
+
+def test_dataset_store_follows_source_changes(raw_csv, tmp_path, tmp_settings):
+    tmp_settings(RAW_DATA_PATH=str(raw_csv), DATA_CACHE_DIR=str(tmp_path / "cache"))
+    store = DatasetStore()
+    assert store.memory_usage() == {"loaded": False}
+
+    first = store.get()
+    assert store.get() is first
+
+    pd.read_csv(raw_csv).head(30).to_csv(raw_csv, index=False)
+    second = store.get()
+    assert second is not first
+    assert len(second) == 30
+    assert store.memory_usage()["rows"] == 30
+
+
+@pytest.mark.parametrize("suffix", ["\n", "\n\n\n", "\r\n"])
+def test_trailing_blank_lines(tmp_path, suffix):
+    raw = pd.read_csv(settings.RAW_DATA_PATH)
+    path = tmp_path / "raw.csv"
+    path.write_text(raw.to_csv(index=False).rstrip("\n") + suffix)
+
+    dataset = load_processed_dataset(path, tmp_path / "cache")
+    assert len(dataset) == len(raw)
+    assert dataset.manifest["n_rows"] == len(raw)
+
+
+def test_blank_and_multiline_records_are_trimmed(tmp_path):
+    raw = pd.read_csv(settings.RAW_DATA_PATH).head(20)
+    raw["Note"] = ""
+    raw.loc[3, "Note"] = "called twice\nprefers email"
+    lines = raw.to_csv(index=False).split("\n")
+    lines.insert(8, "")
+    path = tmp_path / "raw.csv"
+    path.write_text("\n".join(lines))
+
+    dataset = load_processed_dataset(path, tmp_path / "cache")
+    assert len(dataset) == 20
+    assert dataset["Annual_Income"].shape == (20,)
+    np.testing.assert_array_equal(dataset["Annual_Income"], raw["Annual Income (k$)"])
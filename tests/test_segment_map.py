@@ -0,0 +1,68 @@
+"""Segment map raster, run-length encoding and revalidation"""
+import numpy as np
+import pytest
+
+from app.schemas.customer import ANNUAL_INCOME_RANGE, SPENDING_SCORE_RANGE
+from app.services.segment_map_service import run_length_encode, segment_map_service
+
+
+def _decode(runs):
+    runs = np.asarray(runs).reshape(-1, 2)
+    return np.repeat(runs[:, 0], runs[:, 1])
+
+
+def test_run_length_encode_round_trip():
+    values = np.array([3, 3, 1, 1, 1, 4, 3, 3])
+    runs = run_length_encode(values)
+    assert runs.tolist() == [3, 2, 1, 3, 4, 1, 3, 2]
+    np.testing.assert_array_equal(_decode(runs), values)
+    assert run_length_encode(np.array([], dtype=int)).size == 0
+
+
+@pytest.mark.parametrize("step, width, last", [
+    (0.5, 401, 200.0),
+    (0.25, 801, 200.0),
+    (0.3, 667, 199.8),
+    (7.0, 29, 196.0),
+    (10.0, 21, 200.0),
+])
+def test_grid_stays_inside_income_domain(model, step, width, last):
+    segment_map = segment_map_service.build_map(step)
+    assert segment_map.width == width
+    assert segment_map.income_max == pytest.approx(last)
+    assert ANNUAL_INCOME_RANGE[0] <= segment_map.income_max <= ANNUAL_INCOME_RANGE[1]
+    assert segment_map.income_min + (segment_map.width - 1) * step <= ANNUAL_INCOME_RANGE[1] + 1e-9
+    assert segment_map.height == SPENDING_SCORE_RANGE[1] - SPENDING_SCORE_RANGE[0] + 1
+    assert segment_map.score_max == SPENDING_SCORE_RANGE[1]
+
+
+def test_raster_matches_model(model):
+    segment_map = segment_map_service.build_map(2.5)
+    labels = _decode(segment_map.runs).reshape(segment_map.height, segment_map.width)
+    incomes = segment_map.income_min + segment_map.income_step * np.arange(segment_map.width)
+    scores = segment_map.score_min + segment_map.score_step * np.arange(segment_map.height)
+    grid_income, grid_score = np.meshgrid(incomes, scores)
+    expected = model.predict_batch(grid_income.ravel(), grid_score.ravel()).reshape(labels.shape)
+    np.testing.assert_array_equal(labels, expected)
+    assert len(segment_map.centroids) == model.kmeans.n_clusters
+
+
+def test_map_is_cached_per_version_and_step(model):
+    version, first = segment_map_service.get_map_json(1.0)
+    _, again = segment_map_service.get_map_json(1.0)
+    assert version == model.model_version
+    assert first is again
+
+
+def test_map_endpoint_revalidates(client):
+    response = client.get("/api/v1/clusters/map", params={"income_step": 0.3})
+    assert response.status_code == 200
+    assert response.json()["income_max"] <= ANNUAL_INCOME_RANGE[1]
+    etag = response.headers["etag"]
+    # Compressed on the fly, so the validator is weak
+    assert etag.startswith("W/")
+
+    cached = client.get("/api/v1/clusters/map", params={"income_step": 0.3}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    other = client.get("/api/v1/clusters/map", params={"income_step": 0.5}, headers={"If-None-Match": etag})
+    assert other.status_code == 200
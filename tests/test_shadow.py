@@ -0,0 +1,103 @@
+"""Shadow model evaluation"""
+import asyncio
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from app.data.preprocessing import dataset_store
+from app.services.shadow_service import ShadowService
+
+
+# Candidate cluster j is active cluster PERMUTATION[j]
+PERMUTATION = [2, 0, 4, 1, 3]
+
+
+@pytest.fixture
+def candidate_dir(model, tmp_path, tmp_settings):
+    """The active model with its cluster ids permuted"""
+    kmeans = copy.deepcopy(model.kmeans)
+    kmeans.cluster_centers_ = model.kmeans.cluster_centers_[PERMUTATION]
+    (tmp_path / "kmeans_model.pkl").write_bytes(pickle.dumps(kmeans))
+    (tmp_path / "scaler.pkl").write_bytes(pickle.dumps(model.scaler))
+    tmp_settings(SHADOW_MODEL_DIR=str(tmp_path), SHADOW_SAMPLE_RATE=1.0, SHADOW_BATCH_SIZE=64)
+    return tmp_path
+
+
+@pytest.fixture
+def customers(model):
+    dataset = dataset_store.get()
+    income = np.asarray(dataset['Annual_Income'], dtype=np.float64)
+    score = np.asarray(dataset['Spending_Score'], dtype=np.float64)
+    return income, score, model.predict_batch(income, score)
+
+
+async def _drain(service):
+    while service._queue.qsize():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+
+def test_disabled_without_model_dir(tmp_settings):
+    tmp_settings(SHADOW_MODEL_DIR=None)
+    service = ShadowService()
+    assert service.start() is False
+    service.observe(50.0, 50.0, 0)
+    assert service.get_report()["observed"] == 0
+
+
+def test_permuted_candidate_matches_after_relabeling(candidate_dir, customers):
+    income, score, clusters = customers
+
+    async def scenario():
+        service = ShadowService()
+        assert service.start()
+        for row in zip(income, score, clusters):
+            service.observe(*row)
+        await _drain(service)
+        await service.stop()
+        return service.get_report()
+
+    report = asyncio.run(scenario())
+    assert report["observed"] == len(income)
+    assert report["dropped"] == 0
+    assert report["matched_agreement"] == 1.0
+    assert report["raw_agreement"] < 0.5
+    inverse = {active: candidate for candidate, active in enumerate(PERMUTATION)}
+    assert report["cluster_mapping"] == {str(a): c for a, c in inverse.items()}
+    assert np.asarray(report["matrix"]).sum() == len(income)
+
+
+def test_full_queue_drops(candidate_dir, tmp_settings):
+    tmp_settings(SHADOW_QUEUE_SIZE=3)
+
+    async def scenario():
+        service = ShadowService()
+        assert service.start()
+        # No await between the calls, so the scorer cannot drain the queue
+        for _ in range(5):
+            service.observe(50.0, 50.0, 0)
+        dropped = service.dropped
+        await service.stop()
+        return dropped
+
+    assert asyncio.run(scenario()) == 2
+
+
+def test_model_swap_resets_counts(candidate_dir, model):
+    service = ShadowService()
+    service.candidate.load_models(str(candidate_dir / "kmeans_model.pkl"), str(candidate_dir / "scaler.pkl"))
+    service.reset()
+    service._score(np.array([[15.0, 39.0, 0.0], [137.0, 83.0, 1.0]]))
+    assert service.observed == 2
+
+    service._active_version = "older"
+    service._score(np.array([[15.0, 39.0, 0.0]]))
+    assert service.observed == 1
+
+
+def test_report_endpoint(client):
+    body = client.get("/api/v1/model/shadow").json()
+    assert body["enabled"] is False
+    assert body["matched_agreement"] is None
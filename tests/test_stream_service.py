@@ -0,0 +1,119 @@
+"""Streaming prediction parsing, scoring and the WebSocket channel"""
+import numpy as np
+import pytest
+
+from app.services.stream_service import INVALID_CLUSTER, parse_points, stream_prediction_service
+
+
+def test_parse_points_well_formed():
+    points = parse_points("70,75\n15,39\n\n120,20\n")
+    np.testing.assert_array_equal(points, [[70, 75], [15, 39], [120, 20]])
+
+
+def test_parse_points_empty():
+    assert parse_points("").shape == (0, 2)
+    assert parse_points("\n  \n").shape == (0, 2)
+
+
+@pytest.mark.parametrize("text, expected_rows", [
+    ("1,2,3\n4", 2),  # too many fields, then too few; must not pair up as [1,2],[3,4]
+    ("70,80,15\n50", 2),
+    ("70\n80,15", 2),
+    ("70,abc\n80,15", 2),
+])
+def test_parse_points_keeps_line_boundaries(text, expected_rows):
+    points = parse_points(text)
+    assert points.shape == (expected_rows, 2)
+    assert np.isnan(points[0]).all()
+
+
+def test_parse_points_bad_line_does_not_affect_neighbours():
+    points = parse_points("70,75\n1,2,3\n15,39")
+    np.testing.assert_array_equal(points[0], [70, 75])
+    assert np.isnan(points[1]).all()
+    np.testing.assert_array_equal(points[2], [15, 39])
+
+
+def test_score_messages_matches_predict_batch(model):
+    replies = stream_prediction_service.score_messages(["70,75\n15,39", "120,20", "1,2,3\n4"])
+    expected = model.predict_batch(np.array([70.0, 15.0, 120.0]), np.array([75.0, 39.0, 20.0]))
+    assert replies[0] == f"{expected[0]}\n{expected[1]}"
+    assert replies[1] == str(expected[2])
+    assert replies[2] == f"{INVALID_CLUSTER}\n{INVALID_CLUSTER}"
+
+
+def test_score_messages_out_of_range_is_invalid(model):
+    reply, = stream_prediction_service.score_messages(["300,50\n70,0\n70,50.5"])
+    assert reply.split("\n") == [str(INVALID_CLUSTER)] * 3
+
+
+@pytest.mark.parametrize("message", ["1,2,3\n4", "70,80,15\n50"])
+def test_websocket_malformed_lines_get_invalid_cluster(client, message):
+    with client.websocket_connect("/api/v1/predict/ws") as ws:
+        ws.send_text(message)
+        assert ws.receive_text() == f"{INVALID_CLUSTER}\n{INVALID_CLUSTER}"
+
+
+def test_websocket_pipelined_replies_keep_order(client, model, tmp_settings):
+    tmp_settings(STREAM_MAX_PENDING=2, STREAM_BATCH_MESSAGES=3)
+    incomes = np.arange(20, 60, dtype=np.float64)
+    expected = model.predict_batch(incomes, np.full(len(incomes), 50.0))
+    with client.websocket_connect("/api/v1/predict/ws") as ws:
+        # Far more messages than the pending queue holds; the reader pauses
+        # instead of dropping or reordering
+        for income in incomes:
+            ws.send_text(f"{income},50")
+        replies = [int(ws.receive_text()) for _ in incomes]
+    assert replies == expected.tolist()
+
+
+def test_websocket_oversized_message_closes(client, tmp_settings):
+    from starlette.websockets import WebSocketDisconnect
+
+    tmp_settings(STREAM_MAX_MESSAGE_SIZE=16)
+    with client.websocket_connect("/api/v1/predict/ws") as ws:
+        ws.send_text("70,75\n" * 10)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_text()
+    assert closed.value.code == 1009
+
+
+def test_websocket_batches_respect_line_cap(client, model, tmp_settings, monkeypatch):
+    tmp_settings(STREAM_MAX_PENDING=16, STREAM_BATCH_MESSAGES=16, STREAM_BATCH_LINES=5)
+    batch_lines = []
+    score_messages = stream_prediction_service.score_messages
+
+    def recording(messages):
+        batch_lines.append(sum(message.count("\n") + 1 for message in messages))
+        return score_messages(messages)
+
+    monkeypatch.setattr(stream_prediction_service, "score_messages", recording)
+    messages = ["70,75\n15,39\n120,20"] * 6 + ["50,50\n" * 7 + "50,50"]
+    with client.websocket_connect("/api/v1/predict/ws") as ws:
+        for message in messages:
+            ws.send_text(message)
+        replies = [ws.receive_text() for _ in messages]
+
+    assert [len(reply.split("\n")) for reply in replies] == [3] * 6 + [8]
+    # Only a single message may exceed the cap on its own
+    assert all(lines <= 5 for lines in batch_lines[:-1])
+    assert sum(batch_lines) == 26
+
+
+def test_websocket_connection_limit(client, tmp_settings):
+    from starlette.websockets import WebSocketDisconnect
+
+    tmp_settings(STREAM_MAX_CONNECTIONS=1)
+    with client.websocket_connect("/api/v1/predict/ws") as first:
+        first.send_text("70,75")
+        first.receive_text()
+        with client.websocket_connect("/api/v1/predict/ws") as second:
+            with pytest.raises(WebSocketDisconnect) as closed:
+                second.receive_text()
+        assert closed.value.code == 1013
+    assert stream_prediction_service.connections == 0
+
+    # The slot is free again once the first stream closed
+    with client.websocket_connect("/api/v1/predict/ws") as ws:
+        ws.send_text("70,75")
+        assert ws.receive_text() != str(INVALID_CLUSTER)
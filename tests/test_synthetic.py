@@ -0,0 +1,68 @@
+"""Synthetic dataset generation"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.data.synthetic import NUMERIC_COLUMNS, generate_customers, write_synthetic_csv
+
+
+@pytest.fixture(scope="module")
+def source():
+    return pd.read_csv(settings.RAW_DATA_PATH)
+
+
+def _sha(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_schema_and_ids(source):
+    frame = pd.concat(generate_customers(source, 2500, seed=1, block_rows=1000))
+    assert list(frame.columns) == list(source.columns)
+    assert frame["CustomerID"].tolist() == list(range(1, 2501))
+    assert set(frame["Gender"]) <= set(source["Gender"])
+
+
+def test_blocks_have_requested_sizes(source):
+    sizes = [len(block) for block in generate_customers(source, 2500, seed=1, block_rows=1000)]
+    assert sizes == [1000, 1000, 500]
+
+
+def test_values_stay_in_source_range(source):
+    frame = pd.concat(generate_customers(source, 20_000, seed=3))
+    for name in NUMERIC_COLUMNS:
+        assert frame[name].min() >= source[name].min()
+        assert frame[name].max() <= source[name].max()
+        assert (frame[name] == frame[name].round()).all()
+
+
+def test_distribution_follows_source(source):
+    frame = pd.concat(generate_customers(source, 100_000, seed=5))
+    for name in NUMERIC_COLUMNS:
+        assert frame[name].mean() == pytest.approx(source[name].mean(), rel=0.03)
+        assert frame[name].std() == pytest.approx(source[name].std(), rel=0.1)
+    female = (frame["Gender"] == "Female").mean()
+    assert female == pytest.approx((source["Gender"] == "Female").mean(), abs=0.01)
+
+
+def test_same_seed_same_file(tmp_path):
+    first = write_synthetic_csv(tmp_path / "a.csv", 3000, seed=7, block_rows=1000)
+    second = write_synthetic_csv(tmp_path / "b.csv", 3000, seed=7, block_rows=1000)
+    other = write_synthetic_csv(tmp_path / "c.csv", 3000, seed=8, block_rows=1000)
+    assert _sha(first) == _sha(second)
+    assert _sha(first) != _sha(other)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_written_csv_round_trips(tmp_path, source):
+    path = write_synthetic_csv(tmp_path / "out.csv", 1500, seed=2, block_rows=400)
+    written = pd.read_csv(path)
+    expected = pd.concat(generate_customers(source, 1500, seed=2, block_rows=400), ignore_index=True)
+    pd.testing.assert_frame_equal(written, expected, check_dtype=False)
+
+
+def test_missing_source_columns():
+    with pytest.raises(ValueError):
+        next(generate_customers(pd.DataFrame({"CustomerID": [1]}), 10))
@@ -0,0 +1,111 @@
+"""train_model.py: artifacts, marketing list and the training cache"""
+import json
+import pickle
+
+import pytest
+
+import train_model
+from app.data.synthetic import write_synthetic_csv
+
+
+@pytest.fixture
+def marketing_list(tmp_path, monkeypatch):
+    path = tmp_path / "notebooks" / "Marketing_Target_List.csv"
+    path.parent.mkdir()
+    monkeypatch.setattr(train_model, "MARKETING_LIST_PATH", path)
+    return path
+
+
+@pytest.fixture
+def synthetic_data(tmp_path):
+    return write_synthetic_csv(tmp_path / "synthetic.csv", 1000, seed=11)
+
+
+def _train(data_path, model_dir, **kwargs):
+    return train_model.train_and_save_model(n_init=1, data_path=data_path, model_dir=model_dir, **kwargs)
+
+
+def test_writes_artifacts_to_model_dir(tmp_path, synthetic_data, marketing_list):
+    model_dir = tmp_path / "models"
+    assert _train(synthetic_data, model_dir)
+    with open(model_dir / "kmeans_model.pkl", "rb") as f:
+        assert pickle.load(f).n_clusters == 5
+    assert (model_dir / "scaler.pkl").exists()
+
+
+def test_non_default_paths_skip_marketing_list(tmp_path, synthetic_data, marketing_list):
+    assert _train(synthetic_data, tmp_path / "models")
+    assert not marketing_list.exists()
+
+
+def test_marketing_list_state_lives_next_to_csv(tmp_path, synthetic_data, marketing_list):
+    raw = train_model.DATA_PATH
+    assert _train(raw, tmp_path / "a", marketing_list=True)
+    state_path = marketing_list.with_suffix(".state.json")
+    assert state_path.exists()
+    assert not (tmp_path / "a" / "cache" / "marketing_list.json").exists()
+    production_rows = marketing_list.read_text()
+
+    # A run on other data with its own model dir overwrites the list...
+    assert _train(synthetic_data, tmp_path / "b", marketing_list=True)
+    assert marketing_list.read_text() != production_rows
+
+    # ...and the next run on the real data notices and regenerates it, even
+    # though its own training cache is unchanged
+    assert _train(raw, tmp_path / "a", marketing_list=True)
+    assert marketing_list.read_text() == production_rows
+    with open(state_path) as f:
+        assert set(json.load(f)) == {"data_sha256", "labels_sha256"}
+
+
+def test_unchanged_marketing_list_is_not_rewritten(tmp_path, marketing_list):
+    raw = train_model.DATA_PATH
+    assert _train(raw, tmp_path / "a", marketing_list=True)
+    mtime = marketing_list.stat().st_mtime_ns
+    assert _train(raw, tmp_path / "a", marketing_list=True)
+    assert marketing_list.stat().st_mtime_ns == mtime
+
+
+def test_missing_data(tmp_path, marketing_list):
+    assert _train(tmp_path / "missing.csv", tmp_path / "models") is False
+
+
+def test_cache_hit_skips_fit(tmp_path, synthetic_data, marketing_list, monkeypatch):
+    model_dir = tmp_path / "models"
+    assert _train(synthetic_data, model_dir)
+    kmeans_bytes = (model_dir / "kmeans_model.pkl").read_bytes()
+    (model_dir / "kmeans_model.pkl").unlink()
+
+    def no_fit(*args, **kwargs):
+        raise AssertionError("cached run was refitted")
+
+    monkeypatch.setattr(train_model, "build_estimator", no_fit)
+    assert _train(synthetic_data, model_dir)
+    assert (model_dir / "kmeans_model.pkl").read_bytes() == kmeans_bytes
+
+    # A different config misses the cache
+    with pytest.raises(AssertionError, match="refitted"):
+        train_model.train_and_save_model(n_init=2, data_path=synthetic_data, model_dir=model_dir)
+
+
+def test_force_refits(tmp_path, synthetic_data, marketing_list, monkeypatch):
+    model_dir = tmp_path / "models"
+    assert _train(synthetic_data, model_dir)
+    monkeypatch.setattr(train_model, "build_estimator", lambda *a, **k: pytest.fail("refit"))
+    with pytest.raises(pytest.fail.Exception):
+        _train(synthetic_data, model_dir, force=True)
+
+
+def test_benchmark_reports_engine_per_k(synthetic_data):
+    results = train_model.benchmark_training(
+        data_path=synthetic_data, n_clusters=[2, 4], engines=["lloyd", "elkan"], n_init=1, repeats=1
+    )
+    assert [(r["k"], r["engine"]) for r in results] == [(2, "lloyd"), (2, "elkan"), (4, "lloyd"), (4, "elkan")]
+    assert all(r["n_rows"] == 1000 for r in results)
+    for k in (2, 4):
+        # lloyd and elkan agree exactly, so one of them is always selected
+        assert sum(r["selected"] for r in results if r["k"] == k) == 1
+
+
+def test_benchmark_missing_data(tmp_path):
+    assert train_model.benchmark_training(data_path=tmp_path / "missing.csv") is None
@@ -0,0 +1,124 @@
+"""Training engines, engine benchmark and the training run cache"""
+import numpy as np
+import pytest
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+import app.models.training as training
+from app.data.preprocessing import load_processed_dataset
+from app.models.training import (
+    TRAINING_ENGINES,
+    benchmark_engines,
+    build_estimator,
+    contingency_agreement,
+    labels_digest,
+    load_training_run,
+    matched_agreement,
+    select_engine,
+    store_training_run,
+    training_fingerprint
+)
+
+
+@pytest.fixture(scope="module")
+def X_scaled():
+    return StandardScaler().fit_transform(load_processed_dataset().features())
+
+
+def test_build_estimator_per_engine():
+    assert build_estimator("lloyd").algorithm == "lloyd"
+    assert build_estimator("elkan").algorithm == "elkan"
+    assert isinstance(build_estimator("lloyd"), KMeans)
+    assert isinstance(build_estimator("minibatch", batch_size=256), MiniBatchKMeans)
+    with pytest.raises(ValueError, match="Unknown training engine"):
+        build_estimator("faiss")
+
+
+def test_matched_agreement_ignores_label_ids():
+    reference = np.array([0, 0, 1, 1, 2, 2])
+    assert matched_agreement(np.array([2, 2, 0, 0, 1, 1]), reference) == 1.0
+    assert matched_agreement(np.array([2, 2, 0, 0, 1, 0]), reference) == pytest.approx(5 / 6)
+
+
+def test_contingency_agreement_mapping():
+    contingency = np.array([[0, 9], [8, 1]])
+    agreement, mapping = contingency_agreement(contingency)
+    assert agreement == pytest.approx(17 / 18)
+    assert mapping == {0: 1, 1: 0}
+    assert contingency_agreement(np.zeros((2, 2))) == (0.0, {})
+
+
+def test_benchmark_puts_reference_first(X_scaled):
+    results = benchmark_engines(X_scaled, engines=["elkan", "lloyd"], n_clusters=5, n_init=1)
+    assert [r["engine"] for r in results] == ["lloyd", "elkan"]
+    reference = results[0]
+    assert reference["inertia_delta"] == 0.0
+    assert reference["agreement"] == 1.0
+    # Elkan computes the same iterations as Lloyd, only faster
+    assert results[1]["agreement"] == pytest.approx(1.0)
+    assert abs(results[1]["inertia_delta"]) < 1e-9
+
+
+def test_all_engines_stay_close_on_real_data(X_scaled):
+    results = benchmark_engines(X_scaled, n_clusters=5, n_init=3)
+    assert {r["engine"] for r in results} == set(TRAINING_ENGINES)
+    assert all(r["inertia_delta"] < 0.05 for r in results)
+
+
+def test_select_engine_picks_fastest_within_tolerance():
+    results = [
+        {"engine": "lloyd", "wall_time_s": 1.0, "inertia_delta": 0.0, "agreement": 1.0},
+        {"engine": "elkan", "wall_time_s": 0.5, "inertia_delta": 0.0, "agreement": 1.0},
+        {"engine": "minibatch", "wall_time_s": 0.1, "inertia_delta": 0.02, "agreement": 0.97}
+    ]
+    assert select_engine(results) == "elkan"
+    assert select_engine(results, inertia_tolerance=0.05, min_agreement=0.95) == "minibatch"
+    assert select_engine(results[2:]) is None
+
+
+def test_fingerprint_tracks_data_and_config():
+    config = {"engine": "lloyd", "n_init": 10}
+    assert training_fingerprint("abc", config) == training_fingerprint("abc", dict(config))
+    assert training_fingerprint("abc", config) != training_fingerprint("abd", config)
+    assert training_fingerprint("abc", config) != training_fingerprint("abc", {**config, "n_init": 1})
+
+
+def test_fingerprint_tracks_cache_format(monkeypatch):
+    config = {"engine": "lloyd", "n_init": 10}
+    before = training_fingerprint("abc", config)
+    monkeypatch.setattr(training, "CACHE_FORMAT_VERSION", training.CACHE_FORMAT_VERSION + 1)
+    assert training_fingerprint("abc", config) != before
+
+
+def test_training_run_round_trip(tmp_path):
+    labels = np.array([0, 1, 1, 2], dtype=np.int32)
+    store_training_run(tmp_path, "run1", b"kmeans", b"scaler", labels, meta={"inertia": 1.5})
+
+    run = load_training_run(tmp_path, "run1")
+    assert run["kmeans_bytes"] == b"kmeans"
+    assert run["scaler_bytes"] == b"scaler"
+    np.testing.assert_array_equal(run["labels"], labels)
+    assert run["meta"] == {"inertia": 1.5}
+    assert load_training_run(tmp_path, "missing") is None
+
+
+def test_store_keeps_most_recent_runs(tmp_path):
+    labels = np.zeros(3, dtype=np.int32)
+    for i in range(4):
+        store_training_run(tmp_path, f"run{i}", b"k", b"s", labels, meta={}, max_entries=3)
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["run1", "run2", "run3"]
+
+
+def test_labels_digest():
+    labels = np.array([0, 1, 2])
+    assert labels_digest(labels) == labels_digest(labels.astype(np.int64))
+    assert labels_digest(labels) != labels_digest(labels[::-1])
+
+
+def test_loading_a_run_keeps_it_cached(tmp_path):
+    labels = np.zeros(3, dtype=np.int32)
+    for i in range(3):
+        store_training_run(tmp_path, f"run{i}", b"k", b"s", labels, meta={}, max_entries=3)
+    assert load_training_run(tmp_path, "run0") is not None
+    store_training_run(tmp_path, "run3", b"k", b"s", labels, meta={}, max_entries=3)
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["run0", "run2", "run3"]
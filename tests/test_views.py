@@ -0,0 +1,81 @@
+"""Cached pages, fingerprinted static assets and conditional requests"""
+import gzip
+
+import pytest
+
+from app.core.compression import encoded_etag, etag_matches, precompress
+from app.core.static_assets import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, static_assets
+
+
+@pytest.mark.parametrize("header, etag, expected", [
+    (None, '"abc"', False),
+    ('"abc"', '"abc"', True),
+    ('"xyz"', '"abc"', False),
+    ('W/"abc"', '"abc"', True),
+    ('"abc"', 'W/"abc"', True),
+    ('"xyz", "abc"', '"abc"', True),
+    ('"x,y", W/"abc"', '"abc"', True),
+    ('"x,y"', '"abc"', False),
+    ("*", '"abc"', True),
+    ('"abc-gzip"', '"abc"', False),
+])
+def test_etag_matches(header, etag, expected):
+    assert etag_matches(header, etag) is expected
+
+
+def test_encoded_etags_differ_per_encoding():
+    content = precompress(b"body " * 200)
+    tags = {content.etag_for(None), *(content.etag_for(e) for e in content.variants)}
+    assert len(tags) == 1 + len(content.variants)
+    assert content.etag_for("gzip") == encoded_etag(content.etag, "gzip")
+    assert content.etag_for("gzip").endswith('-gzip"')
+
+
+def test_page_etag_depends_on_encoding(client):
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+    zipped = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert plain.status_code == zipped.status_code == 200
+    assert zipped.headers["content-encoding"] == "gzip"
+    assert plain.headers["etag"] != zipped.headers["etag"]
+    assert plain.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+
+
+def test_page_revalidation_is_per_encoding(client):
+    zipped = client.get("/", headers={"Accept-Encoding": "gzip"})
+    etag = zipped.headers["etag"]
+
+    same = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert same.status_code == 304
+    assert same.headers["etag"] == etag
+
+    # The gzip validator must not revalidate the identity bytes
+    other = client.get("/", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert other.status_code == 200
+    assert "content-encoding" not in other.headers
+
+    listed = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": f'"nope", W/{etag}'})
+    assert listed.status_code == 304
+    assert client.get("/", headers={"If-None-Match": "*"}).status_code == 304
+
+
+def test_fingerprinted_static_asset_is_immutable(client):
+    url = static_assets.url("css/style.css")
+    assert url != "/static/css/style.css"
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.headers["content-type"].startswith("text/css")
+
+    plain = client.get("/static/css/style.css", headers={"Accept-Encoding": "identity"})
+    assert plain.headers["cache-control"] == REVALIDATE_CACHE_CONTROL
+    assert plain.content == response.content  # httpx decodes gzip transparently
+
+
+def test_static_gzip_variant_decodes_to_original(client):
+    asset, _ = static_assets.lookup("css/style.css")
+    assert gzip.decompress(asset.content.variants["gzip"]) == asset.content.body
+
+
+def test_unknown_static_asset_is_404(client):
+    assert client.get("/static/css/missing.css").status_code == 404
@@ -1,75 +1,172 @@
+import argparse
+import json
+import logging
+import os
 import pandas as pd
 import pickle
+import sys
 from pathlib import Path
-from sklearn.cluster import KMeans
 from sklearn.preprocessing import StandardScaler
 
+from app.core.logging_config import configure_logging
+from app.data.preprocessing import load_processed_dataset, FEATURE_COLUMNS
+from app.models.training import (
+    TRAINING_ENGINES,
+    DEFAULT_ENGINE,
+    build_estimator,
+    benchmark_engines,
+    select_engine,
+    training_fingerprint,
+    load_training_run,
+    store_training_run,
+    labels_digest
+)
+
 # Paths
 BASE_DIR = Path(__file__).resolve().parent
-DATA_PATH = BASE_DIR / "data" / "processed" / "mall_customers_processed.csv"
+DATA_PATH = BASE_DIR / "data" / "raw" / "mall_customers.csv"
 MODEL_DIR = BASE_DIR / "models_artifacts"
 MODEL_DIR.mkdir(exist_ok=True)
+MARKETING_LIST_PATH = BASE_DIR / "notebooks" / "Marketing_Target_List.csv"
+
+logger = logging.getLogger("train_model")
+
 
+def _write_if_changed(path, payload):
+    """Write bytes to path unless it already holds exactly them"""
+    if path.exists() and path.read_bytes() == payload:
+        return False
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+    return True
 
-def train_and_save_model():
-    print("=" * 60)
-    print("Training Customer Segmentation Model...")
-    print("=" * 60)
+
+def train_and_save_model(engine=DEFAULT_ENGINE, n_init=10, force=False,
+                         data_path=DATA_PATH, model_dir=MODEL_DIR, marketing_list=None):
+    data_path = Path(data_path)
+    model_dir = Path(model_dir)
+    if marketing_list is None:
+        # The shared marketing list only reflects the production data and model
+        marketing_list = (data_path.resolve() == DATA_PATH.resolve()
+                          and model_dir.resolve() == MODEL_DIR.resolve())
+    model_dir.mkdir(parents=True, exist_ok=True)
+    training_cache_dir = model_dir / "cache"
+    
+    logger.info("=" * 60)
+    logger.info("Training Customer Segmentation Model...")
+    logger.info("=" * 60)
     
     # Load data
-    print("\nLoading processed data...")
+    logger.info("Loading processed data...")
     try:
-        df = pd.read_csv(DATA_PATH)
-        print(f"Data loaded: {df.shape[0]} customers, {df.shape[1]} features")
+        dataset = load_processed_dataset(str(data_path))
+        logger.info(f"Data loaded: {len(dataset)} customers, {len(dataset.column_names)} features")
     except FileNotFoundError:
-        print(f"Error: Data file not found at {DATA_PATH}")
-        print("   Please run the preprocessing notebook first:")
-        print("   notebooks/01_eda_preprocessing.ipynb")
+        logger.error(f"Data file not found at {data_path}")
         return False
     
-    # Prepare features
-    print("\nPreparing features...")
-    X = df[['Annual_Income', 'Spending_Score']]
-    print(f"Features selected: {list(X.columns)}")
-    
-    # Scale features
-    print("\nScaling features...")
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    print("Features scaled using StandardScaler")
-    
-    # Train model
-    print("\nTraining KMeans model...")
+    # Fingerprint the run: same data + same config -> same artifacts
     optimal_k = 5
-    kmeans = KMeans(
-        n_clusters=optimal_k,
-        init='k-means++',
-        random_state=42,
-        n_init=10
-    )
-    kmeans.fit(X_scaled)
-    print(f"Model trained with {optimal_k} clusters")
+    config = {
+        "engine": engine,
+        "n_clusters": optimal_k,
+        "n_init": n_init,
+        "random_state": 42,
+        "features": FEATURE_COLUMNS
+    }
+    fingerprint = training_fingerprint(dataset.manifest["sha256"], config)
+    cached = None if force else load_training_run(training_cache_dir, fingerprint)
     
-    # Calculate inertia
-    print(f"   Inertia (WCSS): {kmeans.inertia_:.2f}")
+    if cached is not None:
+        logger.info(f"Training cache hit ({fingerprint}), skipping fit")
+        kmeans_bytes = cached["kmeans_bytes"]
+        scaler_bytes = cached["scaler_bytes"]
+        labels = cached["labels"]
+        logger.info(f"   Inertia (WCSS): {cached['meta']['inertia']:.2f}")
+    else:
+        # Prepare features
+        logger.info("Preparing features...")
+        X = pd.DataFrame(dataset.features(), columns=FEATURE_COLUMNS)
+        logger.info(f"Features selected: {list(X.columns)}")
+        
+        # Scale features
+        logger.info("Scaling features...")
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        logger.info("Features scaled using StandardScaler")
+        
+        # Train model
+        logger.info(f"Training KMeans model (engine: {engine})...")
+        kmeans = build_estimator(
+            engine,
+            n_clusters=optimal_k,
+            random_state=42,
+            n_init=n_init
+        )
+        kmeans.fit(X_scaled)
+        logger.info(f"Model trained with {optimal_k} clusters in {kmeans.n_iter_} iterations")
+        
+        # Calculate inertia
+        logger.info(f"   Inertia (WCSS): {kmeans.inertia_:.2f}")
+        
+        kmeans_bytes = pickle.dumps(kmeans)
+        scaler_bytes = pickle.dumps(scaler)
+        labels = kmeans.predict(X_scaled)
+        store_training_run(
+            training_cache_dir,
+            fingerprint,
+            kmeans_bytes,
+            scaler_bytes,
+            labels,
+            meta={"config": config, "data_sha256": dataset.manifest["sha256"], "inertia": float(kmeans.inertia_)}
+        )
+        logger.info(f"Training run cached: {training_cache_dir / fingerprint}")
     
-    # Save models
-    print("\nSaving model artifacts...")
+    # Save models (only rewritten when their contents change)
+    logger.info("Saving model artifacts...")
     
     # Save KMeans model
-    kmeans_path = MODEL_DIR / "kmeans_model.pkl"
-    with open(kmeans_path, 'wb') as f:
-        pickle.dump(kmeans, f)
-    print(f"KMeans model saved: {kmeans_path}")
+    kmeans_path = model_dir / "kmeans_model.pkl"
+    if _write_if_changed(kmeans_path, kmeans_bytes):
+        logger.info(f"KMeans model saved: {kmeans_path}")
+    else:
+        logger.info(f"KMeans model unchanged: {kmeans_path}")
     
     # Save Scaler
-    scaler_path = MODEL_DIR / "scaler.pkl"
-    with open(scaler_path, 'wb') as f:
-        pickle.dump(scaler, f)
-    print(f"Scaler saved: {scaler_path}")
+    scaler_path = model_dir / "scaler.pkl"
+    if _write_if_changed(scaler_path, scaler_bytes):
+        logger.info(f"Scaler saved: {scaler_path}")
+    else:
+        logger.info(f"Scaler unchanged: {scaler_path}")
+    
+    if not marketing_list:
+        logger.info("=" * 60)
+        logger.info("Training completed successfully!")
+        logger.info("=" * 60)
+        return True
+    
+    # Rewrite the marketing list only when the assignments changed. The state
+    # lives next to the CSV, so whichever run wrote it last is what is compared.
+    output_path = MARKETING_LIST_PATH
+    state_path = output_path.with_suffix(".state.json")
+    list_state = {"data_sha256": dataset.manifest["sha256"], "labels_sha256": labels_digest(labels)}
+    try:
+        with open(state_path, 'r') as f:
+            previous_state = json.load(f)
+    except (OSError, ValueError):
+        previous_state = None
+    
+    if output_path.exists() and previous_state == list_state:
+        logger.info(f"Cluster labels unchanged, keeping {output_path}")
+        logger.info("=" * 60)
+        logger.info("Training completed successfully!")
+        logger.info("=" * 60)
+        return True
     
     # Add cluster predictions to data and save
-    df['Cluster'] = kmeans.predict(X_scaled)
+    df = dataset.to_frame()
+    df['Cluster'] = labels
     cluster_names = {
         0: 'Average Customer',
         1: 'VIP / Whale',
@@ -79,29 +176,154 @@ def train_and_save_model():
     }
     df['Cluster_Label'] = df['Cluster'].map(cluster_names)
     
-    output_path = BASE_DIR / "notebooks" / "Marketing_Target_List.csv"
     df.to_csv(output_path, index=False)
-    print(f"Clustered data saved: {output_path}")
+    with open(state_path, 'w') as f:
+        json.dump(list_state, f)
+    logger.info(f"Clustered data saved: {output_path}")
     
     # Display cluster summary
-    print("\n" + "=" * 60)
-    print("Cluster Summary:")
-    print("=" * 60)
+    logger.info("=" * 60)
+    logger.info("Cluster Summary:")
+    logger.info("=" * 60)
     summary = df.groupby('Cluster_Label')[['Annual_Income', 'Spending_Score']].mean()
     summary['Count'] = df.groupby('Cluster_Label').size()
-    print(summary.round(2))
+    logger.info("\n%s", summary.round(2))
     
-    print("\n" + "=" * 60)
-    print("Training completed successfully!")
-    print("=" * 60)
-    print("\nYou can now run the FastAPI application:")
-    print("   python main.py")
-    print("\n   Or using uvicorn:")
-    print("   uvicorn main:app --reload")
-    print("=" * 60)
+    logger.info("=" * 60)
+    logger.info("Training completed successfully!")
+    logger.info("=" * 60)
+    logger.info("You can now run the FastAPI application:")
+    logger.info("   python main.py")
+    logger.info("   Or using uvicorn:")
+    logger.info("   uvicorn main:app --reload")
+    logger.info("=" * 60)
     
     return True
 
 
+def benchmark_training(data_path=DATA_PATH, n_clusters=(5,), engines=None, n_init=10, repeats=3,
+                       inertia_tolerance=0.01, min_agreement=0.99):
+    logger.info("=" * 60)
+    logger.info("Benchmarking Training Engines...")
+    logger.info("=" * 60)
+    
+    try:
+        dataset = load_processed_dataset(str(data_path))
+    except FileNotFoundError:
+        logger.error(f"Data file not found at {data_path}")
+        return None
+    
+    X = pd.DataFrame(dataset.features(), columns=FEATURE_COLUMNS)
+    X_scaled = StandardScaler().fit_transform(X)
+    n_rows = X_scaled.shape[0]
+    logger.info(f"Data: {data_path}")
+    logger.info(f"   {n_rows} customers, {X_scaled.shape[1]} features, best of {repeats} fits")
+    
+    results = []
+    for k in n_clusters:
+        k_results = benchmark_engines(
+            X_scaled,
+            engines=engines,
+            repeats=repeats,
+            n_clusters=k,
+            random_state=42,
+            n_init=n_init
+        )
+        best = select_engine(k_results, inertia_tolerance, min_agreement)
+        for result in k_results:
+            result.update({"n_rows": n_rows, "k": k, "selected": result["engine"] == best})
+        results.extend(k_results)
+        
+        table = pd.DataFrame(k_results).drop(columns=["n_rows", "k"]).set_index("engine")
+        logger.info("=" * 60)
+        logger.info(f"k = {k} (reference engine: {k_results[0]['engine']})")
+        logger.info("\n%s", table.round(4).to_string())
+    
+    # Engine choice per (n, k); None when no engine stays within tolerance
+    logger.info("=" * 60)
+    logger.info("Fastest engine within tolerance:")
+    for k in n_clusters:
+        best = next((r["engine"] for r in results if r["k"] == k and r["selected"]), None)
+        logger.info(f"   n = {n_rows:,}, k = {k}: {best or 'none'}")
+    logger.info("=" * 60)
+    
+    return results
+
+
 if __name__ == "__main__":
-    train_and_save_model()
+    parser = argparse.ArgumentParser(description="Train the customer segmentation model")
+    parser.add_argument(
+        "--engine",
+        choices=list(TRAINING_ENGINES),
+        default=DEFAULT_ENGINE,
+        help="KMeans training algorithm"
+    )
+    parser.add_argument("--n-init", type=int, default=10, help="Number of k-means++ restarts")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Retrain even if a cached run with the same data and config exists"
+    )
+    parser.add_argument("--data", default=str(DATA_PATH), help="Raw customer CSV to train on")
+    parser.add_argument(
+        "--model-dir",
+        default=str(MODEL_DIR),
+        help="Directory for the model artifacts and training cache"
+    )
+    parser.add_argument(
+        "--marketing-list",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Write notebooks/Marketing_Target_List.csv "
+             "(default: only when training on the default data and model directory)"
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Fit every engine on the same data and compare them instead of training"
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Fits per engine in benchmark mode")
+    parser.add_argument(
+        "--k",
+        type=int,
+        nargs="+",
+        default=[5],
+        help="Cluster counts to benchmark, e.g. --k 5 10 20 (benchmark mode)"
+    )
+    parser.add_argument(
+        "--inertia-tolerance",
+        type=float,
+        default=0.01,
+        help="Maximum relative inertia increase over the reference in benchmark mode"
+    )
+    parser.add_argument(
+        "--min-agreement",
+        type=float,
+        default=0.99,
+        help="Minimum label agreement with the reference in benchmark mode"
+    )
+    args = parser.parse_args()
+    configure_logging(fmt="text")
+    
+    if args.benchmark:
+        results = benchmark_training(
+            data_path=args.data,
+            n_clusters=args.k,
+            n_init=args.n_init,
+            repeats=args.repeats,
+            inertia_tolerance=args.inertia_tolerance,
+            min_agreement=args.min_agreement
+        )
+        if results is None:
+            sys.exit(1)
+    else:
+        ok = train_and_save_model(
+            engine=args.engine,
+            n_init=args.n_init,
+            force=args.force,
+            data_path=args.data,
+            model_dir=args.model_dir,
+            marketing_list=args.marketing_list
+        )
+        if not ok:
+            sys.exit(1)